@@ -1,329 +1,187 @@
-import streamlit as st
-import pandas as pd
-import random
-import time
-
-# --- Placeholder classes ---
-class CustomData:
-    def __init__(self, weather, road_condition, time_of_day, traffic, accident_type):
-        self.weather = weather
-        self.road_condition = road_condition
-        self.time_of_day = time_of_day
-        self.traffic = traffic
-        self.accident_type = accident_type
-
-    def get_data_as_data_frame(self):
-        return pd.DataFrame({
-            'weather': [self.weather],
-            'road_condition': [self.road_condition],
-            'time_of_day': [self.time_of_day],
-            'traffic': [self.traffic],
-            'accident_type': [self.accident_type]
-        })
+import gc
+import os
+import sys
+import uuid
 
-class PredictPipeline:
-    def predict(self, features):
-        severities = ["Low", "Medium", "High"]
-        return [random.choice(severities)]
-# --- End placeholder classes ---
-
-# --- Streamlit Page Config ---
-st.set_page_config(
-    page_title="Accident Severity Predictor",
-    page_icon="🚦",
-    layout="centered",
+import pandas as pd
+from flask import Flask, Response, g, jsonify, render_template, request
+
+from src.exception import CustomException
+from src.instrumentation import metrics
+from src.logger import get_logger, logging, request_id_var
+from src.pipeline.micro_batching import MicroBatcher
+from src.pipeline.predict_pipeline import (
+    FEATURE_COLUMNS, TEMPORAL_COLUMNS, CustomData, PredictPipeline, PredictPipelineConfig,
 )
 
-# --- Custom CSS for enhanced 3D design with blinking title, highlights, and new features ---
-st.markdown(
+application = Flask(__name__)
+app = application
+
+# Per-request prediction logs; thinned out by LOG_PREDICTION_SAMPLE_RATE
+prediction_logger = get_logger("prediction")
+
+# One pipeline per process; artifacts live in the process-wide cache behind it.
+# MODEL_REGISTRY_DIR serves versions from the model registry (MODEL_REF alias/version);
+# CANARY_FRACTION routes that share of requests to the "canary" alias
+predict_pipeline = PredictPipeline(PredictPipelineConfig(
+    registry_dir=os.environ.get("MODEL_REGISTRY_DIR") or None,
+    model_ref=os.environ.get("MODEL_REF", PredictPipelineConfig.model_ref),
+    canary_fraction=float(os.environ.get("CANARY_FRACTION", "0")),
+))
+
+# MICRO_BATCHING=1 coalesces concurrent requests (threaded server / gthread workers)
+# into vectorized micro-batches; MICRO_BATCH_SIZE / MICRO_BATCH_WAIT_MS tune it
+micro_batcher = None
+if os.environ.get("MICRO_BATCHING", "0") == "1":
+    micro_batcher = MicroBatcher(
+        predict_pipeline,
+        max_batch_size=int(os.environ.get("MICRO_BATCH_SIZE", "64")),
+        max_wait_ms=float(os.environ.get("MICRO_BATCH_WAIT_MS", "5")),
+    )
+
+
+def run_prediction(features, return_version=False):
     """
-    <style>
-    /* Nighttime-inspired gradient background with animation */
-    body {
-        background: linear-gradient(135deg, #0a0f1c, #1a2e44, #2a4060);
-        background-size: 400% 400%;
-        animation: gradientAnimation 15s ease infinite;
-        color: #e0e0ff; /* Light blue-white for contrast */
-        font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-    }
-    @keyframes gradientAnimation {
-        0% { background-position: 0% 50%; }
-        50% { background-position: 100% 50%; }
-        100% { background-position: 0% 50%; }
-    }
-
-    /* Centered container with 3D effect */
-    .block-container {
-        background: rgba(10, 15, 28, 0.8); /* Darker nighttime background */
-        padding: 2.5rem;
-        border-radius: 20px;
-        box-shadow: 0 5px 15px rgba(0, 100, 200, 0.3), 0 0 10px rgba(0, 150, 255, 0.2);
-        border: 1px solid rgba(0, 150, 255, 0.2);
-        backdrop-filter: blur(10px);
-        transition: all 0.3s ease;
-    }
-    .block-container:hover {
-        box-shadow: 0 8px 20px rgba(0, 100, 200, 0.5), 0 0 15px rgba(0, 150, 255, 0.4);
-    }
-
-    /* Blinking title animation */
-    .blinking-title {
-        animation: blink 1.5s infinite;
-    }
-    @keyframes blink {
-        0% { color: #ffcc00; text-shadow: 0 0 10px #ffcc00, 0 0 20px #ff4500, 0 0 30px #ff4500; }
-        50% { color: #ff4500; text-shadow: 0 0 15px #ff4500, 0 0 25px #ffcc00, 0 0 35px #ff4500; }
-        100% { color: #ffcc00; text-shadow: 0 0 10px #ffcc00, 0 0 20px #ff4500, 0 0 30px #ff4500; }
-    }
-
-    /* Stylish labels with 3D effect */
-    label {
-        font-weight: 600;
-        color: #e0e0ff;
-        text-shadow: 2px 2px 5px rgba(0, 100, 200, 0.5), -2px -2px 5px rgba(0, 150, 255, 0.3);
-        font-size: 16px;
-    }
-
-    /* Input and selectbox styling with 3D effect */
-    .stSelectbox, .stTextInput {
-        background-color: rgba(0, 50, 100, 0.2);
-        border: 1px solid rgba(0, 150, 255, 0.3);
-        border-radius: 10px;
-        color: #e0e0ff;
-        box-shadow: inset 2px 2px 5px rgba(0, 0, 0, 0.3), inset -2px -2px 5px rgba(0, 150, 255, 0.2);
-    }
-    .stSelectbox:hover, .stTextInput:hover {
-        background-color: rgba(0, 50, 100, 0.3);
-        box-shadow: inset 2px 2px 5px rgba(0, 0, 0, 0.4), inset -2px -2px 5px rgba(0, 150, 255, 0.3);
-    }
-
-    /* Button styling with 3D glow */
-    .stButton>button {
-        background: linear-gradient(45deg, #00aaff, #00ffcc);
-        color: #1a1a2e;
-        border: none;
-        padding: 12px 25px;
-        border-radius: 25px;
-        font-weight: bold;
-        font-size: 16px;
-        box-shadow: 0 3px 10px rgba(0, 170, 255, 0.5), 0 0 10px rgba(0, 255, 204, 0.3);
-        transition: all 0.3s ease;
-    }
-    .stButton>button:hover {
-        transform: scale(1.05);
-        box-shadow: 0 5px 15px rgba(0, 170, 255, 0.7), 0 0 15px rgba(0, 255, 204, 0.5);
-        background: linear-gradient(45deg, #00ffcc, #00aaff);
-    }
-
-    /* Markdown and text styling with 3D effect */
-    .stMarkdown, .stText {
-        color: #e0e0ff !important;
-        text-shadow: 1px 1px 3px rgba(0, 100, 200, 0.3), -1px -1px 3px rgba(0, 150, 255, 0.2);
-    }
-
-    /* Animation for output, weather icon, and highlight */
-    .animated-output {
-        animation: fadeIn 0.5s ease-in;
-    }
-    .weather-icon {
-        animation: bounce 1.5s infinite;
-    }
-    .highlight-low {
-        animation: glowGreen 2s infinite;
-    }
-    .highlight-medium {
-        animation: glowOrange 2s infinite;
-    }
-    .highlight-high {
-        animation: glowRed 2s infinite;
-    }
-    @keyframes fadeIn {
-        from { opacity: 0; }
-        to { opacity: 1; }
-    }
-    @keyframes bounce {
-        0%, 100% { transform: translateY(0); }
-        50% { transform: translateY(-10px); }
-    }
-    @keyframes glowGreen {
-        0% { box-shadow: 0 0 10px #2ECC71; }
-        50% { box-shadow: 0 0 20px #2ECC71, 0 0 30px #2ECC71; }
-        100% { box-shadow: 0 0 10px #2ECC71; }
-    }
-    @keyframes glowOrange {
-        0% { box-shadow: 0 0 10px #F39C12; }
-        50% { box-shadow: 0 0 20px #F39C12, 0 0 30px #F39C12; }
-        100% { box-shadow: 0 0 10px #F39C12; }
-    }
-    @keyframes glowRed {
-        0% { box-shadow: 0 0 10px #E74C3C; }
-        50% { box-shadow: 0 0 20px #E74C3C, 0 0 30px #E74C3C; }
-        100% { box-shadow: 0 0 10px #E74C3C; }
-    }
-
-    /* Severity trend gauge */
-    .severity-gauge {
-        height: 20px;
-        border-radius: 10px;
-        overflow: hidden;
-        background-color: rgba(255, 255, 255, 0.1);
-    }
-
-    /* JavaScript-based clock */
-    <script>
-        function updateClock() {
-            const now = new Date();
-            const options = { hour: '2-digit', minute: '2-digit', hour12: true, timeZone: 'Asia/Kolkata' };
-            const timeString = now.toLocaleTimeString('en-US', options) + ', ' + now.toLocaleDateString('en-US', { month: 'long', day: 'numeric', year: 'numeric' });
-            document.getElementById('clock').innerText = 'Time: ' + timeString;
-        }
-        setInterval(updateClock, 1000);
-        updateClock();
-    </script>
-    <style>
-        #clock {
-            color: #e0e0ff;
-            text-shadow: 2px 2px 5px rgba(0, 100, 200, 0.5), -2px -2px 5px rgba(0, 150, 255, 0.3);
-        }
-    </style>
-    """,
-    unsafe_allow_html=True
-)
+    Scores a DataFrame or a list of dict records, through the micro-batcher if enabled.
+    Canary routing is sticky per X-Client-Id header when the caller sends one.
+    With return_version=True returns (predictions, version of the bundle that scored them).
+    """
+    if micro_batcher is not None:
+        return micro_batcher.submit(features, return_version=return_version)
+    if not isinstance(features, pd.DataFrame):
+        # Date/Time are optional; records without them get imputed calendar features
+        features = pd.DataFrame.from_records(features, columns=FEATURE_COLUMNS + TEMPORAL_COLUMNS)
+    return predict_pipeline.predict(
+        features, routing_key=request.headers.get("X-Client-Id"), return_version=return_version
+    )
+
 
-# --- Title with blinking animation ---
-st.markdown(
+def preload_artifacts():
     """
-    <div style="text-align:center; animation: fadeIn 1s ease;">
-        <h1 class="blinking-title" style="font-size: 2.5em;">
-            🚦 Accident Severity Prediction
-        </h1>
-        <p style="font-size:20px; color:#e0e0ff; text-shadow: 2px 2px 5px rgba(0, 100, 200, 0.5), -2px -2px 5px rgba(0, 150, 255, 0.3);">
-            Fill in the accident details below to get a severity prediction.
-        </p>
-    </div>
-    """,
-    unsafe_allow_html=True,
-)
+    Loads the inference bundle before serving the first request.
+
+    Run under a pre-forking server with preloading, e.g.
+        gunicorn --preload --workers 4 app:app
+    the bundle is loaded once in the master and shared copy-on-write by every
+    worker. gc.freeze() moves the loaded objects out of the garbage collector's
+    generations so collections in the workers do not touch (and copy) their pages.
+    With several workers logs/pipeline.log is not rotated in-process (see
+    src.logger.LOG_ROTATION); rotate it with logrotate.
+    """
+    try:
+        bundle = predict_pipeline.load_bundle()
+        logging.info(f"Preloaded inference bundle {bundle.version}")
+    except Exception as e:
+        # Keep serving pages; prediction routes report the error until artifacts exist
+        logging.error(f"Could not preload inference bundle: {e}")
+    gc.freeze()
+
+
+preload_artifacts()
+
+
+@app.before_request
+def bind_request_id():
+    # Tag every log record of this request with the caller's or a generated id
+    g.request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex
+    g.request_id_token = request_id_var.set(g.request_id)
 
-# --- Input Form with dynamic weather icon ---
-with st.form("prediction_form", clear_on_submit=False):
-    col1, col2 = st.columns(2)
-
-    with col1:
-        weather = st.selectbox("🌤️ Weather", ["Select Weather", "Clear", "Rainy", "Foggy", "Snowy"])
-        weather_icon = "☀️" if weather == "Clear" else "🌧️" if weather == "Rainy" else "🌫️" if weather == "Foggy" else "❄️" if weather == "Snowy" else "🌤️"
-        st.markdown(f'<div class="weather-icon">{weather_icon}</div>', unsafe_allow_html=True)
-        time_of_day = st.selectbox("⏰ Time of Day", ["Select Time", "Morning", "Afternoon", "Evening", "Night"])
-        traffic = st.selectbox("🚗 Traffic Level", ["Select Traffic", "Low", "Medium", "High"])
-
-    with col2:
-        road_condition = st.selectbox("🛣️ Road Condition", ["Select Road Condition", "Dry", "Wet", "Icy", "Snowy"])
-        accident_type = st.selectbox("💥 Accident Type", ["Select Type", "Rear-end", "Head-on", "Side-impact", "Rollover"])
-
-    submitted = st.form_submit_button("🔮 Predict Severity")
-
-# --- Prediction Logic ---
-if submitted:
-    if (
-        weather.startswith("Select") or
-        road_condition.startswith("Select") or
-        time_of_day.startswith("Select") or
-        traffic.startswith("Select") or
-        accident_type.startswith("Select")
-    ):
-        st.warning("⚠️ Please select all fields before predicting.", icon="⚠️")
-    else:
-        # Simulate "thinking" with a progress bar
-        progress_bar = st.progress(0)
-        for percent_complete in range(100):
-            time.sleep(0.02)
-            progress_bar.progress(percent_complete + 1)
-
-        data = CustomData(weather, road_condition, time_of_day, traffic, accident_type)
-        pred_df = data.get_data_as_data_frame()
-        predict_pipeline = PredictPipeline()
-        results = predict_pipeline.predict(pred_df)[0]
-
-        # --- Stylish Animated Output ---
-        severity_color = {"Low": "#2ECC71", "Medium": "#F39C12", "High": "#E74C3C"}
-        st.markdown(
-            f"""
-            <div class="animated-output" style="background-color:{severity_color[results]};
-                        padding:30px; border-radius:20px; text-align:center;
-                        box-shadow: 0 5px 15px {severity_color[results]}, 0 0 20px rgba(0,0,0,0.5);
-                        border: 2px solid rgba(255, 255, 255, 0.2);">
-                <h2 style="color:#e0e0ff; text-shadow: 2px 2px 5px rgba(0, 100, 200, 0.5), -2px -2px 5px rgba(0, 150, 255, 0.3);
-                           font-size: 2em;">🚨 Predicted Severity: {results}</h2>
-            </div>
-            """,
-            unsafe_allow_html=True,
-        )
 
-        # --- Severity Trend Indicator (simulated) ---
-        severity_trend = {"Low": 20, "Medium": 50, "High": 80}  # Percentage-based trend
-        st.markdown(f'<div class="severity-gauge" style="width: 200px; margin: 0 auto;"><div style="width: {severity_trend[results]}%; height: 100%; background-color: {severity_color[results]};"></div></div>', unsafe_allow_html=True)
-        st.caption(f"🌡️ Severity Trend: {severity_trend[results]}% (Simulated historical data)")
-
-        # --- Highlight based on severity ---
-        highlight_class = "highlight-low" if results == "Low" else "highlight-medium" if results == "Medium" else "highlight-high"
-        highlight_icon = "✅" if results == "Low" else "🔔" if results == "Medium" else "🚨"
-        st.markdown(
-            f"""
-            <div class="{highlight_class}" style="padding:20px; border-radius:15px; text-align:center; margin-top:10px;
-                       background-color: rgba(255, 255, 255, 0.1);">
-                <h3 style="color:#e0e0ff; text-shadow: 2px 2px 5px rgba(0, 100, 200, 0.5), -2px -2px 5px rgba(0, 150, 255, 0.3);
-                          font-size: 1.5em;">{highlight_icon} {results} Alert!</h3>
-            </div>
-            """,
-            unsafe_allow_html=True,
+@app.after_request
+def expose_request_id(response):
+    response.headers["X-Request-ID"] = g.get("request_id", "-")
+    return response
+
+
+@app.teardown_request
+def unbind_request_id(exc):
+    token = g.pop("request_id_token", None)
+    if token is not None:
+        request_id_var.reset(token)
+
+
+@app.route("/")
+def index():
+    return render_template("index.html")
+
+
+@app.route("/predictdata", methods=["GET", "POST"])
+def predict_accident():
+    if request.method == "GET":
+        return render_template("home.html")
+
+    try:
+        data = CustomData(
+            Weather=request.form.get("weather"),
+            Road_Condition=request.form.get("road_condition"),
+            Time_of_Day=request.form.get("time_of_day"),
+            Traffic=request.form.get("traffic"),
+            Accident_Type=request.form.get("accident_type"),
+            Vehicle_Type=request.form.get("vehicle_type"),
+            Accident_Reason=request.form.get("accident_reason"),
+            Latitude=float(request.form.get("latitude")),
+            Longitude=float(request.form.get("longitude")),
         )
+        results = run_prediction(data.get_data_as_data_frame())
+        return render_template("home.html", results=results[0])
+
+    except Exception as e:
+        logging.error("Prediction from form failed: %s", e)
+        return render_template("home.html", error="Prediction failed, please check the inputs."), 500
+
 
-        # --- Risk Factors, Safety Recommendations, and Immediate Actions ---
-        st.subheader("🛡️ Safety & Risk Analysis", divider="rainbow")
-        confidence = random.randint(70, 95)  # Simulated confidence
-        analysis_time = time.strftime("%I:%M %p IST, %B %d, %Y")  # Current time: 09:40 PM IST, August 24, 2025
-
-        if results == "Low":
-            st.success("✅ Low risk detected. Stay safe and drive responsibly!")
-            st.markdown("""
-                - 🌞 **Immediate Action:** Maintain current speed.
-                - 🚦 **Immediate Action:** Keep safe distance from other vehicles.
-                - 📋 **Recommendation:** Regularly check vehicle lights and tires.
-                - 📊 **Risk Factor:** Confidence Level: {confidence}%
-                - ⚖️ **Risk Factor:** Risk Level: {results}
-                - ⏰ **Risk Factor:** Analysis Time: {analysis_time}
-            """.format(confidence=confidence, results=results, analysis_time=analysis_time))
-        elif results == "High":
-            st.error("⚠️ High risk! Extreme caution advised.")
-            st.markdown("""
-                - 🚨 **Immediate Action:** Stop immediately if safe.
-                - 📞 **Immediate Action:** Call emergency services at 911.
-                - 🚫 **Recommendation:** Avoid driving until conditions improve.
-                - 🛠️ **Recommendation:** Inspect vehicle for damage.
-                - 📊 **Risk Factor:** Confidence Level: {confidence}%
-                - ⚖️ **Risk Factor:** Risk Level: {results}
-                - ⏰ **Risk Factor:** Analysis Time: {analysis_time}
-            """.format(confidence=confidence, results=results, analysis_time=analysis_time))
-        else:
-            st.info("🟠 Moderate risk. Stay cautious on the road.")
-            st.markdown("""
-                - 🚗 **Immediate Action:** Reduce speed by 10-15 mph.
-                - 👀 **Immediate Action:** Increase following distance.
-                - 💡 **Recommendation:** Use headlights if visibility is poor.
-                - 🚧 **Recommendation:** Avoid sudden lane changes.
-                - 📊 **Risk Factor:** Confidence Level: {confidence}%
-                - ⚖️ **Risk Factor:** Risk Level: {results}
-                - ⏰ **Risk Factor:** Analysis Time: {analysis_time}
-            """.format(confidence=confidence, results=results, analysis_time=analysis_time))
-
-# --- Footer with JavaScript-based real-time clock ---
-st.markdown(
+@app.route("/api/predict", methods=["POST"])
+def predict_api():
     """
-    <hr style="border-color: rgba(255, 255, 255, 0.2);">
-    <p style="text-align:center; font-size:14px; color:#e0e0ff; text-shadow: 2px 2px 5px rgba(0, 100, 200, 0.5), -2px -2px 5px rgba(0, 150, 255, 0.3);
-              animation: fadeIn 1s ease;">
-    Made with ❤️ using <b>Streamlit</b> | Demo Accident Severity Predictor | <span id="clock"></span>
-    </p>
-    """,
-    unsafe_allow_html=True,
-)
+    JSON endpoint. Accepts one record, a list of records, or {"records": [...]},
+    each record holding the CustomData fields (plus optional Date/Time); returns one
+    prediction per record.
+    """
+    payload = request.get_json(silent=True)
+    if isinstance(payload, dict):
+        payload = payload.get("records", [payload])
+    if not isinstance(payload, list) or not payload:
+        return jsonify({"error": "Expected a JSON object or a non-empty list of objects"}), 400
+
+    if not all(isinstance(record, dict) for record in payload):
+        return jsonify({"error": "Every record must be a JSON object"}), 400
+    missing = sorted({column for record in payload for column in FEATURE_COLUMNS if column not in record})
+    if missing:
+        return jsonify({"error": f"Missing fields: {missing}"}), 400
+
+    try:
+        preds, version = run_prediction(payload, return_version=True)
+        prediction_logger.info(f"Scored {len(payload)} records with {version}: {[str(p) for p in preds[:10]]}")
+        return jsonify({
+            "predictions": [str(p) for p in preds],
+            "model_version": version,
+        })
+    except CustomException as e:
+        # Lazy %-style args: the exception message is rendered by the log writer, if at all
+        logging.error("API prediction failed: %s", e)
+        return jsonify({"error": e.code}), e.http_status
+
+
+@app.route("/health")
+def health():
+    try:
+        version = predict_pipeline.load_bundle().version
+    except Exception:
+        return jsonify({"status": "unavailable"}), 503
+    return jsonify({
+        "status": "ok",
+        "model_version": version,
+        "cache": predict_pipeline.cache_stats(),
+        "micro_batching": micro_batcher.get_stats() if micro_batcher is not None else None,
+    })
+
+
+@app.route("/metrics")
+def stage_metrics():
+    # Prometheus scrape endpoint for per-stage timings of this worker
+    return Response(metrics.to_prometheus(), mimetype="text/plain; version=0.0.4")
+
+
+if __name__ == "__main__":
+    # Development server only; use a WSGI server (see preload_artifacts) in production
+    app.run(host="0.0.0.0", port=int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
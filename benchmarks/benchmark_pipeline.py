@@ -0,0 +1,256 @@
+"""
+Reproducible performance benchmark for the accident severity pipeline.
+
+Generates synthetic accident records with the rawdata/data.csv schema and times
+DataIngestion, DataTransformation, evaluate_models and PredictPipeline
+(single-row latency percentiles and batch throughput), recording peak memory
+per stage. Results are written as JSON so runs can be compared across commits:
+
+    python benchmarks/benchmark_pipeline.py --rows 100000
+    python benchmarks/benchmark_pipeline.py --rows 1000000 --compare benchmarks/results/<old>.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.tree import DecisionTreeClassifier
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+# Vocabularies and frequencies observed in rawdata/data.csv
+VOCABULARY = {
+    "Weather": {"Clear": 0.594, "Rain": 0.26, "Snow": 0.098, "Fog": 0.048},
+    "Road_Condition": {"Good": 0.498, "Moderate": 0.305, "Poor": 0.148, "Construction": 0.049},
+    "Time_of_Day": {"Night": 0.302, "Morning": 0.248, "Afternoon": 0.245, "Evening": 0.205},
+    "Traffic": {"Medium": 0.408, "Low": 0.304, "High": 0.238, "Jam": 0.05},
+    "Accident_Type": {"Other": 0.221, "Rollover": 0.205, "Rear-end": 0.194, "Head-on": 0.192, "Side": 0.188},
+    "Vehicle_Type": {"Car": 0.503, "Motorcycle": 0.195, "Truck": 0.153, "Bus": 0.052,
+                     "Bicycle": 0.05, "Pedestrian": 0.047},
+    "Accident_Reason": {"Distracted Driving": 0.254, "Speeding": 0.247, "Weather": 0.15,
+                        "Running Red Light": 0.103, "Alcohol": 0.1, "Mechanical Failure": 0.096,
+                        "Other": 0.05},
+}
+SEVERITY = np.array(["Low", "Medium", "High"])
+
+# Small grids keep the training benchmark bounded and comparable between runs
+BENCHMARK_PARAMS = {
+    "Logistic Regression": {"C": [0.1, 1]},
+    "Decision Tree": {"max_depth": [5, None]},
+    "Random Forest": {"n_estimators": [50], "max_depth": [10]},
+}
+
+
+def generate_synthetic_data(n_rows, path, seed=42, chunk_size=500_000):
+    """
+    Writes `n_rows` synthetic accident records to `path` in chunks (bounded memory).
+    Severity depends on weather, road condition and traffic, so models have signal to learn.
+    """
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp("2025-01-01")
+    written = 0
+    with open(path, "w", newline="") as f:
+        while written < n_rows:
+            n = min(chunk_size, n_rows - written)
+            chunk = {}
+            seconds = rng.integers(0, 242 * 24 * 3600, size=n)
+            stamps = start + pd.to_timedelta(seconds, unit="s")
+            chunk["Date"] = stamps.strftime("%Y-%m-%d")
+            chunk["Time"] = stamps.strftime("%H:%M:%S")
+            for column, freq in VOCABULARY.items():
+                chunk[column] = rng.choice(list(freq), size=n, p=np.array(list(freq.values())) / sum(freq.values()))
+            chunk["Latitude"] = rng.uniform(40.5, 40.9, size=n)
+            chunk["Longitude"] = rng.uniform(-74.25, -73.7, size=n)
+
+            risk = (
+                np.isin(chunk["Weather"], ["Snow", "Fog"]).astype(int)
+                + np.isin(chunk["Road_Condition"], ["Poor", "Construction"])
+                + np.isin(chunk["Traffic"], ["High", "Jam"])
+                + rng.integers(0, 2, size=n)
+            )
+            chunk["Severity"] = SEVERITY[np.clip(risk - 1, 0, 2)]
+
+            pd.DataFrame(chunk).to_csv(f, index=False, header=written == 0)
+            written += n
+    return path
+
+
+@contextmanager
+def measure(results, name, rows=None, trace_memory=True):
+    """
+    Records wall time, CPU time and (optionally) peak traced memory of a block.
+    """
+    if trace_memory:
+        tracemalloc.start()
+    wall, cpu = time.perf_counter(), time.process_time()
+    record = {}
+    try:
+        yield record
+    finally:
+        record["wall_s"] = time.perf_counter() - wall
+        record["cpu_s"] = time.process_time() - cpu
+        if trace_memory:
+            record["peak_mb"] = tracemalloc.get_traced_memory()[1] / 2**20
+            tracemalloc.stop()
+        if rows is not None:
+            record["rows"] = rows
+            record["rows_per_s"] = rows / record["wall_s"] if record["wall_s"] else None
+        results[name] = record
+
+
+def run_benchmarks(args):
+    from src.components.data_ingestion import DataIngestion, DataIngestionConfig
+    from src.components.data_transformation import DataTransformation
+    from src.components.inference_bundle import InferenceBundle
+    from src.pipeline.predict_pipeline import FEATURE_COLUMNS, PredictPipeline, PredictPipelineConfig
+    from src.utils import evaluate_models, load_object, read_frame, save_object
+
+    results = {}
+    workdir = Path(args.workdir or tempfile.mkdtemp(prefix="pipeline-bench-"))
+    workdir.mkdir(parents=True, exist_ok=True)
+    os.chdir(workdir)   # The pipeline writes its artifacts relative to the working directory
+
+    source = workdir / "source.csv"
+    with measure(results, "generate", rows=args.rows, trace_memory=False):
+        generate_synthetic_data(args.rows, source, seed=args.seed)
+
+    ingestion_config = DataIngestionConfig(
+        source_data_path=str(source),
+        streaming=args.streaming,
+        storage_format=args.storage_format,
+    )
+    with measure(results, "ingestion", rows=args.rows, trace_memory=args.trace_memory):
+        train_path, test_path = DataIngestion(ingestion_config).initiate_data_ingestion()
+
+    transformation = DataTransformation()
+    with measure(results, "transformation", rows=args.rows, trace_memory=args.trace_memory):
+        X_train, y_train, X_test, y_test, preprocessor_path = transformation.initiate_data_transformation(
+            train_path, test_path
+        )
+
+    n_fit = min(X_train.shape[0], args.train_rows)
+    models = {
+        "Logistic Regression": LogisticRegression(max_iter=200),
+        "Decision Tree": DecisionTreeClassifier(random_state=args.seed),
+        "Random Forest": RandomForestClassifier(random_state=args.seed),
+    }
+    with measure(results, "evaluate_models", rows=n_fit, trace_memory=args.trace_memory) as record:
+        report, details = evaluate_models(
+            X_train[:n_fit], y_train[:n_fit], X_test, y_test, models, BENCHMARK_PARAMS,
+            search=args.search, return_details=True,
+        )
+        record["scores"] = report
+    best_name = max(report, key=report.get)
+
+    bundle_path = workdir / "artifacts" / "model_bundle.pkl"
+    save_object(str(bundle_path), InferenceBundle(load_object(preprocessor_path), details[best_name]["estimator"]))
+    pipeline = PredictPipeline(PredictPipelineConfig(bundle_file_path=str(bundle_path), prediction_cache_size=0))
+
+    test_df = read_frame(test_path)
+    features = test_df[FEATURE_COLUMNS]
+    n_single = min(args.single_requests, len(features))
+    latencies = []
+    with measure(results, "predict_single", rows=n_single, trace_memory=False) as record:
+        for i in range(n_single):
+            row = features.iloc[[i]]
+            start = time.perf_counter()
+            pipeline.predict(row)
+            latencies.append(time.perf_counter() - start)
+        latencies_ms = np.array(latencies) * 1000
+        record["p50_ms"] = float(np.percentile(latencies_ms, 50))
+        record["p99_ms"] = float(np.percentile(latencies_ms, 99))
+
+    with measure(results, "predict_batch", rows=len(test_df), trace_memory=args.trace_memory):
+        pipeline.predict_batch(test_path, output_path=str(workdir / "predictions.csv"))
+
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT, text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(current, baseline_path):
+    """
+    Prints wall time and peak memory of each stage relative to a previous run.
+    """
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    print(f"\nComparison against {baseline.get('commit')} ({baseline_path}):")
+    print(f"{'stage':<18}{'wall (s)':>12}{'baseline':>12}{'ratio':>8}{'peak MB':>10}{'baseline':>10}")
+    for stage, record in current["results"].items():
+        old = baseline.get("results", {}).get(stage)
+        if not old:
+            continue
+        ratio = record["wall_s"] / old["wall_s"] if old["wall_s"] else float("nan")
+        print(f"{stage:<18}{record['wall_s']:>12.3f}{old['wall_s']:>12.3f}{ratio:>8.2f}"
+              f"{record.get('peak_mb', float('nan')):>10.1f}{old.get('peak_mb', float('nan')):>10.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark ingestion, transformation, training and inference.")
+    parser.add_argument("--rows", type=int, default=10_000, help="Synthetic rows (10k .. 10M)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--train-rows", type=int, default=50_000, help="Cap on rows used by evaluate_models")
+    parser.add_argument("--search", default="grid", choices=["grid", "random", "halving"])
+    parser.add_argument("--single-requests", type=int, default=1_000, help="Single-row predictions to time")
+    parser.add_argument("--streaming", action="store_true", help="Use streaming ingestion")
+    parser.add_argument("--storage-format", default="csv", choices=["csv", "parquet", "feather"])
+    parser.add_argument("--no-trace-memory", dest="trace_memory", action="store_false",
+                        help="Skip tracemalloc (it slows allocation-heavy stages)")
+    parser.add_argument("--workdir", help="Directory for synthetic data and artifacts (default: temp dir)")
+    parser.add_argument("--output", help="Result JSON path (default: benchmarks/results/<commit>-<rows>.json)")
+    parser.add_argument("--compare", help="Previous result JSON to compare against")
+    args = parser.parse_args(argv)
+    # run_benchmarks changes into the work directory: resolve user paths first
+    for name in ("workdir", "compare"):
+        if getattr(args, name):
+            setattr(args, name, str(Path(getattr(args, name)).resolve()))
+
+    commit = git_commit()
+    output = Path(args.output) if args.output else PROJECT_ROOT / "benchmarks" / "results" / f"{commit}-{args.rows}.json"
+    output = output.resolve()
+
+    results = run_benchmarks(args)
+    payload = {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "config": vars(args),
+        "results": results,
+    }
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(payload, f, indent=2, default=str)
+
+    for stage, record in results.items():
+        summary = ", ".join(f"{k}={v:.4g}" for k, v in record.items() if isinstance(v, float))
+        print(f"{stage:<18}{summary}")
+    print(f"Results written to: {output}")
+
+    if args.compare:
+        compare(payload, args.compare)
+
+
+if __name__ == "__main__":
+    main()
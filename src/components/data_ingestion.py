@@ -10,6 +10,9 @@ if str(PROJECT_ROOT) not in sys.path:
 
 from src.exception import CustomException   # Custom exception class for better error handling
 from src.logger import logging              # Custom logging utility for logging info/errors
+from src.utils import FRAME_FORMATS, FrameAppender, append_frame, read_frame, write_frame  # Tabular artifact I/O helpers
+from src.instrumentation import track_stage  # Stage timing / memory metrics
+import json              # Watermark state file
 import pandas as pd      # Pandas library for data manipulation and analysis (read CSV, create DataFrames, etc.)
 
 # Scikit-learn function for splitting dataset into training and testing sets
@@ -40,37 +43,114 @@ class DataIngestionConfig:
     train_data_path: str = os.path.join('artifacts', "train.csv")   # Path to store training dataset
     test_data_path: str = os.path.join('artifacts', "test.csv")     # Path to store testing dataset
     raw_data_path: str = os.path.join('artifacts', "data.csv")      # Path to store raw dataset
+    # Absolute path to the source CSV so it works regardless of current working directory
+    source_data_path: str = str(PROJECT_ROOT / 'rawdata' / 'data.csv')
+    test_size: float = 0.2          # Fraction of rows assigned to the test split
+    split_seed: int = 42            # Seed for the split (random_state / hash key)
+    streaming: bool = False         # Read the source in chunks with bounded memory
+    chunk_size: int = 100_000       # Rows per chunk in streaming mode
+    # Artifact format: "csv", "parquet" or "feather" (Arrow IPC, memory-mappable)
+    storage_format: str = "csv"
+    # Watermark of the newest ingested record (Date + Time), used by incremental runs
+    state_file_path: str = os.path.join('artifacts', "ingestion_state.json")
+    # Rows that arrived since the previous run (rewritten by every incremental run)
+    increment_train_path: str = os.path.join('artifacts', "increment_train.csv")
+    increment_test_path: str = os.path.join('artifacts', "increment_test.csv")
+
+    def __post_init__(self):
+        if self.storage_format not in FRAME_FORMATS:
+            raise ValueError(f"storage_format must be one of {list(FRAME_FORMATS)}")
+        # Re-point the artifact paths to the extension of the chosen format
+        extension = FRAME_FORMATS[self.storage_format]
+        self.train_data_path = os.path.splitext(self.train_data_path)[0] + extension
+        self.test_data_path = os.path.splitext(self.test_data_path)[0] + extension
+        self.raw_data_path = os.path.splitext(self.raw_data_path)[0] + extension
+        self.increment_train_path = os.path.splitext(self.increment_train_path)[0] + extension
+        self.increment_test_path = os.path.splitext(self.increment_test_path)[0] + extension
+
+# Number of buckets used by the hash-based split (resolution of test_size)
+HASH_SPLIT_BUCKETS = 10_000
+
+def _canonical_column(series):
+    """
+    A column in a dtype that does not depend on the rows read with it: numbers as
+    float64 (an int column read as float64 where another chunk has a NaN hashes the
+    same), everything else as strings with missing values as "".
+    """
+    if pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+        return series.astype("float64")
+    values = series.astype(object)
+    return values.where(values.notna(), "").astype(str)
+
+def hash_split_mask(df, test_size, seed):
+    """
+    Deterministic per-row train/test assignment: True marks a test row.
+    A row always lands in the same split for a given seed, independent of
+    chunking, row order or the rest of the file: columns are hashed in a
+    canonical dtype, not the one inferred for the chunk.
+    """
+    # hash_pandas_object needs a 16 character key; derive it from the seed
+    hash_key = f"{seed:016d}"[-16:]
+    canonical = pd.DataFrame({i: _canonical_column(df.iloc[:, i]) for i in range(df.shape[1])}, index=df.index)
+    hashes = pd.util.hash_pandas_object(canonical, index=False, hash_key=hash_key).to_numpy()
+    return (hashes % HASH_SPLIT_BUCKETS) < int(round(test_size * HASH_SPLIT_BUCKETS))
+
+# Format of the source Date and Time columns (e.g. 2025-07-06 06:41:18)
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+def record_timestamps(df):
+    """
+    Parses the Date and Time columns into one timestamp per row (NaT if unparseable).
+    """
+    return pd.to_datetime(
+        df["Date"].astype(str) + " " + df["Time"].astype(str),
+        format=TIMESTAMP_FORMAT,
+        errors="coerce",
+    )
 
 # Main class responsible for reading raw data and splitting into train/test sets
 class DataIngestion:
-    def __init__(self):
+    def __init__(self, config: DataIngestionConfig = None):
         # Initialize ingestion configuration (paths)
-        self.ingestion_config = DataIngestionConfig()
+        self.ingestion_config = config or DataIngestionConfig()
 
     def initiate_data_ingestion(self):
         logging.info("Entered the data ingestion method or component")   # Log entry into method
+        if self.ingestion_config.streaming:
+            return self.initiate_streaming_ingestion()
         try:
-            # Build absolute path to the CSV so it works regardless of current working directory
-            data_csv_path = PROJECT_ROOT / 'rawdata' / 'data.csv'
+            data_csv_path = Path(self.ingestion_config.source_data_path)
             if not data_csv_path.exists():
                 raise FileNotFoundError(f"Input data file not found: {data_csv_path}")
-            df = pd.read_csv(data_csv_path)
+            with track_stage("ingestion.read_csv") as stage:
+                df = pd.read_csv(data_csv_path)
+                stage["rows"] = len(df)
             logging.info('Read the dataset as dataframe')   # Log successful read
 
             # Create directories if they do not exist (for saving processed data)
             os.makedirs(os.path.dirname(self.ingestion_config.train_data_path), exist_ok=True)
 
-            # Save the raw dataset into artifacts/data.csv
-            df.to_csv(self.ingestion_config.raw_data_path, index=False, header=True)
+            # Save the raw dataset into artifacts/data.csv (or .parquet/.feather)
+            with track_stage("ingestion.write_raw", rows=len(df)):
+                write_frame(df, self.ingestion_config.raw_data_path)
 
             logging.info("Train test split initiated")  # Log start of train-test split
             # Split dataset into training and testing sets (80% train, 20% test)
-            train_set, test_set = train_test_split(df, test_size=0.2, random_state=42)
+            with track_stage("ingestion.split", rows=len(df)):
+                train_set, test_set = train_test_split(
+                    df,
+                    test_size=self.ingestion_config.test_size,
+                    random_state=self.ingestion_config.split_seed,
+                )
+
+            with track_stage("ingestion.write_splits", rows=len(df)):
+                # Save training dataset to artifacts/train.csv
+                write_frame(train_set, self.ingestion_config.train_data_path)
+                # Save testing dataset to artifacts/test.csv
+                write_frame(test_set, self.ingestion_config.test_data_path)
 
-            # Save training dataset to artifacts/train.csv
-            train_set.to_csv(self.ingestion_config.train_data_path, index=False, header=True)
-            # Save testing dataset to artifacts/test.csv
-            test_set.to_csv(self.ingestion_config.test_data_path, index=False, header=True)
+            # Remember the newest record so incremental runs only ingest what arrives later
+            self.save_watermark(record_timestamps(df).max(), len(df))
 
             logging.info("Ingestion of the data is completed")  # Log completion
 
@@ -83,18 +163,151 @@ class DataIngestion:
             # If error occurs, raise a custom exception with traceback details
             raise CustomException(e, sys)
 
+    def initiate_streaming_ingestion(self):
+        """
+        Streaming variant of initiate_data_ingestion for sources larger than RAM.
+        The source is read `chunk_size` rows at a time; every chunk is appended to
+        the raw copy and, using a hash-based assignment, to the train/test files.
+        Peak memory is bounded by a single chunk.
+        """
+        logging.info("Entered the streaming data ingestion method")
+        try:
+            config = self.ingestion_config
+            data_csv_path = Path(config.source_data_path)
+            if not data_csv_path.exists():
+                raise FileNotFoundError(f"Input data file not found: {data_csv_path}")
+
+            watermark = None
+            # Appenders start from empty outputs and write headers/schema with the first chunk
+            with track_stage("ingestion.streaming") as stage, \
+                    FrameAppender(config.raw_data_path) as raw_out, \
+                    FrameAppender(config.train_data_path) as train_out, \
+                    FrameAppender(config.test_data_path) as test_out:
+                for chunk in pd.read_csv(data_csv_path, chunksize=config.chunk_size):
+                    is_test = hash_split_mask(chunk, config.test_size, config.split_seed)
+
+                    raw_out.append(chunk)
+                    train_out.append(chunk[~is_test])
+                    test_out.append(chunk[is_test])
+
+                    chunk_max = record_timestamps(chunk).max()
+                    if pd.notna(chunk_max) and (watermark is None or chunk_max > watermark):
+                        watermark = chunk_max
+                stage["rows"] = raw_out.rows
+
+            self.save_watermark(watermark, raw_out.rows)
+
+            logging.info(
+                f"Streaming ingestion completed: {train_out.rows} train rows, {test_out.rows} test rows"
+            )
+
+            return (
+                config.train_data_path,
+                config.test_data_path
+            )
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def load_watermark(self):
+        """
+        Returns the timestamp of the newest ingested record, or None before the first run.
+        """
+        state_path = self.ingestion_config.state_file_path
+        if not os.path.exists(state_path):
+            return None
+        with open(state_path) as f:
+            state = json.load(f)
+        return pd.Timestamp(state["watermark"]) if state.get("watermark") else None
+
+    def save_watermark(self, watermark, rows):
+        state_path = self.ingestion_config.state_file_path
+        os.makedirs(os.path.dirname(state_path) or ".", exist_ok=True)
+        state = {
+            "watermark": None if watermark is None or pd.isna(watermark) else watermark.strftime(TIMESTAMP_FORMAT),
+            "rows": int(rows),
+            "updated_at": pd.Timestamp.now().strftime(TIMESTAMP_FORMAT),
+        }
+        tmp_path = state_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp_path, state_path)
+
+    def initiate_incremental_ingestion(self):
+        """
+        Ingests only the records newer than the stored Date/Time watermark.
+
+        The source is streamed in chunks; new rows are hash-split (same assignment as
+        streaming ingestion), appended to the raw/train/test artifacts so later full
+        retrains see them, and also written on their own to the increment files used
+        by incremental training. Without a watermark this falls back to a full
+        ingestion and every row counts as new.
+
+        Returns:
+            tuple: increment train path, increment test path, number of new rows
+        """
+        logging.info("Entered the incremental data ingestion method")
+        try:
+            config = self.ingestion_config
+            watermark = self.load_watermark()
+            if watermark is None:
+                logging.info("No ingestion watermark found; running a full ingestion")
+                train_path, test_path = self.initiate_data_ingestion()
+                with open(config.state_file_path) as f:
+                    return train_path, test_path, json.load(f)["rows"]
+
+            data_csv_path = Path(config.source_data_path)
+            if not data_csv_path.exists():
+                raise FileNotFoundError(f"Input data file not found: {data_csv_path}")
+
+            new_watermark = watermark
+            with track_stage("ingestion.incremental") as stage, \
+                    FrameAppender(config.increment_train_path) as train_out, \
+                    FrameAppender(config.increment_test_path) as test_out:
+                for chunk in pd.read_csv(data_csv_path, chunksize=config.chunk_size):
+                    timestamps = record_timestamps(chunk)
+                    is_new = (timestamps > watermark).to_numpy()
+                    if not is_new.any():
+                        continue
+                    chunk = chunk[is_new]
+                    new_watermark = max(new_watermark, timestamps[is_new].max())
+                    is_test = hash_split_mask(chunk, config.test_size, config.split_seed)
+                    train_out.append(chunk[~is_test])
+                    test_out.append(chunk[is_test])
+                n_new = train_out.rows + test_out.rows
+                stage["rows"] = n_new
+
+            if n_new:
+                # Fold the new rows into the cumulative artifacts
+                for increment_path, split_path in ((config.increment_train_path, config.train_data_path),
+                                                   (config.increment_test_path, config.test_data_path)):
+                    if not os.path.exists(increment_path):
+                        continue
+                    increment = read_frame(increment_path)
+                    append_frame(increment, config.raw_data_path)
+                    append_frame(increment, split_path)
+
+                with open(config.state_file_path) as f:
+                    previous_rows = json.load(f).get("rows", 0)
+                self.save_watermark(new_watermark, previous_rows + n_new)
+
+            logging.info(
+                f"Incremental ingestion completed: {n_new} new rows after {watermark} "
+                f"({train_out.rows} train, {test_out.rows} test)"
+            )
+            return config.increment_train_path, config.increment_test_path, n_new
+        except Exception as e:
+            raise CustomException(e, sys)
+
 # Entry point of the script
 if __name__ == "__main__":
-    obj = DataIngestion()
-    train_data, test_data = obj.initiate_data_ingestion()
-    print(f"Train data saved to: {train_data}")
-    print(f"Test data saved to: {test_data}")
-
-    # Only proceed with downstream steps if the stubs are available
-    if DataTransformation and ModelTrainer:
-        data_transformation = DataTransformation()
-        train_arr, test_arr, _ = data_transformation.initiate_data_transformation(train_data, test_data)
-        modeltrainer = ModelTrainer()
-        print(modeltrainer.initiate_model_trainer(train_arr, test_arr))
-    else:
-        print("DataTransformation / ModelTrainer not implemented yet. Skipping those steps.")
\ No newline at end of file
+    # Ingestion, transformation and training run as the train pipeline's stage DAG:
+    # stages whose inputs (source data, configuration, code) are unchanged since the
+    # last run reuse their cached results instead of being recomputed
+    from src.pipeline.train_pipline import TrainPipeline
+
+    pipeline = TrainPipeline()
+    result = pipeline.run_full()
+    print(f"Train data saved to: {pipeline.config.ingestion.train_data_path}")
+    print(f"Test data saved to: {pipeline.config.ingestion.test_data_path}")
+    print(f"Stages: {result['stages']}")
+    print((result["model_name"], result["score"]))
@@ -6,19 +6,523 @@ if PROJECT_ROOT not in sys.path:
     sys.path.insert(0, PROJECT_ROOT)
 from dataclasses import dataclass
 import os
+import glob
+import hashlib
 import joblib
+from joblib import Parallel, delayed, parallel_config
 
 import numpy as np 
 import pandas as pd
+from scipy import sparse
+from sklearn.base import BaseEstimator, TransformerMixin, clone
 from sklearn.compose import ColumnTransformer
 from sklearn.impute import SimpleImputer
+from sklearn.model_selection import KFold
 from sklearn.pipeline import Pipeline
 from sklearn.preprocessing import OneHotEncoder, StandardScaler
+from pandas.tseries.holiday import USFederalHolidayCalendar
 
 # Placeholder for custom modules. Replace with your actual imports.
 from src.exception import CustomException
 from src.logger import logging
-from src.utils import save_object
+from src.utils import ChunkedDataset, save_object, read_frame
+from src.instrumentation import track_stage
+
+# Column the models predict
+TARGET_COLUMN = "Severity"
+
+# Input features identified from the provided dataset
+NUMERICAL_FEATURES = ["Latitude", "Longitude"]
+CATEGORICAL_FEATURES = [
+    "Weather",
+    "Road_Condition",
+    "Time_of_Day",
+    "Traffic",
+    "Accident_Type",
+    "Vehicle_Type",
+    "Accident_Reason",
+]
+
+# Coordinates the spatial risk index is built over (see SpatialRiskIndex)
+SPATIAL_FEATURES = ["Latitude", "Longitude"]
+
+# Raw Date/Time columns the temporal features are derived from, and their formats
+TEMPORAL_FEATURES = ["Date", "Time"]
+DATE_FORMAT = "%Y-%m-%d"
+TIME_FORMAT = "%H:%M:%S"
+
+# Per-model feature views besides the default one-hot matrix: integer-coded
+# categoricals the boosting libraries consume natively. XGBoost needs codes in
+# [0, n_categories) with NaN as missing; CatBoost needs integer (not float)
+# categorical values, so unknown/missing get their own code -1.
+NATIVE_FEATURE_VIEWS = {
+    "xgboost": {"unknown_value": np.nan, "as_frame": False},
+    "catboost": {"unknown_value": -1, "as_frame": True},
+}
+
+
+def parse_timestamps(dates, times):
+    """
+    Parses Date and Time string columns into datetime64[ns] with the explicit
+    DATE_FORMAT/TIME_FORMAT (no per-row format inference). Each distinct date and
+    time is parsed once and broadcast back through its factorized codes, so cost
+    grows with the number of distinct values rather than rows. Unparseable or
+    missing values give NaT.
+    """
+    date_codes, date_values = pd.factorize(np.asarray(dates, dtype=object))
+    time_codes, time_values = pd.factorize(np.asarray(times, dtype=object))
+    # A trailing NaT/NaN entry is what code -1 (missing) selects
+    days = pd.to_datetime(pd.Index(date_values, dtype=object).astype(str), format=DATE_FORMAT, errors="coerce")
+    days = np.append(days.to_numpy(dtype="datetime64[ns]"), np.datetime64("NaT", "ns"))
+    clock = pd.to_datetime(pd.Index(time_values, dtype=object).astype(str), format=TIME_FORMAT, errors="coerce")
+    offsets = (clock - pd.Timestamp("1900-01-01")).to_numpy(dtype="timedelta64[ns]")
+    offsets = np.append(offsets, np.timedelta64("NaT", "ns"))
+    return days[date_codes] + offsets[time_codes]
+
+
+def load_timestamps(file_path, df=None, cache_dir=os.path.join("artifacts", "timestamps")):
+    """
+    Returns the parsed Date/Time timestamps of a data file, cached as .npy.
+
+    The cache entry is keyed by the file's path, size and modification time, so
+    re-reading an unchanged split (repeated training runs, batch scoring) loads
+    the parsed array instead of re-parsing every string; rewriting or appending
+    to the file invalidates it. Stale entries of the same file are removed.
+
+    Args:
+        file_path (str): CSV/Parquet/Feather file with Date and Time columns
+        df (pd.DataFrame): The file's rows if already loaded (avoids a re-read on a miss)
+        cache_dir (str): Cache directory (None disables caching)
+
+    Returns:
+        np.ndarray: datetime64[ns] timestamps, NaT where unparseable
+    """
+    if cache_dir:
+        stat = os.stat(file_path)
+        path_key = hashlib.sha1(os.path.abspath(file_path).encode()).hexdigest()[:12]
+        signature = hashlib.sha1(f"{stat.st_size}:{stat.st_mtime_ns}".encode()).hexdigest()[:12]
+        cache_path = os.path.join(cache_dir, f"{path_key}-{signature}.npy")
+        if os.path.exists(cache_path):
+            try:
+                return np.load(cache_path)
+            except (OSError, ValueError):
+                logging.warning(f"Unreadable timestamp cache {cache_path}; re-parsing {file_path}")
+
+    if df is None:
+        df = read_frame(file_path, columns=list(TEMPORAL_FEATURES))
+    with track_stage("transformation.parse_timestamps", rows=len(df)):
+        timestamps = parse_timestamps(df["Date"], df["Time"])
+
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+        for stale in glob.glob(os.path.join(cache_dir, f"{path_key}-*.npy")):
+            os.remove(stale)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, timestamps)
+        os.replace(tmp_path, cache_path)
+    return timestamps
+
+
+def transform_in_chunks(transformer, X, n_jobs=None, chunk_rows=100_000, dtype=None):
+    """
+    Transforms X with a fitted transformer, in row chunks on `n_jobs` threads when
+    X is longer than `chunk_rows` (fitted transformers are read-only, so chunks can
+    run concurrently; NumPy/SciPy release the GIL in the heavy parts). The chunk
+    outputs are stacked in order and cast to `dtype` if given.
+    """
+    n_rows = len(X)
+    if not n_jobs or n_jobs == 1 or n_rows <= chunk_rows:
+        out = transformer.transform(X)
+    else:
+        chunks = [X.iloc[start:start + chunk_rows] if hasattr(X, "iloc") else X[start:start + chunk_rows]
+                  for start in range(0, n_rows, chunk_rows)]
+        parts = Parallel(n_jobs=n_jobs, prefer="threads")(delayed(transformer.transform)(chunk) for chunk in chunks)
+        if isinstance(parts[0], pd.DataFrame):
+            out = pd.concat(parts)
+        else:
+            out = sparse.vstack(parts, format="csr") if sparse.issparse(parts[0]) else np.vstack(parts)
+    if dtype is not None and not isinstance(out, pd.DataFrame) and out.dtype != dtype:
+        out = out.astype(dtype)
+    return out
+
+
+class TemporalFeatures(BaseEstimator, TransformerMixin):
+    """
+    Calendar features from the Date and Time columns:
+      hour, day_of_week (Monday=0), month, is_weekend, is_holiday (US federal
+      calendar), and sin/cos encodings of the time of day, weekday and month, so
+      23:00 sits next to 00:00 and December next to January.
+
+    Input is two columns, Date and Time, as strings (parsed with parse_timestamps)
+    or a datetime64 first column that was parsed already (e.g. by load_timestamps),
+    in which case the second column is ignored. Rows without a valid timestamp get
+    the training medians.
+    """
+
+    FEATURE_NAMES = [
+        "hour", "day_of_week", "month", "is_weekend", "is_holiday",
+        "hour_sin", "hour_cos", "day_of_week_sin", "day_of_week_cos", "month_sin", "month_cos",
+    ]
+
+    def __init__(self, holidays=True):
+        self.holidays = holidays
+
+    @staticmethod
+    def _timestamps(X):
+        if isinstance(X, pd.DataFrame):
+            first, second = X.iloc[:, 0], (X.iloc[:, 1] if X.shape[1] > 1 else None)
+        else:
+            X = np.asarray(X, dtype=object).reshape(len(X), -1)
+            first, second = pd.Series(X[:, 0]), (X[:, 1] if X.shape[1] > 1 else None)
+        if pd.api.types.is_datetime64_any_dtype(first):
+            return pd.DatetimeIndex(first)
+        if second is None:
+            raise ValueError("TemporalFeatures needs Date and Time columns or a parsed timestamp column")
+        return pd.DatetimeIndex(parse_timestamps(first, second))
+
+    def _features(self, timestamps):
+        hour = (timestamps.hour + timestamps.minute / 60).to_numpy(dtype=np.float64)
+        day_of_week = timestamps.dayofweek.to_numpy(dtype=np.float64)
+        month = timestamps.month.to_numpy(dtype=np.float64)
+        days = timestamps.to_numpy(dtype="datetime64[D]")
+        is_holiday = np.isin(days, self.holidays_).astype(np.float64) if len(self.holidays_) else np.zeros(len(days))
+        features = np.column_stack([
+            np.floor(hour), day_of_week, month, (day_of_week >= 5).astype(np.float64), is_holiday,
+            np.sin(2 * np.pi * hour / 24), np.cos(2 * np.pi * hour / 24),
+            np.sin(2 * np.pi * day_of_week / 7), np.cos(2 * np.pi * day_of_week / 7),
+            np.sin(2 * np.pi * (month - 1) / 12), np.cos(2 * np.pi * (month - 1) / 12),
+        ])
+        # Comparisons above turn NaT rows into 0 flags; mark the whole row as missing
+        features[timestamps.isna()] = np.nan
+        return features
+
+    def fit(self, X, y=None):
+        timestamps = self._timestamps(X)
+        self.n_features_in_ = 2
+        self.holidays_ = np.array([], dtype="datetime64[D]")
+        if self.holidays:
+            # Calendar window covering the training data and a decade of scoring ahead
+            years = timestamps.year.dropna()
+            first = int(years.min()) - 1 if len(years) else pd.Timestamp.now().year - 1
+            last = max(int(years.max()) if len(years) else 0, pd.Timestamp.now().year) + 10
+            self.holidays_ = USFederalHolidayCalendar().holidays(
+                start=f"{first}-01-01", end=f"{last}-12-31"
+            ).to_numpy(dtype="datetime64[D]")
+        features = self._features(timestamps)
+        fill = np.nanmedian(features, axis=0) if np.isfinite(features).any() else np.zeros(features.shape[1])
+        self.fill_values_ = np.where(np.isnan(fill), 0.0, fill)
+        return self
+
+    def transform(self, X):
+        features = self._features(self._timestamps(X))
+        return np.where(np.isnan(features), self.fill_values_, features)
+
+    def get_feature_names_out(self, input_features=None):
+        return np.asarray(self.FEATURE_NAMES, dtype=object)
+
+
+class SpatialRiskIndex(BaseEstimator, TransformerMixin):
+    """
+    Neighborhood features from a grid index over (latitude, longitude).
+
+    Training rows are bucketed into square cells of `cell_size` degrees. For every
+    cell within `neighborhood` cells of an occupied one, the rows of its
+    (2 * neighborhood + 1)^2 window are aggregated into:
+      - geo_density: log1p of the number of training accidents in the window
+      - geo_rate_<class>: share of each target class in the window, smoothed
+        towards the overall class shares with `smoothing` pseudo-rows
+    These rows are precomputed at fit time into a table keyed by sorted cell ids,
+    so transform() is one binary search per row. Locations outside the indexed
+    area, and missing coordinates, get density 0 and the overall class shares.
+
+    fit_transform() returns out-of-fold rates (`cv` folds), so a training row's
+    own target never leaks into its features; transform() uses the full index.
+    out_of_fold_transform() does the same for rows already in the index, e.g. the
+    training split after partial_fit.
+    """
+
+    def __init__(self, cell_size=0.02, neighborhood=1, smoothing=10.0, cv=5, random_state=42):
+        self.cell_size = cell_size
+        self.neighborhood = neighborhood
+        self.smoothing = smoothing
+        self.cv = cv
+        self.random_state = random_state
+
+    def _cell_keys(self, X):
+        """
+        Returns int64 cell ids of the rows of X (two columns: latitude, longitude),
+        with -1 for rows with missing coordinates.
+        """
+        coordinates = np.asarray(X, dtype=np.float64).reshape(-1, 2)
+        valid = np.isfinite(coordinates).all(axis=1)
+        cells = np.floor(np.where(valid[:, None], coordinates, 0.0) / self.cell_size).astype(np.int64)
+        return np.where(valid, self._pack(cells[:, 0], cells[:, 1]), -1)
+
+    # Cell ids pack (lat cell, lon cell) into one int64; the offset keeps them
+    # non-negative for any real coordinate and cell sizes down to ~1e-6 degrees
+    _CELL_OFFSET = 2**28
+    _CELL_BASE = 2**31
+
+    @classmethod
+    def _pack(cls, lat_cells, lon_cells):
+        return (lat_cells + cls._CELL_OFFSET) * cls._CELL_BASE + (lon_cells + cls._CELL_OFFSET)
+
+    def _count(self, X, y_codes):
+        """
+        Returns (occupied cell ids, per-class row counts of each cell).
+        """
+        keys = self._cell_keys(X)
+        valid = keys >= 0
+        cells, inverse = np.unique(keys[valid], return_inverse=True)
+        counts = np.zeros((len(cells), max(len(self.classes_), 1)), dtype=np.float64)
+        np.add.at(counts, (inverse, y_codes[valid] if len(self.classes_) else 0), 1.0)
+        return cells, counts
+
+    def _build(self, cells, counts):
+        """
+        Returns (sorted window cell ids, feature table) for occupied cells and their neighbours.
+        """
+        lat_cells, lon_cells = np.divmod(cells, self._CELL_BASE)
+        lat_cells, lon_cells = lat_cells - self._CELL_OFFSET, lon_cells - self._CELL_OFFSET
+        reach = range(-self.neighborhood, self.neighborhood + 1)
+        window_keys = np.concatenate([
+            self._pack(lat_cells + dy, lon_cells + dx) for dy in reach for dx in reach
+        ])
+        window_keys, inverse = np.unique(window_keys, return_inverse=True)
+        window_counts = np.zeros((len(window_keys), counts.shape[1]), dtype=np.float64)
+        np.add.at(window_counts, inverse, np.tile(counts, ((2 * self.neighborhood + 1) ** 2, 1)))
+        return window_keys, self._features(window_counts)
+
+    def _features(self, counts):
+        totals = counts.sum(axis=1, keepdims=True)
+        columns = [np.log1p(totals)]
+        if len(self.classes_):
+            columns.append((counts + self.smoothing * self.prior_) / (totals + self.smoothing))
+        return np.hstack(columns).astype(np.float32)
+
+    def _lookup(self, keys, table_keys, table):
+        if not len(table_keys):
+            return np.tile(self.default_, (len(keys), 1))
+        positions = np.minimum(np.searchsorted(table_keys, keys), len(table_keys) - 1)
+        found = (keys >= 0) & (table_keys[positions] == keys)
+        return np.where(found[:, None], table[positions], self.default_)
+
+    def _encode_target(self, y, n_rows):
+        if y is None:
+            return np.zeros(n_rows, dtype=np.intp)
+        return np.searchsorted(self.classes_, np.asarray(y))
+
+    def fit(self, X, y=None):
+        self.n_features_in_ = 2
+        self.classes_ = np.unique(np.asarray(y)) if y is not None else np.array([])
+        y_codes = self._encode_target(y, len(X))
+        self.prior_ = (
+            np.bincount(y_codes, minlength=len(self.classes_)) / max(len(y_codes), 1)
+            if len(self.classes_) else np.zeros(0)
+        )
+        self.default_ = self._features(np.zeros((1, max(len(self.classes_), 1))))[0]
+        self.cell_keys_, self.cell_counts_ = self._count(X, y_codes)
+        self.table_keys_, self.table_ = self._build(self.cell_keys_, self.cell_counts_)
+        return self
+
+    def partial_fit(self, X, y=None):
+        """
+        Adds new rows to the index; class shares and the prior keep their fitted classes.
+        """
+        if not hasattr(self, "table_"):
+            return self.fit(X, y)
+        y_codes = self._encode_target(y, len(X))
+        if len(self.classes_):
+            known = np.isin(np.asarray(y), self.classes_)
+            X, y_codes = np.asarray(X, dtype=np.float64)[known], y_codes[known]
+        cells, counts = self._count(X, y_codes)
+        merged, inverse = np.unique(np.concatenate([self.cell_keys_, cells]), return_inverse=True)
+        merged_counts = np.zeros((len(merged), self.cell_counts_.shape[1]), dtype=np.float64)
+        np.add.at(merged_counts, inverse, np.vstack([self.cell_counts_, counts]))
+        self.cell_keys_, self.cell_counts_ = merged, merged_counts
+        self.table_keys_, self.table_ = self._build(merged, merged_counts)
+        return self
+
+    def transform(self, X):
+        return self._lookup(self._cell_keys(X), self.table_keys_, self.table_)
+
+    def table_positions(self, X):
+        """
+        Returns each row's position in table_, or -1 where the default row applies.
+        """
+        keys = self._cell_keys(X)
+        if not len(self.table_keys_):
+            return np.full(len(keys), -1, dtype=np.intp)
+        positions = np.minimum(np.searchsorted(self.table_keys_, keys), len(self.table_keys_) - 1)
+        return np.where((keys >= 0) & (self.table_keys_[positions] == keys), positions, -1)
+
+    def fit_transform(self, X, y=None, **fit_params):
+        return self.fit(X, y).out_of_fold_transform(X, y)
+
+    def out_of_fold_transform(self, X, y):
+        """
+        Features of rows that are part of the index (added by fit or partial_fit
+        with targets y): each fold's class shares come from the index with that
+        fold's own rows removed; density from the full index.
+        """
+        X = np.asarray(X, dtype=np.float64)
+        out = self.transform(X)
+        if y is None or not len(self.classes_) or self.cv is None or self.cv < 2 or len(X) < self.cv:
+            return out
+        y = np.asarray(y)
+        y_codes = self._encode_target(y, len(X))
+        # Rows with labels unknown to the index were never counted (see partial_fit)
+        counted = np.isin(y, self.classes_)
+        keys = self._cell_keys(X)
+        for _, held_out in KFold(self.cv, shuffle=True, random_state=self.random_state).split(X):
+            held_out = held_out[counted[held_out]]
+            cells, counts = self._count(X[held_out], y_codes[held_out])
+            remaining = self.cell_counts_.copy()
+            remaining[np.searchsorted(self.cell_keys_, cells)] -= counts
+            table_keys, table = self._build(self.cell_keys_, np.maximum(remaining, 0.0))
+            out[held_out, 1:] = self._lookup(keys[held_out], table_keys, table)[:, 1:]
+        return out
+
+    def get_feature_names_out(self, input_features=None):
+        return np.asarray(["geo_density"] + [f"geo_rate_{c}" for c in self.classes_], dtype=object)
+
+
+class CategoryCodeEncoder(BaseEstimator, TransformerMixin):
+    """
+    Encodes categorical columns as integer codes of the training vocabulary and
+    passes numerical columns through as float32 (no imputation or scaling: tree
+    boosters handle missing numerical values and are scale invariant).
+
+    Unknown and missing categories map to `unknown_value`. With as_frame=True the
+    output is a DataFrame with int32 code columns, otherwise a float32 array.
+
+    With a `spatial_index` (unfitted SpatialRiskIndex) its neighborhood features
+    over `spatial_columns` follow the numerical columns, then the calendar features
+    of `temporal_features` (unfitted TemporalFeatures) over `temporal_columns`;
+    fitting the spatial index needs y.
+    """
+
+    # Below this many rows codes are resolved with dict lookups (see InferenceBundle)
+    SMALL_BATCH_ROWS = 1024
+
+    def __init__(self, numerical_columns=None, categorical_columns=None, unknown_value=np.nan, as_frame=False,
+                 spatial_index=None, spatial_columns=None, temporal_features=None, temporal_columns=None):
+        self.numerical_columns = numerical_columns
+        self.categorical_columns = categorical_columns
+        self.unknown_value = unknown_value
+        self.as_frame = as_frame
+        self.spatial_index = spatial_index
+        self.spatial_columns = spatial_columns
+        self.temporal_features = temporal_features
+        self.temporal_columns = temporal_columns
+
+    def _derived(self):
+        """
+        Returns (fitted attribute, unfitted transformer, input columns) of each derived feature block.
+        """
+        return [
+            ("spatial_index_", self.spatial_index, self.spatial_columns),
+            ("temporal_features_", self.temporal_features, self.temporal_columns),
+        ]
+
+    def fit(self, X, y=None):
+        self._fit(X, y)
+        return self
+
+    def fit_transform(self, X, y=None, **fit_params):
+        # Out-of-fold spatial features for the training rows (see SpatialRiskIndex)
+        return self._encode(X, self._fit(X, y))
+
+    def _fit(self, X, y):
+        """
+        Fits the vocabulary and derived blocks; returns the training rows' derived features.
+        """
+        derived_features = {}
+        self.derived_feature_names_ = {}
+        input_columns = list(self.numerical_columns)
+        for attribute, template, columns in self._derived():
+            fitted = None
+            if template is not None:
+                fitted = clone(template)
+                derived_features[attribute] = fitted.fit_transform(X[list(columns)], y)
+                self.derived_feature_names_[attribute] = list(fitted.get_feature_names_out())
+                input_columns += list(columns)
+            setattr(self, attribute, fitted)
+        self.feature_names_in_ = np.asarray(
+            list(dict.fromkeys(input_columns + list(self.categorical_columns))), dtype=object
+        )
+        self.categories_ = [
+            pd.Index(sorted(X[column].dropna().astype(str).unique())) for column in self.categorical_columns
+        ]
+        self.category_codes_ = [
+            {category: code for code, category in enumerate(categories)} for categories in self.categories_
+        ]
+        n_derived = sum(len(names) for names in self.derived_feature_names_.values())
+        n_numerical = len(self.numerical_columns) + n_derived
+        # Positions of the categorical columns in the output (CatBoost cat_features)
+        self.categorical_indices_ = list(range(n_numerical, n_numerical + len(self.categorical_columns)))
+        # XGBoost feature types: "q" quantitative, "c" categorical
+        self.feature_types_ = ["q"] * n_numerical + ["c"] * len(self.categorical_columns)
+        return derived_features
+
+    def transform(self, X):
+        derived_features = {}
+        for attribute, _, columns in self._derived():
+            # Encoders pickled before a block existed do not have its attribute
+            fitted = getattr(self, attribute, None)
+            if fitted is not None:
+                derived_features[attribute] = fitted.transform(X[list(columns)])
+        return self._encode(X, derived_features)
+
+    def out_of_fold_transform(self, X, y):
+        """
+        transform() for rows the encoder was fitted (or updated) on, with the spatial
+        severity rates out-of-fold as fit_transform() produced them.
+        """
+        derived_features = {}
+        for attribute, _, columns in self._derived():
+            fitted = getattr(self, attribute, None)
+            if isinstance(fitted, SpatialRiskIndex):
+                derived_features[attribute] = fitted.out_of_fold_transform(X[list(columns)], y)
+            elif fitted is not None:
+                derived_features[attribute] = fitted.transform(X[list(columns)])
+        return self._encode(X, derived_features)
+
+    def _encode(self, X, derived_features):
+        columns = {
+            column: X[column].to_numpy(dtype=np.float32, na_value=np.nan) for column in self.numerical_columns
+        }
+        for attribute, features in derived_features.items():
+            for name, values in zip(self.derived_feature_names_[attribute], features.T):
+                columns[name] = values.astype(np.float32)
+        n_rows = len(X)
+        for column, categories, lookup in zip(self.categorical_columns, self.categories_, self.category_codes_):
+            # -1 = unknown or missing
+            if n_rows <= self.SMALL_BATCH_ROWS:
+                codes = np.fromiter(
+                    (lookup.get(value, -1) for value in X[column].to_numpy(dtype=object)),
+                    dtype=np.intp, count=n_rows,
+                )
+            else:
+                codes = categories.get_indexer(X[column].astype(object))
+            dtype = np.int32 if self.as_frame else np.float32
+            columns[column] = np.where(codes < 0, self.unknown_value, codes).astype(dtype)
+        if self.as_frame:
+            return pd.DataFrame(columns, index=getattr(X, "index", None))
+        return np.column_stack(list(columns.values()))
+
+    def unseen_categories(self, X):
+        """
+        Returns column -> list of categories in X that are not in the fitted vocabulary.
+        """
+        unseen = {}
+        for column, categories in zip(self.categorical_columns, self.categories_):
+            values = pd.Index(X[column].dropna().astype(str).unique())
+            missing = values.difference(categories)
+            if len(missing):
+                unseen[column] = list(missing)
+        return unseen
 
 @dataclass
 class DataTransformationConfig:
@@ -27,6 +531,27 @@ class DataTransformationConfig:
     The preprocessor will be saved in the 'artifacts' directory.
     """
     preprocessor_obj_file_path = os.path.join('artifacts', "severity_preprocessor.pkl")
+    # Emit features as CSR sparse matrices (one-hot columns stay sparse); False = dense arrays
+    sparse_output: bool = True
+    # Encoders of the native feature views, "{view}" is replaced by the view name
+    feature_view_obj_file_path: str = os.path.join('artifacts', "severity_preprocessor_{view}.pkl")
+    # Grid cell size in degrees of the spatial risk index over Latitude/Longitude
+    # (neighborhood density and severity rates, see SpatialRiskIndex); None disables it
+    spatial_cell_size: float = 0.02
+    # Calendar features from Date/Time (see TemporalFeatures); False drops the columns
+    temporal_features: bool = True
+    # Parsed Date/Time of the split files, keyed by file size/mtime (None disables the cache)
+    timestamp_cache_dir: str = os.path.join('artifacts', 'timestamps')
+    # Parallel transformation on threads: the ColumnTransformer branches run concurrently
+    # and frames longer than transform_chunk_rows are transformed in row chunks (None = serial)
+    n_jobs: int = None
+    transform_chunk_rows: int = 100_000
+    # dtype of the transformed feature matrices; float32 halves their memory and the
+    # bandwidth of every pass the models make over them
+    output_dtype: str = "float32"
+    # On-disk row chunks of each feature view for out-of-core training, written in
+    # chunks of transform_chunk_rows rows (see initiate_chunked_transformation)
+    chunked_data_dir: str = os.path.join('artifacts', 'chunks')
 
 class DataTransformation:
     """
@@ -34,8 +559,8 @@ class DataTransformation:
     It includes methods for creating a data preprocessor and initiating
     the transformation on training and testing data.
     """
-    def __init__(self):
-        self.data_transformation_config = DataTransformationConfig()
+    def __init__(self, config: DataTransformationConfig = None):
+        self.data_transformation_config = config or DataTransformationConfig()
 
     def get_data_transformer_object(self):
         """
@@ -45,16 +570,8 @@ class DataTransformation:
         """
         try:
             # Columns identified from the provided dataset
-            numerical_columns = ["Latitude", "Longitude"]
-            categorical_columns = [
-                "Weather",
-                "Road_Condition",
-                "Time_of_Day",
-                "Traffic",
-                "Accident_Type",
-                "Vehicle_Type",
-                "Accident_Reason",
-            ]
+            numerical_columns = list(NUMERICAL_FEATURES)
+            categorical_columns = list(CATEGORICAL_FEATURES)
             
             # Numerical pipeline to handle missing values and scale data
             numerical_pipeline = Pipeline(
@@ -76,13 +593,44 @@ class DataTransformation:
             logging.info(f"Numerical columns: {numerical_columns}")
             logging.info(f"Categorical columns: {categorical_columns}")
 
+            transformers = [
+                ("num_pipeline", numerical_pipeline, numerical_columns),
+                ("cat_pipelines", categorical_pipeline, categorical_columns)
+            ]
+
+            # Spatial pipeline: neighborhood density and severity rates looked up in a
+            # grid index of the training rows (fitting needs the target), then scaled
+            spatial_index = self.get_spatial_index_object()
+            if spatial_index is not None:
+                spatial_pipeline = Pipeline(
+                    steps=[
+                        ("risk_index", spatial_index),
+                        ("scaler", StandardScaler())
+                    ]
+                )
+                transformers.append(("geo_pipeline", spatial_pipeline, list(SPATIAL_FEATURES)))
+                logging.info(f"Spatial columns: {SPATIAL_FEATURES}")
+
+            # Temporal pipeline: calendar features of the Date/Time columns, scaled
+            temporal_features = self.get_temporal_features_object()
+            if temporal_features is not None:
+                temporal_pipeline = Pipeline(
+                    steps=[
+                        ("calendar", temporal_features),
+                        ("scaler", StandardScaler())
+                    ]
+                )
+                transformers.append(("time_pipeline", temporal_pipeline, list(TEMPORAL_FEATURES)))
+                logging.info(f"Temporal columns: {TEMPORAL_FEATURES}")
+
             # ColumnTransformer to apply the correct pipeline to each column type
             preprocessor = ColumnTransformer(
-                [
-                    ("num_pipeline", numerical_pipeline, numerical_columns),
-                    ("cat_pipelines", categorical_pipeline, categorical_columns)
-                ],
-                remainder='drop' # Drops any columns not specified in the pipelines
+                transformers,
+                remainder='drop', # Drops any columns not specified in the pipelines
+                # Always sparse (or always dense) output, independent of the data's density
+                sparse_threshold=1.0 if self.data_transformation_config.sparse_output else 0.0,
+                # Branches run concurrently (threads, see fit_transform_features)
+                n_jobs=self.data_transformation_config.n_jobs,
             )
 
             return preprocessor
@@ -91,51 +639,384 @@ class DataTransformation:
             logging.error(f"Error in get_data_transformer_object: {e}")
             raise CustomException(e, sys)
 
+    def get_spatial_index_object(self):
+        """
+        Creates the (unfitted) spatial risk index, or None when it is disabled.
+        """
+        cell_size = self.data_transformation_config.spatial_cell_size
+        return SpatialRiskIndex(cell_size=cell_size) if cell_size else None
+
+    def get_temporal_features_object(self):
+        """
+        Creates the (unfitted) calendar feature transformer, or None when it is disabled.
+        """
+        return TemporalFeatures() if self.data_transformation_config.temporal_features else None
+
+    @staticmethod
+    def split_features_target(df):
+        """
+        Splits a raw accident frame into the input features and the Severity target.
+        'Date' and 'Time' stay in the features; preprocessors without temporal
+        features ignore them.
+        """
+        return df.drop(columns=[TARGET_COLUMN]), df[TARGET_COLUMN]
+
+    def fit_transform_features(self, preprocessor, X, y=None):
+        """
+        Fits the preprocessor and returns the transformed training features in
+        config.output_dtype. Fitting needs the whole frame (the spatial index uses
+        out-of-fold rates), so only the branches run in parallel here; threads avoid
+        copying the frame into worker processes.
+        """
+        config = self.data_transformation_config
+        with parallel_config(backend="threading"):
+            out = preprocessor.fit_transform(X, y)
+        return out.astype(config.output_dtype) if config.output_dtype and out.dtype != config.output_dtype else out
+
+    def transform_features(self, preprocessor, X):
+        """
+        Transforms features with a fitted preprocessor in config.output_dtype, in
+        parallel row chunks for frames longer than config.transform_chunk_rows.
+        """
+        config = self.data_transformation_config
+        with parallel_config(backend="threading"):
+            return transform_in_chunks(
+                preprocessor, X, n_jobs=config.n_jobs, chunk_rows=config.transform_chunk_rows,
+                dtype=config.output_dtype,
+            )
+
+    @staticmethod
+    def transform_training_rows(preprocessor, X, y, dtype=None):
+        """
+        Transforms rows a fitted preprocessor was fitted (or updated) on, e.g. the
+        training split of an incremental refit. Its spatial severity rates are
+        computed out-of-fold, as in the full build, instead of from an index that
+        contains each row's own target.
+
+        Args:
+            preprocessor: Fitted ColumnTransformer or CategoryCodeEncoder
+            X (DataFrame): Raw feature rows
+            y (array): Their raw target labels
+            dtype: Optional output dtype (ignored for DataFrame output)
+        """
+        if isinstance(preprocessor, CategoryCodeEncoder):
+            out = preprocessor.out_of_fold_transform(X, y)
+        else:
+            out = preprocessor.transform(X)
+            for name, pipeline, columns in preprocessor.transformers_:
+                steps = [step for _, step in pipeline.steps] if isinstance(pipeline, Pipeline) else []
+                if not steps or not isinstance(steps[0], SpatialRiskIndex):
+                    continue
+                block = steps[0].out_of_fold_transform(X[list(columns)], y)
+                for step in steps[1:]:
+                    block = step.transform(block)
+                position = preprocessor.output_indices_[name]
+                if sparse.issparse(out):
+                    out = sparse.hstack(
+                        [out[:, :position.start], sparse.csr_matrix(block), out[:, position.stop:]], format="csr"
+                    )
+                else:
+                    out[:, position] = block
+        if dtype is not None and not isinstance(out, pd.DataFrame) and out.dtype != dtype:
+            out = out.astype(dtype)
+        return out
+
+    def read_split(self, file_path):
+        """
+        Reads a train/test split. With temporal features enabled, its Date column
+        is replaced by the parsed timestamps from the timestamp cache.
+        """
+        df = read_frame(file_path)
+        config = self.data_transformation_config
+        if config.temporal_features and set(TEMPORAL_FEATURES).issubset(df.columns):
+            df["Date"] = load_timestamps(file_path, df, cache_dir=config.timestamp_cache_dir)
+        return df
+
+    def update_transformer_object(self, preprocessor, new_feature_df, update_statistics=True, new_target=None):
+        """
+        Updates the statistics of a fitted preprocessor with newly arrived rows,
+        without revisiting the rows it was originally fitted on.
+
+        - StandardScaler moments are merged with partial_fit.
+        - Median/mean imputer statistics are blended, weighted by row counts (an
+          approximation for the median; exact medians need the full history).
+        - Spatial risk indexes add the new rows to their cell counts (needs new_target).
+        - One-hot vocabularies are checked for unseen categories. A new category
+          changes the feature layout, which no fitted model can consume, so in that
+          case nothing is modified and the caller must refit from scratch.
+
+        Args:
+            preprocessor (ColumnTransformer): Fitted preprocessor (updated in place).
+            new_feature_df (pd.DataFrame): New input features (no target column).
+            update_statistics (bool): False only runs the vocabulary check (for models
+                                      whose fitted state depends on the current scaling).
+            new_target (array-like): Target of the new rows, for the spatial risk index.
+
+        Returns:
+            dict: Column -> list of unseen categories (empty if the update was applied)
+        """
+        try:
+            if isinstance(preprocessor, CategoryCodeEncoder):
+                # Only a vocabulary, no statistics to update
+                unseen = preprocessor.unseen_categories(new_feature_df)
+                if unseen:
+                    logging.info(f"New categories {unseen}; encoder must be refitted")
+                elif update_statistics and new_target is not None and getattr(preprocessor, "spatial_index_", None) is not None:
+                    preprocessor.spatial_index_.partial_fit(
+                        new_feature_df[list(preprocessor.spatial_columns)], new_target
+                    )
+                return unseen
+
+            branches = [
+                (pipeline, columns) for _, pipeline, columns in preprocessor.transformers_
+                if isinstance(pipeline, Pipeline)
+            ]
+
+            # Vocabulary check first, so the preprocessor is never left half-updated
+            unseen = {}
+            for pipeline, columns in branches:
+                encoder = dict(pipeline.steps).get("one_hot_encoder")
+                if encoder is None:
+                    continue
+                for column, categories in zip(columns, encoder.categories_):
+                    values = pd.Index(new_feature_df[column].dropna().unique())
+                    missing = values.difference(pd.Index(categories))
+                    if len(missing):
+                        unseen[column] = list(missing)
+            if unseen:
+                logging.info(f"New categories {unseen}; preprocessor must be refitted")
+                return unseen
+            if not update_statistics:
+                return unseen
+
+            with track_stage("transformation.update", rows=len(new_feature_df)):
+                for pipeline, columns in branches:
+                    X = new_feature_df[columns]
+                    steps = [step for _, step in pipeline.steps]
+                    scaler = steps[-1] if isinstance(steps[-1], StandardScaler) else None
+                    n_old = np.max(scaler.n_samples_seen_) if scaler is not None else 0
+
+                    imputer = steps[0] if isinstance(steps[0], SimpleImputer) else None
+                    if imputer is not None and imputer.strategy in ("median", "mean") and n_old:
+                        new_values = X.median() if imputer.strategy == "median" else X.mean()
+                        n_new = X.notna().sum().to_numpy()
+                        weights = n_new / (n_old + n_new)
+                        blended = (1 - weights) * imputer.statistics_ + weights * new_values.to_numpy()
+                        # Columns without new values keep their old statistic
+                        imputer.statistics_ = np.where(n_new > 0, blended, imputer.statistics_)
+
+                    for step in steps:
+                        if isinstance(step, SpatialRiskIndex) and new_target is not None:
+                            step.partial_fit(X, new_target)
+
+                    if scaler is not None:
+                        Xt = X
+                        for step in steps[:-1]:
+                            Xt = step.transform(Xt)
+                        scaler.partial_fit(Xt)
+
+            logging.info(f"Preprocessor statistics updated with {len(new_feature_df)} new rows")
+            return unseen
+
+        except Exception as e:
+            logging.error(f"Error in update_transformer_object: {e}")
+            raise CustomException(e, sys)
+
+    def get_feature_view_object(self, view):
+        """
+        Creates the (unfitted) encoder of a native feature view (see NATIVE_FEATURE_VIEWS).
+        """
+        if view not in NATIVE_FEATURE_VIEWS:
+            raise ValueError(f"Unknown feature view {view!r}; expected one of {list(NATIVE_FEATURE_VIEWS)}")
+        spatial_index = self.get_spatial_index_object()
+        temporal_features = self.get_temporal_features_object()
+        return CategoryCodeEncoder(
+            numerical_columns=list(NUMERICAL_FEATURES),
+            categorical_columns=list(CATEGORICAL_FEATURES),
+            spatial_index=spatial_index,
+            spatial_columns=list(SPATIAL_FEATURES) if spatial_index is not None else None,
+            temporal_features=temporal_features,
+            temporal_columns=list(TEMPORAL_FEATURES) if temporal_features is not None else None,
+            **NATIVE_FEATURE_VIEWS[view],
+        )
+
+    def initiate_feature_views(self, train_path, test_path, views=tuple(NATIVE_FEATURE_VIEWS)):
+        """
+        Builds the native (integer-coded categorical) feature views used by the
+        boosting models, alongside the one-hot matrix of initiate_data_transformation.
+
+        Args:
+            train_path (str): The file path to the training dataset.
+            test_path (str): The file path to the testing dataset.
+            views (iterable): Names of the views to build.
+
+        Returns:
+            dict: view -> {"X_train", "X_test", "preprocessor" (fitted encoder),
+                  "preprocessor_path"}
+        """
+        try:
+            with track_stage("transformation.read") as stage:
+                train_df = self.read_split(train_path)
+                test_df = self.read_split(test_path)
+                stage["rows"] = len(train_df) + len(test_df)
+            input_feature_train_df, target_feature_train_df = self.split_features_target(train_df)
+            input_feature_test_df, _ = self.split_features_target(test_df)
+
+            feature_views = {}
+            for view in views:
+                encoder = self.get_feature_view_object(view)
+                with track_stage("transformation.feature_view", rows=len(input_feature_train_df), view=view):
+                    X_train = encoder.fit_transform(input_feature_train_df, target_feature_train_df)
+                    X_test = encoder.transform(input_feature_test_df)
+                preprocessor_path = self.data_transformation_config.feature_view_obj_file_path.format(view=view)
+                save_object(file_path=preprocessor_path, obj=encoder)
+                feature_views[view] = {
+                    "X_train": X_train,
+                    "X_test": X_test,
+                    "preprocessor": encoder,
+                    "preprocessor_path": preprocessor_path,
+                }
+            logging.info(f"Native feature views created: {list(feature_views)}")
+            return feature_views
+
+        except Exception as e:
+            logging.error(f"Error in initiate_feature_views: {e}")
+            raise CustomException(e, sys)
+
+    def initiate_chunked_transformation(self, train_path, test_path, views=("onehot", *NATIVE_FEATURE_VIEWS)):
+        """
+        Builds the feature views of the out-of-core training path as on-disk row
+        chunks (see ChunkedDataset) under config.chunked_data_dir/<view>/{train,test}.
+
+        Fitting needs the whole training frame once (the spatial risk index uses
+        out-of-fold rates), but each view's training matrix is written out chunk by
+        chunk and released before the next one is built, and the test split is
+        transformed chunk by chunk, so at most one feature matrix is in memory and
+        none is during training.
+
+        Args:
+            train_path (str): The file path to the training dataset.
+            test_path (str): The file path to the testing dataset.
+            views (iterable): "onehot" and/or names of NATIVE_FEATURE_VIEWS.
+
+        Returns:
+            dict: view -> {"train", "test" (ChunkedDataset), "preprocessor" (fitted),
+                  "preprocessor_path"}
+        """
+        try:
+            config = self.data_transformation_config
+            with track_stage("transformation.read") as stage:
+                train_df = self.read_split(train_path)
+                test_df = self.read_split(test_path)
+                stage["rows"] = len(train_df) + len(test_df)
+            input_feature_train_df, target_feature_train_df = self.split_features_target(train_df)
+            input_feature_test_df, target_feature_test_df = self.split_features_target(test_df)
+            del train_df, test_df
+
+            chunked_views = {}
+            for view in views:
+                directory = os.path.join(config.chunked_data_dir, view)
+                if view == "onehot":
+                    preprocessor = self.get_data_transformer_object()
+                    preprocessor_path = config.preprocessor_obj_file_path
+                    fit_transform = lambda X, y: self.fit_transform_features(preprocessor, X, y)
+                    transform = lambda X: self.transform_features(preprocessor, X)
+                else:
+                    preprocessor = self.get_feature_view_object(view)
+                    preprocessor_path = config.feature_view_obj_file_path.format(view=view)
+                    fit_transform, transform = preprocessor.fit_transform, preprocessor.transform
+
+                with track_stage("transformation.chunked_train", rows=len(input_feature_train_df), view=view):
+                    X_train = fit_transform(input_feature_train_df, target_feature_train_df)
+                    if view == "onehot" and config.sparse_output:
+                        X_train = sparse.csr_matrix(X_train)
+                    train = ChunkedDataset.write(
+                        os.path.join(directory, "train"), X_train, target_feature_train_df,
+                        chunk_rows=config.transform_chunk_rows,
+                    )
+                    del X_train
+
+                with track_stage("transformation.chunked_test", rows=len(input_feature_test_df), view=view):
+                    test = ChunkedDataset(os.path.join(directory, "test"))
+                    for start in range(0, len(input_feature_test_df), config.transform_chunk_rows):
+                        rows = slice(start, start + config.transform_chunk_rows)
+                        X_test = transform(input_feature_test_df.iloc[rows])
+                        if view == "onehot" and config.sparse_output:
+                            X_test = sparse.csr_matrix(X_test)
+                        test.append(X_test, target_feature_test_df.iloc[rows])
+                    test.close()
+
+                save_object(file_path=preprocessor_path, obj=preprocessor)
+                chunked_views[view] = {
+                    "train": train,
+                    "test": test,
+                    "preprocessor": preprocessor,
+                    "preprocessor_path": preprocessor_path,
+                }
+                logging.info(
+                    f"Chunked {view} view: {len(train)} training rows in {len(train.chunks)} chunks, "
+                    f"{train.n_features} {'sparse' if train.sparse else 'dense'} {train.dtype} columns"
+                )
+            return chunked_views
+
+        except Exception as e:
+            logging.error(f"Error in initiate_chunked_transformation: {e}")
+            raise CustomException(e, sys)
+
     def initiate_data_transformation(self, train_path, test_path):
         """
-        Initiates the data transformation process by loading,
-        preprocessing, and combining the data.
-        
+        Initiates the data transformation process by loading
+        and preprocessing the data.
+
+        Features are returned as CSR sparse matrices (dense arrays with
+        sparse_output=False) of config.output_dtype and the target separately, so
+        the one-hot block is never densified or copied next to a string target column.
+
         Args:
             train_path (str): The file path to the training dataset.
             test_path (str): The file path to the testing dataset.
 
         Returns:
-            tuple: A tuple containing the transformed training array,
-                   transformed testing array, and the path to the
-                   saved preprocessor object.
+            tuple: (X_train, y_train, X_test, y_test, path to the saved
+                   preprocessor object)
         """
         try:
-            # Read the training and testing data
-            train_df = pd.read_csv(train_path)
-            test_df = pd.read_csv(test_path)
+            # Read the training and testing data (CSV, or memory-mapped Parquet/Feather),
+            # with Date/Time parsed once and cached
+            with track_stage("transformation.read") as stage:
+                train_df = self.read_split(train_path)
+                test_df = self.read_split(test_path)
+                stage["rows"] = len(train_df) + len(test_df)
 
             logging.info("Read train and test data completed.")
             logging.info("Obtaining preprocessing object.")
 
             preprocessing_obj = self.get_data_transformer_object()
 
-            target_column_name = "Severity"
-
             # Separate features and target from the dataframes
-            # Note: 'Date' and 'Time' columns are dropped as they are not used in this transformation pipeline.
-            input_feature_train_df = train_df.drop(columns=[target_column_name, "Date", "Time"], axis=1)
-            target_feature_train_df = train_df[target_column_name]
-
-            input_feature_test_df = test_df.drop(columns=[target_column_name, "Date", "Time"], axis=1)
-            target_feature_test_df = test_df[target_column_name]
+            input_feature_train_df, target_feature_train_df = self.split_features_target(train_df)
+            input_feature_test_df, target_feature_test_df = self.split_features_target(test_df)
 
             logging.info("Applying preprocessing object on training and testing data.")
 
             # Apply the transformations using fit_transform on train data and transform on test data
-            input_feature_train_arr = preprocessing_obj.fit_transform(input_feature_train_df)
-            input_feature_test_arr = preprocessing_obj.transform(input_feature_test_df)
+            with track_stage("transformation.fit_transform", rows=len(input_feature_train_df)):
+                # The target is only used by the spatial risk index (severity rates)
+                input_feature_train_arr = self.fit_transform_features(
+                    preprocessing_obj, input_feature_train_df, target_feature_train_df
+                )
+            with track_stage("transformation.transform", rows=len(input_feature_test_df)):
+                input_feature_test_arr = self.transform_features(preprocessing_obj, input_feature_test_df)
 
-            # Combine transformed features with the target variable
-            train_arr = np.c_[input_feature_train_arr, np.array(target_feature_train_df)]
-            test_arr = np.c_[input_feature_test_arr, np.array(target_feature_test_df)]
+            if self.data_transformation_config.sparse_output:
+                input_feature_train_arr = sparse.csr_matrix(input_feature_train_arr)
+                input_feature_test_arr = sparse.csr_matrix(input_feature_test_arr)
 
-            logging.info("Transformed arrays created successfully.")
+            logging.info(
+                f"Transformed features created: {input_feature_train_arr.shape[1]} columns, "
+                f"{'sparse' if sparse.issparse(input_feature_train_arr) else 'dense'} "
+                f"{input_feature_train_arr.dtype}"
+            )
             
             # Save the preprocessor object for future use
             save_object(
@@ -144,8 +1025,10 @@ class DataTransformation:
             )
 
             return (
-                train_arr,
-                test_arr,
+                input_feature_train_arr,
+                np.asarray(target_feature_train_df),
+                input_feature_test_arr,
+                np.asarray(target_feature_test_df),
                 self.data_transformation_config.preprocessor_obj_file_path,
             )
         except Exception as e:
@@ -0,0 +1,284 @@
+import time
+import uuid
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.impute import SimpleImputer
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+from src.components.data_transformation import TEMPORAL_FEATURES, SpatialRiskIndex, TemporalFeatures
+
+
+class InferenceBundle:
+    """
+    Single, versioned inference artifact: fitted ColumnTransformer + fitted classifier.
+    The preprocessor may also be any other fitted transformer (e.g. the integer-coded
+    CategoryCodeEncoder of a native feature view), which then runs as is.
+
+    On construction the preprocessor is compiled into a fast path:
+      - numerical branches (imputer -> StandardScaler) become one vectorized affine map
+      - categorical branches (imputer -> OneHotEncoder -> StandardScaler(with_mean=False))
+        become per-column lookup tables holding each category's scaled one-hot value
+      - spatial branches (SpatialRiskIndex -> StandardScaler) become the index's
+        cell table with the scaling already applied, looked up by cell id
+      - temporal branches (TemporalFeatures -> StandardScaler) compute the calendar
+        features and apply the scaling as one affine map
+      - any other branch falls back to its own fitted transformer
+    Scoring therefore skips ColumnTransformer's generic per-step overhead while
+    producing the same feature matrix.
+    """
+
+    FORMAT_VERSION = 1
+    # Below this many rows category codes are resolved with plain dict lookups,
+    # which beat pandas' vectorized indexer on its fixed per-call overhead
+    SMALL_BATCH_ROWS = 1024
+
+    def __init__(self, preprocessor, model, metadata=None):
+        self.preprocessor = preprocessor
+        self.model = model
+        self.metadata = dict(metadata or {})
+        self.version = self.metadata.get("version") or (
+            f"{time.strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        )
+        self.metadata["version"] = self.version
+        self.format_version = self.FORMAT_VERSION
+        # Models trained on integer-coded targets predict codes; labels map them back
+        label_classes = self.metadata.get("label_classes")
+        self.label_classes = np.asarray(label_classes) if label_classes is not None else None
+        self.classes_ = self.label_classes if self.label_classes is not None else getattr(model, "classes_", None)
+        self.feature_columns = list(getattr(preprocessor, "feature_names_in_", []))
+        # dtype of the model's input matrix (ColumnTransformer preprocessors; None = as produced)
+        feature_dtype = self.metadata.get("feature_dtype")
+        self.feature_dtype = np.dtype(feature_dtype) if feature_dtype else None
+        # Whether scoring input needs Date/Time (records without them get imputed calendar features)
+        self.uses_timestamps = self._uses_timestamps(preprocessor)
+        self._branches, self._n_features = self._compile(preprocessor)
+
+    # ------------------------------------------------------------------ compile
+    @staticmethod
+    def _compile(preprocessor):
+        """
+        Returns (branch plans, output width), or (None, None) when the preprocessor
+        is not a fitted ColumnTransformer and only the generic path can be used.
+        """
+        if not hasattr(preprocessor, "transformers_") or not hasattr(preprocessor, "output_indices_"):
+            return None, None
+
+        branches = []
+        n_features = 0
+        for name, transformer, columns in preprocessor.transformers_:
+            if transformer == "drop":
+                continue
+            out = preprocessor.output_indices_[name]
+            if out.stop == out.start:
+                continue
+            n_features = max(n_features, out.stop)
+            plan = (InferenceBundle._compile_numeric(transformer, columns)
+                    or InferenceBundle._compile_categorical(transformer, columns)
+                    or InferenceBundle._compile_spatial(transformer, columns)
+                    or InferenceBundle._compile_temporal(transformer, columns))
+            if plan is None:
+                plan = {"kind": "generic", "transformer": transformer}
+            plan["columns"] = list(columns) if not isinstance(columns, str) else [columns]
+            plan["slice"] = out
+            branches.append(plan)
+        return branches, n_features
+
+    @staticmethod
+    def _uses_timestamps(preprocessor):
+        if hasattr(preprocessor, "transformers_"):
+            return any(
+                set(TEMPORAL_FEATURES) & set([columns] if isinstance(columns, str) else columns)
+                for _, transformer, columns in preprocessor.transformers_ if not isinstance(transformer, str)
+            )
+        return getattr(preprocessor, "temporal_features_", None) is not None
+
+    @staticmethod
+    def _pipeline_steps(transformer, types):
+        if not isinstance(transformer, Pipeline) or len(transformer.steps) != len(types):
+            return None
+        steps = [step for _, step in transformer.steps]
+        if not all(isinstance(step, t) for step, t in zip(steps, types)):
+            return None
+        return steps
+
+    @staticmethod
+    def _compile_numeric(transformer, columns):
+        steps = InferenceBundle._pipeline_steps(transformer, (SimpleImputer, StandardScaler))
+        if steps is None:
+            return None
+        imputer, scaler = steps
+        if imputer.add_indicator or not pd.isna(imputer.missing_values):
+            return None
+        n = len(imputer.statistics_)
+        mean = scaler.mean_ if scaler.with_mean else np.zeros(n)
+        scale = scaler.scale_ if scaler.with_std else np.ones(n)
+        return {
+            "kind": "affine",
+            "fill": np.asarray(imputer.statistics_, dtype=np.float64),
+            "mean": np.asarray(mean, dtype=np.float64),
+            "scale": np.asarray(scale, dtype=np.float64),
+        }
+
+    @staticmethod
+    def _compile_categorical(transformer, columns):
+        steps = InferenceBundle._pipeline_steps(
+            transformer, (SimpleImputer, OneHotEncoder, StandardScaler)
+        )
+        if steps is None:
+            return None
+        imputer, encoder, scaler = steps
+        if imputer.add_indicator or not pd.isna(imputer.missing_values):
+            return None
+        if encoder.drop_idx_ is not None or encoder.handle_unknown != "ignore":
+            return None
+        if any(c is not None for c in (getattr(encoder, "infrequent_categories_", None) or [])):
+            return None
+        if scaler.with_mean:
+            return None
+
+        tables = []
+        offset = 0
+        for fill, categories in zip(imputer.statistics_, encoder.categories_):
+            width = len(categories)
+            scale = scaler.scale_[offset:offset + width] if scaler.with_std else np.ones(width)
+            tables.append({
+                "fill": fill,
+                "categories": pd.Index(categories),
+                "codes": {category: code for code, category in enumerate(categories)},
+                "offset": offset,
+                # Scaled one-hot contribution of each category
+                "values": 1.0 / np.asarray(scale, dtype=np.float64),
+            })
+            offset += width
+        return {"kind": "lookup", "tables": tables}
+
+    @staticmethod
+    def _compile_spatial(transformer, columns):
+        steps = InferenceBundle._pipeline_steps(transformer, (SpatialRiskIndex, StandardScaler))
+        if steps is None:
+            return None
+        index, scaler = steps
+        n = index.table_.shape[1]
+        mean = scaler.mean_ if scaler.with_mean else np.zeros(n)
+        scale = scaler.scale_ if scaler.with_std else np.ones(n)
+        # Last row is the default (cell not indexed), selected by position -1
+        table = np.vstack([index.table_, index.default_[None, :]]).astype(np.float64)
+        return {"kind": "spatial", "index": index, "table": (table - mean) / scale}
+
+    @staticmethod
+    def _compile_temporal(transformer, columns):
+        steps = InferenceBundle._pipeline_steps(transformer, (TemporalFeatures, StandardScaler))
+        if steps is None:
+            return None
+        calendar, scaler = steps
+        n = len(calendar.fill_values_)
+        return {
+            "kind": "temporal",
+            "calendar": calendar,
+            "mean": np.asarray(scaler.mean_ if scaler.with_mean else np.zeros(n), dtype=np.float64),
+            "scale": np.asarray(scaler.scale_ if scaler.with_std else np.ones(n), dtype=np.float64),
+        }
+
+    # ---------------------------------------------------------------- inference
+    def transform(self, features):
+        """
+        Transforms a raw feature DataFrame into the model's input matrix.
+        """
+        # Bundles pickled before feature_dtype existed were trained on float64
+        dtype = getattr(self, "feature_dtype", None)
+        if self._branches is None or not isinstance(features, pd.DataFrame):
+            X = self.preprocessor.transform(features)
+            if dtype is not None and self._branches is not None and X.dtype != dtype:
+                X = X.astype(dtype)
+            return X
+
+        n_rows = len(features)
+        # Branch values are computed in float64 and stored in the training dtype
+        X = np.zeros((n_rows, self._n_features), dtype=dtype or np.float64)
+        rows = np.arange(n_rows)
+        numeric = {}   # Columns read as float64, shared by the affine and spatial branches
+
+        def numeric_block(columns):
+            for column in columns:
+                if column not in numeric:
+                    numeric[column] = features[column].to_numpy(dtype=np.float64, na_value=np.nan)
+            return np.column_stack([numeric[column] for column in columns])
+
+        for plan in self._branches:
+            out = plan["slice"]
+            kind = plan["kind"]
+            if kind == "affine":
+                values = numeric_block(plan["columns"])
+                values = np.where(np.isnan(values), plan["fill"], values)
+                X[:, out] = (values - plan["mean"]) / plan["scale"]
+            elif kind == "lookup":
+                for column, table in zip(plan["columns"], plan["tables"]):
+                    codes = self._category_codes(features[column], table, n_rows)
+                    known = codes >= 0   # unknown categories contribute zeros (handle_unknown="ignore")
+                    X[rows[known], out.start + table["offset"] + codes[known]] = table["values"][codes[known]]
+            elif kind == "spatial":
+                positions = plan["index"].table_positions(numeric_block(plan["columns"]))
+                X[:, out] = plan["table"][positions]
+            elif kind == "temporal":
+                values = plan["calendar"].transform(features[plan["columns"]])
+                X[:, out] = (values - plan["mean"]) / plan["scale"]
+            else:
+                block = plan["transformer"].transform(features[plan["columns"]])
+                X[:, out] = block.toarray() if sparse.issparse(block) else block
+
+        # Keep the container the model was trained on (sparse zeros matter for e.g. XGBoost)
+        if getattr(self.preprocessor, "sparse_output_", False):
+            return sparse.csr_matrix(X)
+        return X
+
+    def _category_codes(self, series, table, n_rows):
+        """
+        Maps a column to category codes (-1 = unknown); missing values take the imputed category.
+        """
+        if n_rows <= self.SMALL_BATCH_ROWS:
+            lookup = table["codes"]
+            fill_code = lookup.get(table["fill"], -1)
+            return np.fromiter(
+                (fill_code if pd.isna(value) else lookup.get(value, -1) for value in series.to_numpy(dtype=object)),
+                dtype=np.intp, count=n_rows,
+            )
+        series = series.astype(object)
+        series = series.where(series.notna(), table["fill"])
+        return table["categories"].get_indexer(series)
+
+    def decode_labels(self, preds):
+        """
+        Maps the model's predictions back to the original target labels.
+        """
+        if self.label_classes is None:
+            return preds
+        # CatBoost returns a column vector
+        return self.label_classes[np.asarray(preds).astype(np.intp).ravel()]
+
+    def predict(self, features):
+        return self.decode_labels(self.model.predict(self.transform(features)))
+
+    def predict_proba(self, features):
+        return self.model.predict_proba(self.transform(features))
+
+    def predict_with_proba(self, features):
+        """
+        Returns (predictions, probabilities or None) from a single transform pass.
+        """
+        X = self.transform(features)
+        preds = self.decode_labels(self.model.predict(X))
+        proba = None
+        if hasattr(self.model, "predict_proba"):
+            try:
+                proba = self.model.predict_proba(X)
+            except AttributeError:
+                # e.g. SVC trained without probability=True
+                proba = None
+        return preds, proba
+
+    def __repr__(self):
+        return (f"InferenceBundle(version={self.version!r}, "
+                f"model={self.metadata.get('model_name', type(self.model).__name__)!r})")
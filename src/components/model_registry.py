@@ -0,0 +1,270 @@
+import argparse
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+
+from src.exception import CustomException
+from src.logger import logging
+from src.utils import file_lock, save_object, write_json_atomic
+
+# Alias the serving layer loads by default, and the one that receives canary traffic
+PRODUCTION_ALIAS = "production"
+CANARY_ALIAS = "canary"
+
+
+class ModelRegistry:
+    """
+    Local, file-based registry of trained model bundles.
+
+    Layout under `root`:
+        versions/<version>/bundle.pkl       InferenceBundle (never modified once written)
+        versions/<version>/metadata.json    metrics, params, data fingerprint, timings
+        aliases.json                        alias -> version, plus each alias' history
+
+    Versions are immutable, so serving processes can keep several loaded and switch
+    between them by re-pointing an alias (promote / rollback) without touching any
+    file a reader may have open. Alias lookups are cached and re-read at most every
+    `check_interval` seconds when aliases.json changes.
+    """
+
+    def __init__(self, root=os.path.join("artifacts", "registry"), check_interval=1.0):
+        self.root = root
+        self.check_interval = check_interval
+        self._aliases = None
+        self._aliases_signature = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------ paths
+    def _version_dir(self, version):
+        return os.path.join(self.root, "versions", version)
+
+    @property
+    def _aliases_path(self):
+        return os.path.join(self.root, "aliases.json")
+
+    # --------------------------------------------------------------- register
+    def register(self, bundle, metrics=None, data_fingerprint=None, aliases=()):
+        """
+        Stores a bundle as a new version and optionally points `aliases` at it.
+
+        Args:
+            bundle (InferenceBundle): Bundle to store; its version becomes the registry version
+            metrics (dict): e.g. the evaluate_models report (model name -> test score)
+            data_fingerprint (str): Hash of the training data
+            aliases (iterable): Aliases to move to the new version
+
+        Returns:
+            str: The registered version
+        """
+        try:
+            version = bundle.version
+            version_dir = self._version_dir(version)
+            if os.path.exists(version_dir):
+                raise ValueError(f"Version {version} is already registered")
+
+            save_object(os.path.join(version_dir, "bundle.pkl"), bundle)
+            metadata = dict(bundle.metadata)
+            metadata.update(
+                version=version,
+                registered_at=time.strftime("%Y-%m-%dT%H:%M:%S"),
+                metrics=metrics or {},
+                data_fingerprint=data_fingerprint,
+            )
+            write_json_atomic(os.path.join(version_dir, "metadata.json"), metadata)
+            logging.info(f"Registered model version {version} ({metadata.get('model_name')})")
+
+            for alias in aliases:
+                self.set_alias(alias, version)
+            return version
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    # ---------------------------------------------------------------- lookups
+    def list_versions(self):
+        """
+        Returns the metadata of every registered version, oldest first.
+        """
+        versions_dir = os.path.join(self.root, "versions")
+        if not os.path.isdir(versions_dir):
+            return []
+        return sorted(
+            (self.get_metadata(version) for version in os.listdir(versions_dir)
+             if os.path.exists(os.path.join(versions_dir, version, "metadata.json"))),
+            key=lambda metadata: metadata["version"],
+        )
+
+    def get_metadata(self, ref):
+        with open(os.path.join(self._version_dir(self.resolve(ref)), "metadata.json")) as f:
+            return json.load(f)
+
+    def aliases(self):
+        """
+        Returns alias -> version (cached; re-read when aliases.json changes).
+        """
+        now = time.monotonic()
+        if self._aliases is not None and now - self._checked_at < self.check_interval:
+            return self._aliases["aliases"]
+        with self._lock:
+            try:
+                stat = os.stat(self._aliases_path)
+                signature = (stat.st_mtime_ns, stat.st_size)
+            except FileNotFoundError:
+                signature = None
+            if signature != self._aliases_signature or self._aliases is None:
+                self._aliases = self._read_aliases()
+                self._aliases_signature = signature
+            self._checked_at = now
+            return self._aliases["aliases"]
+
+    def _read_aliases(self):
+        if not os.path.exists(self._aliases_path):
+            return {"aliases": {}, "history": {}}
+        with open(self._aliases_path) as f:
+            return json.load(f)
+
+    def resolve(self, ref):
+        """
+        Returns the version a reference points to: an alias, "latest" or a version id.
+        """
+        aliases = self.aliases()
+        if ref in aliases:
+            return aliases[ref]
+        if ref == "latest":
+            versions = self.list_versions()
+            if not versions:
+                raise FileNotFoundError(f"No model versions registered in {self.root}")
+            return versions[-1]["version"]
+        if os.path.isdir(self._version_dir(ref)):
+            return ref
+        raise FileNotFoundError(f"Unknown model version or alias: {ref}")
+
+    def bundle_path(self, ref):
+        return os.path.join(self._version_dir(self.resolve(ref)), "bundle.pkl")
+
+    # ---------------------------------------------------------------- aliases
+    def set_alias(self, alias, ref):
+        """
+        Points `alias` at a version (promote); the previous target is kept for rollback.
+        """
+        version = self.resolve(ref)
+        with file_lock(self._aliases_path + ".lock"):
+            state = self._read_aliases()
+            previous = state["aliases"].get(alias)
+            if previous == version:
+                return version
+            if previous is not None:
+                state["history"].setdefault(alias, []).append(previous)
+            state["aliases"][alias] = version
+            write_json_atomic(self._aliases_path, state)
+        self._checked_at = 0.0
+        logging.info(f"Model alias {alias!r}: {previous} -> {version}")
+        return version
+
+    def remove_alias(self, alias):
+        with file_lock(self._aliases_path + ".lock"):
+            state = self._read_aliases()
+            state["aliases"].pop(alias, None)
+            write_json_atomic(self._aliases_path, state)
+        self._checked_at = 0.0
+
+    def rollback(self, alias=PRODUCTION_ALIAS):
+        """
+        Re-points `alias` at the version it had before its last change.
+        """
+        with file_lock(self._aliases_path + ".lock"):
+            state = self._read_aliases()
+            history = state["history"].get(alias) or []
+            if not history:
+                raise ValueError(f"No previous version recorded for alias {alias!r}")
+            current = state["aliases"].get(alias)
+            state["aliases"][alias] = history.pop()
+            write_json_atomic(self._aliases_path, state)
+        self._checked_at = 0.0
+        logging.info(f"Rolled back model alias {alias!r}: {current} -> {state['aliases'][alias]}")
+        return state["aliases"][alias]
+
+    def delete_version(self, version):
+        """
+        Removes a version that no alias points to.
+        """
+        if version in self.aliases().values():
+            raise ValueError(f"Version {version} is still referenced by an alias")
+        shutil.rmtree(self._version_dir(version))
+
+    def prune(self, keep):
+        """
+        Removes all but the newest `keep` versions, except the ones an alias points
+        to. Removed versions are dropped from the alias histories as well, so a
+        rollback never targets a deleted version.
+
+        Returns:
+            list: The removed versions
+        """
+        if not os.path.isdir(self.root):
+            return []
+        with file_lock(self._aliases_path + ".lock"):
+            state = self._read_aliases()
+            versions = [metadata["version"] for metadata in self.list_versions()]
+            protected = set(versions[-keep:] if keep > 0 else []) | set(state["aliases"].values())
+            removed = [version for version in versions if version not in protected]
+            if not removed:
+                return []
+            state["history"] = {
+                alias: [version for version in history if version not in removed]
+                for alias, history in state["history"].items()
+            }
+            write_json_atomic(self._aliases_path, state)
+            for version in removed:
+                shutil.rmtree(self._version_dir(version), ignore_errors=True)
+        self._checked_at = 0.0
+        logging.info(f"Pruned {len(removed)} model versions from {self.root} (kept the newest {keep} and aliased ones)")
+        return removed
+
+
+# Registries shared within a process, keyed by root directory
+_registries = {}
+
+
+def get_registry(root):
+    registry = _registries.get(root)
+    if registry is None:
+        registry = _registries.setdefault(root, ModelRegistry(root))
+    return registry
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect and manage registered model versions.")
+    parser.add_argument("--root", default=os.path.join("artifacts", "registry"))
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list", help="List versions and aliases")
+    promote = commands.add_parser("promote", help="Point an alias at a version")
+    promote.add_argument("version")
+    promote.add_argument("--alias", default=PRODUCTION_ALIAS)
+    rollback = commands.add_parser("rollback", help="Restore an alias' previous version")
+    rollback.add_argument("--alias", default=PRODUCTION_ALIAS)
+    prune = commands.add_parser("prune", help="Remove old versions no alias points to")
+    prune.add_argument("--keep", type=int, default=5, help="Newest versions to keep")
+    args = parser.parse_args(argv)
+
+    registry = ModelRegistry(args.root)
+    if args.command == "list":
+        aliases = registry.aliases()
+        for metadata in registry.list_versions():
+            names = [alias for alias, version in aliases.items() if version == metadata["version"]]
+            print(f"{metadata['version']}  {metadata.get('model_name', '?'):<22}"
+                  f"test={metadata.get('test_score')}  {', '.join(names)}")
+    elif args.command == "promote":
+        print(registry.set_alias(args.alias, args.version))
+    elif args.command == "prune":
+        print("\n".join(registry.prune(args.keep)))
+    else:
+        print(registry.rollback(args.alias))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,102 +2,493 @@ import os
 import sys
 from dataclasses import dataclass
 import pickle # Added this import to explicitly show it's used
+import joblib
+import numpy as np
 import pandas as pd # You'll need this for data
+from scipy import sparse
 from sklearn.model_selection import train_test_split # Used for splitting data
-from sklearn.linear_model import LogisticRegression
+from sklearn.linear_model import LogisticRegression, SGDClassifier
 from sklearn.tree import DecisionTreeClassifier
 from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
 from sklearn.svm import SVC
 from sklearn.metrics import accuracy_score
+from sklearn.preprocessing import LabelEncoder
+from sklearn.base import clone
 
 from xgboost import XGBClassifier
 from catboost import CatBoostClassifier
 
 from src.exception import CustomException
 from src.logger import logging
-from src.utils import save_object, evaluate_models
+from src.utils import save_object, load_object, evaluate_models, evaluate_models_out_of_core
+from src.components.inference_bundle import InferenceBundle
+from src.components.data_transformation import DataTransformation, transform_in_chunks
+from src.components.model_registry import ModelRegistry
+
+# Models trained on a native feature view (see NATIVE_FEATURE_VIEWS) instead of
+# the one-hot matrix; all other models use the one-hot matrix
+MODEL_FEATURE_VIEWS = {
+    "XGBoost": "xgboost",
+    "CatBoost": "catboost",
+}
+
+# Model families that can keep learning from new rows on top of their fitted state
+# (extra boosting rounds / extra trees / partial_fit passes) instead of being refitted from scratch
+CONTINUABLE_MODELS = ("XGBClassifier", "CatBoostClassifier", "GradientBoostingClassifier", "RandomForestClassifier",
+                      "SGDClassifier")
+
+# Model families of the out-of-core training mode (see evaluate_models_out_of_core):
+# a linear model learning with partial_fit over chunks and XGBoost reading an
+# external-memory DMatrix. CatBoost is left out: its view always has categorical
+# features, which CatBoost cannot quantize from a file without loading it whole
+OUT_OF_CORE_MODELS = ("SGD", "XGBoost")
+# Feature views the out-of-core models train on (chunked by initiate_chunked_transformation)
+OUT_OF_CORE_VIEWS = ("onehot", *(MODEL_FEATURE_VIEWS[name] for name in OUT_OF_CORE_MODELS
+                                 if name in MODEL_FEATURE_VIEWS))
 
 
 @dataclass
 class ModelTrainerConfig:
     # This path is where the .pkl file will be saved
     trained_model_file_path: str = os.path.join("artifacts", "model.pkl")
+    # Fitted winner + its fitted preprocessor, everything serving needs in one file
+    model_bundle_file_path: str = os.path.join("artifacts", "model_bundle.pkl")
+    preprocessor_file_path: str = os.path.join("artifacts", "severity_preprocessor.pkl")
+    # Hyper-parameter search settings (see src.utils.evaluate_models)
+    search_strategy: str = "grid"        # "grid", "random" or "halving"
+    search_n_iter: int = 10              # Candidates per model for random search
+    search_time_budget: float = None     # Wall-clock seconds for the search (None = unlimited)
+    search_n_jobs: int = -1              # Size of the shared process pool
+    threads_per_task: int = 1            # Threads each fit may use inside the pool
+    abandon_margin: float = None         # Drop candidates trailing the best CV score by more
+    fold_cache_dir: str = None           # Keep fold-local arrays between searches (None = per search)
+    # Incremental training: boosting rounds / trees added per refresh
+    incremental_estimators: int = 50
+    # "in_memory" searches all model families on in-memory matrices; "out_of_core"
+    # trains OUT_OF_CORE_MODELS on the on-disk chunks of initiate_chunked_transformation
+    training_mode: str = "in_memory"
+    out_of_core_epochs: int = 5                  # partial_fit passes over the chunks
+    out_of_core_validation_fraction: float = 0.1  # Rows of each chunk held out to rank candidates
+    out_of_core_work_dir: str = None             # XGBoost page cache (None = temp dir)
+    # Model registry every trained bundle is added to (None disables it), and the
+    # aliases moved to each new version, e.g. ("canary",) to stage it before promotion
+    registry_dir: str = os.path.join("artifacts", "registry")
+    registry_aliases: tuple = ("production",)
+    # Versions kept after each registration; older ones no alias points to are removed
+    # (None keeps every version)
+    registry_keep_versions: int = 5
 
 
 class ModelTrainer:
-    def __init__(self):
-        self.model_trainer_config = ModelTrainerConfig()
+    def __init__(self, config: ModelTrainerConfig = None):
+        self.model_trainer_config = config or ModelTrainerConfig()
+
+    def initiate_model_trainer(self, X_train, y_train, X_test, y_test, preprocessor_path=None, feature_views=None):
+        """
+        Searches all model families and saves the winner (model.pkl + model bundle).
 
-    def initiate_model_trainer(self, X_train, y_train, X_test, y_test):
+        Args:
+            X_train, y_train, X_test, y_test: One-hot features and targets
+            preprocessor_path (str): Fitted one-hot preprocessor
+            feature_views (dict): Optional output of DataTransformation.initiate_feature_views;
+                                  models listed in MODEL_FEATURE_VIEWS then train on
+                                  their native view and the bundle carries its encoder
+
+        Returns:
+            tuple: (best model name, best test accuracy)
+        """
         try:
             logging.info("Splitting training and test input data")
 
-            # Define candidate models
-            models = {
-                "Logistic Regression": LogisticRegression(max_iter=200),
-                "Decision Tree": DecisionTreeClassifier(),
-                "Random Forest": RandomForestClassifier(),
-                "Gradient Boosting": GradientBoostingClassifier(),
-                "SVM": SVC(),
-                "XGBoost": XGBClassifier(use_label_encoder=False, eval_metric="mlogloss"),
-                "CatBoost": CatBoostClassifier(verbose=0),
-            }
+            models, params = self.get_search_space()
 
-            # Define hyperparameter grids
-            params = {
-                "Logistic Regression": {
-                    "C": [0.1, 1, 10]
-                },
-                "Decision Tree": {
-                    "max_depth": [3, 5, 7, None]
-                },
-                "Random Forest": {
-                    "n_estimators": [50, 100],
-                    "max_depth": [5, 10, None]
-                },
-                "Gradient Boosting": {
-                    "n_estimators": [50, 100],
-                    "learning_rate": [0.01, 0.1, 0.2]
-                },
-                "SVM": {
-                    "C": [0.1, 1, 10],
-                    "kernel": ["linear", "rbf"]
-                },
-                "XGBoost": {
-                    "n_estimators": [50, 100],
-                    "learning_rate": [0.01, 0.1],
-                    "max_depth": [3, 5, 7]
-                },
-                "CatBoost": {
-                    "iterations": [100, 200],
-                    "learning_rate": [0.01, 0.1],
-                    "depth": [3, 5, 7]
-                }
-            }
+            # Integer-coded target (XGBoost requires classes 0..n-1); the bundle maps codes back
+            label_encoder = LabelEncoder().fit(y_train)
+            y_train = label_encoder.transform(y_train)
+            y_test = label_encoder.transform(y_test)
+
+            # Boosting models consume integer-coded categoricals natively when views are given
+            views = {}
+            for name, view in MODEL_FEATURE_VIEWS.items():
+                if feature_views and view in feature_views and name in models:
+                    self._use_native_view(models[name], view, feature_views[view]["preprocessor"])
+                    views[name] = (feature_views[view]["X_train"], feature_views[view]["X_test"])
+            if views:
+                logging.info(f"Native feature views: {list(views)}")
 
             # Evaluate models
-            model_report: dict = evaluate_models(
-                X_train, y_train, X_test, y_test, models, params
+            config = self.model_trainer_config
+            model_report, model_details = evaluate_models(
+                X_train, y_train, X_test, y_test, models, params,
+                search=config.search_strategy,
+                n_iter=config.search_n_iter,
+                time_budget=config.search_time_budget,
+                n_jobs=config.search_n_jobs,
+                threads_per_task=config.threads_per_task,
+                abandon_margin=config.abandon_margin,
+                return_details=True,
+                feature_views=views,
+                fold_cache_dir=config.fold_cache_dir,
             )
 
-            # Select best model
-            best_model_name = max(model_report, key=model_report.get)
-            best_score = model_report[best_model_name]
-            best_model = models[best_model_name]
+            preprocessor_paths = {
+                view: feature_views[view]["preprocessor_path"] for view in (feature_views or {})
+            }
+            preprocessor_paths["onehot"] = preprocessor_path or config.preprocessor_file_path
+            return self._save_winner(
+                model_report, model_details, views, preprocessor_paths, label_encoder.classes_,
+                feature_dtype=getattr(X_train, "dtype", None), data_fingerprint=joblib.hash((X_train, y_train)),
+            )
 
-            logging.info(f"Best Model Found: {best_model_name} with Accuracy: {best_score}")
+        except Exception as e:
+            raise CustomException(e, sys)
 
-            # Save best model using the save_object function
-            save_object(
-                file_path=self.model_trainer_config.trained_model_file_path,
-                obj=best_model
+    def initiate_out_of_core_training(self, chunked_views):
+        """
+        Searches OUT_OF_CORE_MODELS on on-disk feature chunks and saves the winner
+        (model.pkl + model bundle), without loading a feature matrix into memory:
+        SGD streams over the one-hot chunks with partial_fit and XGBoost trains on an
+        external-memory DMatrix built from its native view's chunks (see
+        evaluate_models_out_of_core). CatBoost is not searched in this mode. Each candidate's peak RSS
+        is logged and recorded in the "search.out_of_core" metrics, the winner's in
+        the bundle metadata.
+
+        Args:
+            chunked_views (dict): Output of DataTransformation.initiate_chunked_transformation;
+                                  must contain the "onehot" view
+
+        Returns:
+            tuple: (best model name, best test accuracy)
+        """
+        try:
+            config = self.model_trainer_config
+            train, test = chunked_views["onehot"]["train"], chunked_views["onehot"]["test"]
+
+            models, params = self.get_search_space()
+            models["SGD"] = SGDClassifier(loss="log_loss", random_state=42)
+            params["SGD"] = {
+                "alpha": [1e-5, 1e-4, 1e-3],
+                "loss": ["log_loss", "modified_huber"],
+            }
+            skipped = sorted(set(models) - set(OUT_OF_CORE_MODELS))
+            logging.info(
+                f"Out-of-core training searches {list(OUT_OF_CORE_MODELS)}; skipped {skipped} "
+                f"(in-memory fits only; CatBoost cannot quantize categorical features from a file)"
+            )
+            models = {name: models[name] for name in OUT_OF_CORE_MODELS}
+
+            # Class vocabulary from the targets alone (small next to the features)
+            label_encoder = LabelEncoder()
+            label_encoder.classes_ = np.unique(np.concatenate([np.unique(y) for y in train.iter_targets()]))
+
+            views = {}
+            for name, view in MODEL_FEATURE_VIEWS.items():
+                if view in chunked_views and name in models:
+                    self._use_native_view(models[name], view, chunked_views[view]["preprocessor"])
+                    views[name] = (chunked_views[view]["train"], chunked_views[view]["test"])
+
+            model_report, model_details = evaluate_models_out_of_core(
+                train, test, models, params, label_encoder.classes_,
+                search=config.search_strategy,
+                n_iter=config.search_n_iter,
+                time_budget=config.search_time_budget,
+                epochs=config.out_of_core_epochs,
+                validation_fraction=config.out_of_core_validation_fraction,
+                n_jobs=config.search_n_jobs,
+                return_details=True,
+                feature_views=views,
+                work_dir=config.out_of_core_work_dir,
+            )
+            for name, details in model_details.items():
+                peaks = [candidate["peak_memory_mb"] for candidate in details["candidates"]]
+                logging.info(f"{name}: peak RSS per candidate {[round(peak) for peak in peaks]} MB")
+
+            preprocessor_paths = {view: chunked["preprocessor_path"] for view, chunked in chunked_views.items()}
+            return self._save_winner(
+                model_report, model_details, views, preprocessor_paths, label_encoder.classes_,
+                feature_dtype=train.dtype, data_fingerprint=train.fingerprint,
+                training_mode="out_of_core",
             )
 
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    @staticmethod
+    def get_search_space():
+        """
+        Returns (candidate models, hyper-parameter grids) of the in-memory search.
+        """
+        # Define candidate models
+        models = {
+            "Logistic Regression": LogisticRegression(max_iter=200),
+            "Decision Tree": DecisionTreeClassifier(),
+            "Random Forest": RandomForestClassifier(),
+            "Gradient Boosting": GradientBoostingClassifier(),
+            "SVM": SVC(),
+            "XGBoost": XGBClassifier(eval_metric="mlogloss"),
+            "CatBoost": CatBoostClassifier(verbose=0),
+        }
+
+        # Define hyperparameter grids
+        params = {
+            "Logistic Regression": {
+                "C": [0.1, 1, 10]
+            },
+            "Decision Tree": {
+                "max_depth": [3, 5, 7, None]
+            },
+            "Random Forest": {
+                "n_estimators": [50, 100],
+                "max_depth": [5, 10, None]
+            },
+            "Gradient Boosting": {
+                "n_estimators": [50, 100],
+                "learning_rate": [0.01, 0.1, 0.2]
+            },
+            "SVM": {
+                "C": [0.1, 1, 10],
+                "kernel": ["linear", "rbf"]
+            },
+            "XGBoost": {
+                "n_estimators": [50, 100],
+                "learning_rate": [0.01, 0.1],
+                "max_depth": [3, 5, 7]
+            },
+            "CatBoost": {
+                "iterations": [100, 200],
+                "learning_rate": [0.01, 0.1],
+                "depth": [3, 5, 7]
+            }
+        }
+        return models, params
+
+    @staticmethod
+    def _use_native_view(model, view, encoder):
+        """
+        Configures a boosting model for the integer-coded categoricals of a native view.
+        """
+        if view == "xgboost":
+            model.set_params(enable_categorical=True, tree_method="hist", feature_types=encoder.feature_types_)
+        else:
+            # Low-cardinality columns: CatBoost's internal one-hot beats target
+            # statistics on speed. A tuple survives sklearn.clone (CatBoost copies lists)
+            model.set_params(cat_features=tuple(encoder.categorical_indices_), one_hot_max_size=255)
+
+    def _save_winner(self, model_report, model_details, views, preprocessor_paths, label_classes,
+                     feature_dtype=None, data_fingerprint=None, training_mode="in_memory"):
+        """
+        Saves the best model of a search (model.pkl) and, fused with the preprocessor
+        of the view it was trained on, as a versioned model bundle.
+
+        Returns:
+            tuple: (best model name, best test accuracy)
+        """
+        config = self.model_trainer_config
+
+        # Select best model (already fitted on the training set by the search)
+        best_model_name = max(model_report, key=model_report.get)
+        best_score = model_report[best_model_name]
+        best_details = model_details[best_model_name]
+        best_model = best_details["estimator"]
+
+        logging.info(
+            f"Best Model Found: {best_model_name} with Accuracy: {best_score}, "
+            f"params: {best_details['params']}"
+        )
+
+        # Save best model using the save_object function
+        save_object(
+            file_path=config.trained_model_file_path,
+            obj=best_model
+        )
+
+        # Persist the fitted winner fused with its preprocessor as one versioned artifact,
+        # i.e. the encoder of its native view when it was trained on one
+        feature_view = MODEL_FEATURE_VIEWS.get(best_model_name) if best_model_name in views else "onehot"
+        preprocessor_path = preprocessor_paths.get(feature_view) or config.preprocessor_file_path
+        if not os.path.exists(preprocessor_path):
+            logging.warning(f"Preprocessor not found at {preprocessor_path}; model bundle not saved")
             return best_model_name, best_score
 
+        bundle = InferenceBundle(
+            preprocessor=load_object(preprocessor_path),
+            model=best_model,
+            metadata={
+                "model_name": best_model_name,
+                "params": best_details["params"],
+                "cv_score": best_details["cv_score"],
+                "test_score": best_score,
+                "search_time": best_details["search_time"],
+                "fit_time": best_details["fit_time"],
+                "peak_memory_mb": best_details.get("peak_memory_mb"),
+                "training_mode": training_mode,
+                "feature_view": feature_view,
+                # Serving builds the one-hot matrix in the dtype the model was trained on
+                "feature_dtype": str(feature_dtype) if feature_dtype is not None and feature_view == "onehot" else None,
+                "label_classes": np.asarray(label_classes).tolist(),
+            },
+        )
+        save_object(file_path=config.model_bundle_file_path, obj=bundle)
+        logging.info(f"Model bundle {bundle.version} saved to {config.model_bundle_file_path}")
+        self._register(bundle, model_report, data_fingerprint)
+        return best_model_name, best_score
+
+    def initiate_incremental_training(self, X_new, y_new, X_test, y_test, X_train=None, y_train=None):
+        """
+        Refreshes the saved model bundle with newly arrived rows instead of a full rebuild.
+
+        - Boosting/forest/SGD winners (CONTINUABLE_MODELS) keep their preprocessor frozen
+          (they were fitted on its scaling) and continue training on the new rows:
+          extra boosting rounds for XGBoost/CatBoost/Gradient Boosting, extra trees for
+          Random Forest, partial_fit passes for SGD.
+        - Other winners get their preprocessor statistics updated incrementally and are
+          refitted with their tuned parameters on the full training split (X_train,
+          y_train), warm-started from the current solution where supported. The
+          hyper-parameter search is skipped.
+
+        Args:
+            X_new, y_new: New training rows (raw feature frame, target)
+            X_test, y_test: Evaluation rows (raw feature frame, target)
+            X_train, y_train: Full training split (raw), needed by the refit path
+
+        Returns:
+            tuple: (model name, test score, mode) with mode "continued" or "refitted",
+                   or None when a full retrain is required (no bundle yet, new
+                   categories, or new rows that cannot be used incrementally)
+        """
+        try:
+            config = self.model_trainer_config
+            if not os.path.exists(config.model_bundle_file_path):
+                logging.info("No model bundle found; incremental training needs a full retrain")
+                return None
+
+            bundle = load_object(config.model_bundle_file_path)
+            preprocessor, model = bundle.preprocessor, bundle.model
+            model_name = bundle.metadata.get("model_name", type(model).__name__)
+            # Raw labels, for the preprocessor's spatial severity rates
+            new_target, train_target = y_new, y_train
+
+            if bundle.label_classes is not None:
+                # Same integer coding of the target as the original training run
+                labels = pd.Index(bundle.label_classes)
+                y_new, y_test = labels.get_indexer(y_new), labels.get_indexer(y_test)
+                y_train = labels.get_indexer(y_train) if y_train is not None else None
+                if (y_new < 0).any() or (y_test < 0).any():
+                    logging.info("New target labels; incremental training needs a full retrain")
+                    return None
+
+            continuable = (
+                type(model).__name__ in CONTINUABLE_MODELS
+                # Continuing needs every known class in the new rows (per-class trees)
+                and set(np.unique(y_new)) == set(model.classes_)
+            )
+            if not continuable and X_train is None:
+                logging.info(f"{model_name} cannot be continued and no training split was given")
+                return None
+
+            unseen = DataTransformation().update_transformer_object(
+                preprocessor, X_new, update_statistics=not continuable, new_target=new_target
+            )
+            if unseen:
+                return None
+
+            dtype = bundle.metadata.get("feature_dtype")
+            if continuable:
+                mode = "continued"
+                model = self._continue_training(model, self._transform(preprocessor, X_new, dtype), y_new)
+            else:
+                mode = "refitted"
+                if "warm_start" in model.get_params():
+                    model.set_params(warm_start=True)
+                # Out-of-fold spatial rates, as in the full build (the index holds these rows' targets)
+                X_fit = DataTransformation.transform_training_rows(preprocessor, X_train, train_target, dtype)
+                model.fit(sparse.csr_matrix(X_fit) if sparse.issparse(X_fit) else X_fit, y_train)
+
+            score = accuracy_score(y_test, model.predict(self._transform(preprocessor, X_test, dtype)))
+            logging.info(
+                f"Incremental training ({mode}) of {model_name} on {len(X_new)} new rows: "
+                f"test accuracy {score} (was {bundle.metadata.get('test_score')})"
+            )
+
+            save_object(file_path=config.trained_model_file_path, obj=model)
+            if bundle.metadata.get("feature_view", "onehot") == "onehot":
+                save_object(file_path=config.preprocessor_file_path, obj=preprocessor)
+            metadata = {k: v for k, v in bundle.metadata.items() if k != "version"}
+            metadata.update(
+                test_score=score,
+                incremental_mode=mode,
+                incremental_rows=len(X_new),
+                base_version=bundle.version,
+            )
+            refreshed = InferenceBundle(preprocessor=preprocessor, model=model, metadata=metadata)
+            save_object(file_path=config.model_bundle_file_path, obj=refreshed)
+            logging.info(f"Model bundle {refreshed.version} saved to {config.model_bundle_file_path}")
+            self._register(refreshed, {model_name: score}, joblib.hash((X_new, y_new)))
+
+            return model_name, score, mode
+
         except Exception as e:
             raise CustomException(e, sys)
 
+    def restore_registry_aliases(self):
+        """
+        Points config.registry_aliases at the saved model bundle again, e.g. after
+        the pipeline restored it from its stage cache (registering it if the
+        registry no longer has that version).
+        """
+        config = self.model_trainer_config
+        if not config.registry_dir or not os.path.exists(config.model_bundle_file_path):
+            return
+        bundle = load_object(config.model_bundle_file_path)
+        registry = ModelRegistry(config.registry_dir)
+        try:
+            registry.resolve(bundle.version)
+        except FileNotFoundError:
+            registry.register(bundle, metrics={bundle.metadata.get("model_name"): bundle.metadata.get("test_score")})
+        for alias in config.registry_aliases:
+            registry.set_alias(alias, bundle.version)
+        if config.registry_keep_versions is not None:
+            registry.prune(config.registry_keep_versions)
+
+    def _register(self, bundle, metrics, data_fingerprint):
+        config = self.model_trainer_config
+        if not config.registry_dir:
+            return
+        registry = ModelRegistry(config.registry_dir)
+        registry.register(bundle, metrics=metrics, data_fingerprint=data_fingerprint, aliases=config.registry_aliases)
+        if config.registry_keep_versions is not None:
+            registry.prune(config.registry_keep_versions)
+
+    @staticmethod
+    def _transform(preprocessor, X, dtype=None):
+        X = transform_in_chunks(preprocessor, X, dtype=dtype)
+        # Same container the model was trained on (see DataTransformation)
+        return sparse.csr_matrix(X) if sparse.issparse(X) else X
+
+    def _continue_training(self, model, X_new, y_new):
+        extra = self.model_trainer_config.incremental_estimators
+        kind = type(model).__name__
+        if kind == "XGBClassifier":
+            # Adds `extra` boosting rounds on top of the existing booster
+            booster = model.get_booster()
+            model.set_params(n_estimators=extra)
+            model.fit(X_new, y_new, xgb_model=booster)
+            return model
+        if kind == "CatBoostClassifier":
+            # A fitted CatBoost model is immutable: grow a fresh one from it
+            continued = clone(model).set_params(iterations=extra)
+            continued.fit(X_new, y_new, init_model=model)
+            return continued
+        if kind == "SGDClassifier":
+            # Further passes over the new rows only, from the current coefficients
+            for _ in range(self.model_trainer_config.out_of_core_epochs):
+                model.partial_fit(X_new, y_new)
+            return model
+        # scikit-learn ensembles: warm_start keeps the fitted trees and adds new ones
+        model.set_params(warm_start=True, n_estimators=model.n_estimators + extra)
+        model.fit(X_new, y_new)
+        return model
+
 # --- This is the code you need to add to the bottom of the file ---
 if __name__ == "__main__":
     import numpy as np
@@ -1,21 +1,83 @@
-import traceback   # Used to extract detailed stack trace information
 import sys         # Gives access to system-specific parameters and functions (like current exception info)
 
+
+# Raised when a stored artifact does not match the checksum recorded when it was saved
+class ArtifactIntegrityError(OSError):
+    pass
+
+
+# Error codes the serving layer can map to responses without parsing messages:
+# (exception types, error code, HTTP status). First match wins.
+ERROR_CODES = (
+    (FileNotFoundError, "ARTIFACT_NOT_FOUND", 503),
+    (ArtifactIntegrityError, "ARTIFACT_CORRUPTED", 503),
+    ((KeyError, ValueError, TypeError), "INVALID_INPUT", 400),
+    (MemoryError, "RESOURCE_EXHAUSTED", 503),
+    (TimeoutError, "TIMEOUT", 504),
+)
+DEFAULT_ERROR = ("INTERNAL_ERROR", 500)
+
+
 # Custom exception class that extends Python's built-in Exception class
 class CustomException(Exception):
 
-    # Constructor method for initializing the custom exception
-    def __init__(self, error_message, error_detail: sys):
+    # Constructor method for initializing the custom exception.
+    # Construction is cheap: it only keeps references to the original exception and
+    # its traceback; the file/line message is rendered on first str()/logging use.
+    def __init__(self, error_message, error_detail: sys = sys, code: str = None):
         super().__init__(error_message)  # Call the base Exception constructor
-        # Create a detailed error message using the static method below
-        self.error_message = self.get_detailed_error_message(error_message, error_detail)
+
+        # Original exception being wrapped (if any); kept as the explicit cause so
+        # `raise CustomException(e, sys)` preserves the chain even outside `from e`
+        self.original = error_message if isinstance(error_message, BaseException) else None
+        if self.original is not None:
+            self.__cause__ = self.original
+            self._traceback = self.original.__traceback__
+        else:
+            # No exception object given: use the one being handled, if any
+            self._traceback = sys.exc_info()[2]
+
+        # Re-wrapping a CustomException keeps its code; otherwise map the original type
+        if isinstance(self.original, CustomException):
+            self.code, self.http_status = self.original.code, self.original.http_status
+        else:
+            self.code, self.http_status = self.classify(self.original)
+        if code is not None:
+            self.code = code
+
+        self._error_message = None  # Rendered lazily, then cached
+
+    @staticmethod
+    def classify(exc):
+        """Returns (error code, HTTP status) for an exception instance (or None)."""
+        if exc is not None:
+            for types, code, status in ERROR_CODES:
+                if isinstance(exc, types):
+                    return code, status
+        return DEFAULT_ERROR
+
+    # Detailed message with file name & line number, built on first access
+    @property
+    def error_message(self):
+        if self._error_message is None:
+            message = self.args[0] if self.args else ""
+            if self._traceback is None:
+                # Constructed outside of exception handling: no location to report
+                self._error_message = f"Error : {message}"
+            else:
+                self._error_message = self.get_detailed_error_message(message, traceback=self._traceback)
+        return self._error_message
 
     # Static method to build a detailed error message with file name & line number
     @staticmethod
-    def get_detailed_error_message(error_message, error_detail: sys):
-        
-        # Get the traceback object from the current exception
-        _, _, exc_tb = sys.exc_info()
+    def get_detailed_error_message(error_message, error_detail: sys = sys, traceback=None):
+
+        # Get the traceback object (explicit one, else from the exception being handled)
+        exc_tb = traceback if traceback is not None else sys.exc_info()[2]
+
+        # Outside of exception handling there is no location to report
+        if exc_tb is None:
+            return f"Error : {error_message}"
 
         # Extract the file name where the exception occurred
         file_name = exc_tb.tb_frame.f_code.co_filename
@@ -25,7 +87,7 @@ class CustomException(Exception):
 
         # Return a formatted error string with file name, line number, and the message
         return f"Error in {file_name} , line {line_number} : {error_message}"
-    
+
     # When the exception object is converted to string, return the detailed error message
     def __str__(self):
         return self.error_message
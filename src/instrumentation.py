@@ -0,0 +1,230 @@
+import cProfile
+import functools
+import json
+import os
+import resource
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Stages whose cProfile output should be captured, e.g. PROFILE_STAGES="transformation.fit_transform"
+PROFILE_STAGES = {s.strip() for s in os.environ.get("PROFILE_STAGES", "").split(",") if s.strip()}
+PROFILE_DIR = os.environ.get("PROFILE_DIR", os.path.join("artifacts", "profiles"))
+# Optional JSON-lines sink; every finished stage is appended as one line
+METRICS_FILE = os.environ.get("STAGE_METRICS_FILE")
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def current_rss_mb():
+    """
+    Returns the resident set size of this process in MB.
+    Falls back to the peak RSS where /proc is not available.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE / 2**20
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in KB on Linux, bytes on macOS
+        return peak / 2**20 if peak > 2**32 else peak / 2**10
+
+
+def _read_peak_rss_mb():
+    """
+    Returns the peak RSS (VmHWM) of this process in MB, or None without /proc.
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 2**10
+    except OSError:
+        pass
+    return None
+
+
+def _reset_peak_rss():
+    """
+    Resets the kernel's peak RSS of this process to its current RSS (Linux >= 4.0).
+    Returns False where that is not supported.
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+@contextmanager
+def track_peak_memory(sample_interval=0.01):
+    """
+    Measures the peak RSS of this process while a block runs.
+
+    Yields a dict whose "peak_mb" (peak RSS) and "peak_delta_mb" (peak above the RSS
+    at entry) are set when the block exits. On Linux the kernel's high-water mark is
+    reset at entry and read at exit; elsewhere RSS is sampled every `sample_interval`
+    seconds on a background thread. The mark is per process, so concurrent blocks in
+    other threads of the same process are counted too.
+    """
+    info = {"peak_mb": None, "peak_delta_mb": None}
+    rss_before = current_rss_mb()
+    sampler = None
+    if not (_reset_peak_rss() and _read_peak_rss_mb() is not None):
+        peak = [rss_before]
+        stop = threading.Event()
+
+        def sample():
+            while not stop.wait(sample_interval):
+                peak[0] = max(peak[0], current_rss_mb())
+
+        sampler = threading.Thread(target=sample, daemon=True)
+        sampler.start()
+    try:
+        yield info
+    finally:
+        if sampler is None:
+            info["peak_mb"] = _read_peak_rss_mb()
+        else:
+            stop.set()
+            sampler.join()
+            info["peak_mb"] = max(peak[0], current_rss_mb())
+        info["peak_delta_mb"] = info["peak_mb"] - rss_before
+
+
+class StageMetrics:
+    """
+    Thread-safe collector of stage timings.
+
+    Keeps the most recent records for export plus running per-stage aggregates
+    (count, wall/CPU seconds, rows) that back the Prometheus text exposition.
+    """
+
+    def __init__(self, max_records=10_000, metrics_file=None):
+        self.records = deque(maxlen=max_records)
+        self.aggregates = {}
+        self.metrics_file = metrics_file
+        self._lock = threading.Lock()
+
+    def record(self, stage, wall_s, cpu_s=None, rows=None, mem_delta_mb=None, **labels):
+        entry = {
+            "stage": stage,
+            "timestamp": time.time(),
+            "wall_s": wall_s,
+            "cpu_s": cpu_s,
+            "rows": rows,
+            "mem_delta_mb": mem_delta_mb,
+        }
+        entry.update(labels)
+        with self._lock:
+            self.records.append(entry)
+            agg = self.aggregates.setdefault(stage, {"count": 0, "wall_s": 0.0, "cpu_s": 0.0, "rows": 0})
+            agg["count"] += 1
+            agg["wall_s"] += wall_s
+            agg["cpu_s"] += cpu_s or 0.0
+            agg["rows"] += rows or 0
+        # Outside the lock: serving threads must not queue behind file I/O. Each
+        # record is one write in append mode, so concurrent lines do not interleave
+        if self.metrics_file:
+            os.makedirs(os.path.dirname(self.metrics_file) or ".", exist_ok=True)
+            with open(self.metrics_file, "a") as f:
+                f.write(json.dumps(entry, default=str) + "\n")
+        return entry
+
+    def export_jsonl(self, file_path):
+        """
+        Writes the buffered records as JSON lines and returns the number written.
+        """
+        os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+        with self._lock:
+            records = list(self.records)
+        with open(file_path, "w") as f:
+            for entry in records:
+                f.write(json.dumps(entry, default=str) + "\n")
+        return len(records)
+
+    def to_prometheus(self, prefix="pipeline_stage"):
+        """
+        Returns the per-stage aggregates in the Prometheus text exposition format.
+        """
+        with self._lock:
+            aggregates = {stage: dict(agg) for stage, agg in self.aggregates.items()}
+        lines = []
+        for metric, key, help_text in (
+            ("runs_total", "count", "Number of completed stage executions"),
+            ("wall_seconds_total", "wall_s", "Wall-clock seconds spent in the stage"),
+            ("cpu_seconds_total", "cpu_s", "Process CPU seconds spent in the stage"),
+            ("rows_total", "rows", "Rows processed by the stage"),
+        ):
+            name = f"{prefix}_{metric}"
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            for stage, agg in sorted(aggregates.items()):
+                lines.append(f'{name}{{stage="{stage}"}} {agg[key]}')
+        return "\n".join(lines) + "\n"
+
+    def summary(self):
+        with self._lock:
+            return {stage: dict(agg) for stage, agg in self.aggregates.items()}
+
+    def reset(self):
+        with self._lock:
+            self.records.clear()
+            self.aggregates.clear()
+
+
+# Process-wide collector used by all pipeline stages
+metrics = StageMetrics(metrics_file=METRICS_FILE)
+
+
+@contextmanager
+def track_stage(stage, rows=None, track_memory=True, profile=None, **labels):
+    """
+    Times a block of code and records it under `stage`.
+
+    Yields a dict; set `info["rows"]` inside the block when the row count is only
+    known afterwards. Other keys set in the block are recorded as labels (e.g. an
+    outcome only known at the end). Memory delta is the change in RSS (skip it with
+    track_memory=False on hot paths). With profile=True, or when the stage is listed
+    in $PROFILE_STAGES, a cProfile dump is written to $PROFILE_DIR/<stage>-<time>.prof.
+    """
+    info = {"rows": rows}
+    profiler = None
+    if profile or (profile is None and stage in PROFILE_STAGES):
+        profiler = cProfile.Profile()
+    rss_before = current_rss_mb() if track_memory else None
+    wall, cpu = time.perf_counter(), time.process_time()
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield info
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        wall_s = time.perf_counter() - wall
+        cpu_s = time.process_time() - cpu
+        mem_delta = current_rss_mb() - rss_before if track_memory else None
+        if profiler is not None:
+            os.makedirs(PROFILE_DIR, exist_ok=True)
+            profile_path = os.path.join(PROFILE_DIR, f"{stage}-{time.strftime('%Y%m%d%H%M%S')}.prof")
+            profiler.dump_stats(profile_path)
+            labels["profile"] = profile_path
+        labels.update((key, value) for key, value in info.items() if key != "rows")
+        metrics.record(stage, wall_s, cpu_s, info["rows"], mem_delta, **labels)
+
+
+def instrumented(stage=None, track_memory=True):
+    """
+    Decorator form of track_stage; the stage name defaults to the function's qualified name.
+    """
+    def decorator(func):
+        name = stage or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with track_stage(name, track_memory=track_memory):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -1,26 +1,207 @@
+import atexit
+import contextvars
+import json
 import logging
+import logging.handlers
 import os
+import queue
+import random
+from contextlib import contextmanager
 from datetime import datetime
 
 # Directory to store log files
-LOGS_DIR = "logs"
+LOGS_DIR = os.environ.get("LOGS_DIR", "logs")
 os.makedirs(LOGS_DIR, exist_ok=True)
 
-# Daily rotating filename (simple date-based naming)
-LOG_FILE = os.path.join(
-    LOGS_DIR,
-    f"log_{datetime.now().strftime('%Y-%m-%d')}.log"
-)
+# Active log file; rotated at midnight to pipeline.log.YYYY-MM-DD (see LOG_ROTATION)
+LOG_FILE = os.path.join(LOGS_DIR, "pipeline.log")
+
+LOG_FORMAT = "[%(asctime)s] %(levelname)s - %(message)s"
+
+# Settings (environment overridable)
+LOG_ASYNC = os.environ.get("LOG_ASYNC", "1") == "1"                     # Queue handler + background writer
+LOG_JSON = os.environ.get("LOG_JSON", "0") == "1"                       # One JSON object per line
+LOG_RETENTION_DAYS = int(os.environ.get("LOG_RETENTION_DAYS", "14"))    # Rotated files to keep
+LOG_PREDICTION_SAMPLE_RATE = float(os.environ.get("LOG_PREDICTION_SAMPLE_RATE", "1.0"))
+# Who rotates the log file:
+#   "midnight"  this process (TimedRotatingFileHandler). Single process only: with several
+#               processes on one file each one rolls over, and a later rollover deletes
+#               the pipeline.log.<date> an earlier one just wrote.
+#   "external"  an external tool such as logrotate; the file is reopened when it has
+#               been moved (WatchedFileHandler) and LOG_RETENTION_DAYS does not apply.
+#   "auto"      "midnight" in a single process; "external" once the process forks (the
+#               workers of a pre-forking server and their parent) or when
+#               WEB_CONCURRENCY > 1 (workers importing the app themselves).
+LOG_ROTATION = os.environ.get("LOG_ROTATION", "auto")
+
+# Request id of the request being handled (set by the serving layer)
+request_id_var = contextvars.ContextVar("request_id", default="-")
+
+
+class RequestIdFilter(logging.Filter):
+    """Attaches the current request id to every record."""
+
+    def filter(self, record):
+        record.request_id = request_id_var.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps only a fraction of INFO/DEBUG records from the given logger names
+    (e.g. per-request prediction logs). Warnings and errors are never dropped.
+    """
+
+    def __init__(self, rate, names=("prediction",)):
+        super().__init__()
+        self.rate = rate
+        self.names = tuple(names)
+
+    def filter(self, record):
+        if self.rate >= 1.0 or record.levelno >= logging.WARNING:
+            return True
+        if not record.name.startswith(self.names):
+            return True
+        return random.random() < self.rate
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as single-line JSON documents."""
+
+    def format(self, record):
+        payload = {
+            "time": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", "-"),
+        }
+        if record.exc_info:
+            payload["exception"] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str)
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that enqueues records unformatted.
+
+    The stock handler renders the message (and any exception text) in the calling
+    thread; here that work happens in the listener thread, so e.g. a logged
+    CustomException is only rendered off the request path.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+_listener = None
+_settings = {}
+_forked = False   # Set once this process has forked (or is a forked child)
+
+
+def _rotation_mode(rotation):
+    if rotation != "auto":
+        return rotation
+    multiple_workers = int(os.environ.get("WEB_CONCURRENCY", "1") or 1) > 1
+    return "external" if _forked or multiple_workers else "midnight"
+
+
+def configure_logging(async_mode=LOG_ASYNC, json_format=LOG_JSON,
+                      retention_days=LOG_RETENTION_DAYS, sample_rate=LOG_PREDICTION_SAMPLE_RATE,
+                      rotation=LOG_ROTATION):
+    """
+    (Re)configures the root logger.
+
+    With in-process rotation the file handler rotates at midnight and keeps
+    `retention_days` old files; that is only safe while a single process writes the
+    file, so with several processes rotation is left to an external tool (see
+    LOG_ROTATION). In async mode callers only enqueue records (QueueHandler); a
+    QueueListener thread formats and writes them, so logging never blocks the
+    request path on disk I/O.
+    """
+    global _listener
+
+    if rotation not in ("auto", "midnight", "external"):
+        raise ValueError(f"Unknown log rotation mode: {rotation}")
+    _settings.update(async_mode=async_mode, json_format=json_format,
+                     retention_days=retention_days, sample_rate=sample_rate, rotation=rotation)
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+    if _rotation_mode(rotation) == "midnight":
+        file_handler = logging.handlers.TimedRotatingFileHandler(
+            LOG_FILE, when="midnight", backupCount=retention_days, encoding="utf-8", delay=True
+        )
+    else:
+        file_handler = logging.handlers.WatchedFileHandler(LOG_FILE, encoding="utf-8", delay=True)
+    file_handler.setFormatter(JsonFormatter() if json_format else logging.Formatter(LOG_FORMAT))
+
+    filters = [RequestIdFilter(), SamplingFilter(sample_rate)]
+    if async_mode:
+        log_queue = queue.SimpleQueue()
+        queue_handler = DeferredQueueHandler(log_queue)
+        for log_filter in filters:
+            queue_handler.addFilter(log_filter)
+        root.addHandler(queue_handler)
+        _listener = logging.handlers.QueueListener(log_queue, file_handler, respect_handler_level=True)
+        _listener.start()
+    else:
+        for log_filter in filters:
+            file_handler.addFilter(log_filter)
+        root.addHandler(file_handler)
+
+    root.setLevel(logging.INFO)
+
+
+def shutdown_logging():
+    """Flushes queued records and stops the background writer."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+@contextmanager
+def request_context(request_id):
+    """Binds `request_id` to all records logged inside the block."""
+    token = request_id_var.set(request_id)
+    try:
+        yield
+    finally:
+        request_id_var.reset(token)
+
+
+def _reconfigure_after_fork():
+    # The listener thread does not survive fork; give the child its own queue and writer
+    # (several processes now share the file, so none of them rotates it in "auto" mode)
+    global _listener, _forked
+    _listener = None
+    _forked = True
+    configure_logging(**_settings)
+
+
+def _stop_rotating_after_fork():
+    # The parent of forked workers shares the file with them from now on
+    global _forked
+    if not _forked:
+        _forked = True
+        if _settings.get("rotation") == "auto":
+            configure_logging(**_settings)
+
 
 # Configure root logger once
-logging.basicConfig(
-    filename=LOG_FILE,
-    format="[%(asctime)s] %(levelname)s - %(message)s",
-    level=logging.INFO
-)
+configure_logging()
+atexit.register(shutdown_logging)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reconfigure_after_fork, after_in_parent=_stop_rotating_after_fork)
+
 
 def get_logger(name: str) -> logging.Logger:
     """Return a module-specific logger inheriting the root configuration."""
     logger = logging.getLogger(name)
     logger.setLevel(logging.INFO)
-    return logger
\ No newline at end of file
+    return logger
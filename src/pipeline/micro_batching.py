@@ -0,0 +1,202 @@
+import asyncio
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from src.exception import CustomException
+from src.logger import logging
+from src.pipeline.predict_pipeline import FEATURE_COLUMNS, TEMPORAL_COLUMNS, PredictPipeline
+
+# Columns coerced to float per request (see MicroBatcher._validated)
+NUMERIC_COLUMNS = ["Latitude", "Longitude"]
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent prediction requests into micro-batches.
+
+    Requests are queued on an asyncio event loop; a single worker drains the queue
+    into batches of up to `max_batch_size` rows, waiting at most `max_wait_ms` after
+    the first request of a batch, then runs one vectorized PredictPipeline.predict
+    (off the loop, in a worker thread) and fans the results back to the callers.
+
+    Async callers `await batcher.predict(df)` from their own loop. Synchronous
+    callers (e.g. threaded WSGI workers) use `batcher.submit(df)`, which runs the
+    loop in a background thread started lazily per process, so it is safe to create
+    the batcher before a pre-forking server forks its workers.
+    """
+
+    def __init__(self, pipeline: PredictPipeline = None, max_batch_size=64, max_wait_ms=5.0):
+        self.pipeline = pipeline or PredictPipeline()
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.stats = {"requests": 0, "rows": 0, "batches": 0}
+        self._loop = None
+        self._queue = None
+        self._worker = None
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+        # Single thread: batches are scored one after another, each fully vectorized
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="micro-batch")
+
+    # ------------------------------------------------------------------ asyncio API
+    async def predict(self, features, return_version=False):
+        """
+        Returns the predictions for `features`: a DataFrame, one dict record or a list
+        of dict records. Records are the cheapest input: a whole batch of them becomes
+        one DataFrame, instead of concatenating one small frame per request.
+        With return_version=True returns (predictions, version of the scoring bundle).
+        """
+        if isinstance(features, dict):
+            features = [features]
+        features = self._validated(features)
+
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._bind(loop)
+        future = loop.create_future()
+        await self._queue.put((features, future))
+        preds, version = await future
+        return (preds, version) if return_version else preds
+
+    def _bind(self, loop):
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        self._worker = loop.create_task(self._run())
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            n_rows = len(batch[0][0])
+            deadline = loop.time() + self.max_wait
+
+            # Keep collecting until the batch is full or the oldest request has waited long enough
+            while n_rows < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                batch.append(item)
+                n_rows += len(item[0])
+
+            try:
+                # Inside the try: an error here must fail the batch, not stop the worker
+                frame = self._batch_frame([features for features, _ in batch])
+                preds, version = await loop.run_in_executor(self._executor, self._score, frame)
+            except Exception as e:
+                logging.error(f"Micro-batch of {n_rows} rows failed: {e}")
+                # Re-score the requests one by one so only the failing ones fail
+                for features, future in batch if len(batch) > 1 else ():
+                    try:
+                        result, version = await loop.run_in_executor(
+                            self._executor, self._score, self._batch_frame([features])
+                        )
+                    except Exception as request_error:
+                        if not future.done():
+                            future.set_exception(request_error)
+                    else:
+                        if not future.done():
+                            future.set_result((list(result), version))
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self.stats["requests"] += len(batch)
+            self.stats["rows"] += n_rows
+            self.stats["batches"] += 1
+
+            start = 0
+            for features, future in batch:
+                stop = start + len(features)
+                if not future.done():
+                    future.set_result((list(preds[start:stop]), version))
+                start = stop
+
+    def _score(self, frame):
+        return self.pipeline.predict(frame, return_version=True)
+
+    @staticmethod
+    def _validated(features):
+        """
+        Checks a request's feature columns and coerces its numeric columns to float
+        before it is queued, so that malformed input fails that request alone, not
+        the micro-batch it would join.
+        """
+        if isinstance(features, pd.DataFrame):
+            missing = [column for column in FEATURE_COLUMNS if column not in features.columns]
+            if missing:
+                raise KeyError(f"Missing feature columns: {missing}")
+            present = [column for column in NUMERIC_COLUMNS if column in features.columns]
+            return features.astype({column: float for column in present}) if present else features
+        return [
+            {**record, **{column: float(record[column]) for column in NUMERIC_COLUMNS
+                          if record.get(column) is not None}}
+            for record in features
+        ]
+
+    @staticmethod
+    def _batch_frame(parts):
+        if all(isinstance(part, list) for part in parts):
+            records = [record for part in parts for record in part]
+            # Records without Date/Time get empty values (imputed calendar features)
+            return pd.DataFrame.from_records(records, columns=FEATURE_COLUMNS + TEMPORAL_COLUMNS)
+        frames = [part if isinstance(part, pd.DataFrame) else pd.DataFrame.from_records(part)
+                  for part in parts]
+        return pd.concat(
+            [frame[FEATURE_COLUMNS + [column for column in TEMPORAL_COLUMNS if column in frame.columns]]
+             for frame in frames],
+            ignore_index=True,
+        )
+
+    # -------------------------------------------------------------- synchronous API
+    def start(self):
+        """
+        Starts the background event loop thread for this process (idempotent).
+        """
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            # After a fork the parent's loop thread does not exist in the child
+            loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def run():
+                asyncio.set_event_loop(loop)
+                self._bind(loop)
+                ready.set()
+                loop.run_forever()
+
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="micro-batch")
+            self._thread = threading.Thread(target=run, name="micro-batcher", daemon=True)
+            self._thread.start()
+            ready.wait()
+            self._pid = os.getpid()
+            logging.info(
+                f"Micro-batcher started (max_batch_size={self.max_batch_size}, "
+                f"max_wait_ms={self.max_wait * 1000:g})"
+            )
+
+    def submit(self, features, timeout=None, return_version=False):
+        """
+        Blocking counterpart of predict() for threaded callers.
+        """
+        try:
+            self.start()
+            future = asyncio.run_coroutine_threadsafe(self.predict(features, return_version), self._loop)
+            return future.result(timeout)
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def get_stats(self):
+        stats = dict(self.stats)
+        stats["avg_batch_rows"] = stats["rows"] / stats["batches"] if stats["batches"] else 0.0
+        return stats
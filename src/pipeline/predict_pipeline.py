@@ -1,31 +1,316 @@
 import sys
 import os
+import argparse
+import random
+import zlib
+from dataclasses import dataclass
+import numpy as np
 import pandas as pd
 from src.exception import CustomException
-from src.utils import load_object
+from src.logger import logging
+from src.utils import artifact_cache, frame_format, read_frame
+from src.components.data_transformation import load_timestamps, parse_timestamps
+from src.components.model_registry import CANARY_ALIAS, PRODUCTION_ALIAS, get_registry
+from src.pipeline.prediction_cache import MISSING, get_prediction_cache
+from src.instrumentation import track_stage
+
+
+# Column layout of rawdata/data.csv (Date/Time/Severity are optional at scoring time)
+RAW_COLUMNS = [
+    "Date", "Time", "Weather", "Road_Condition", "Time_of_Day", "Traffic",
+    "Accident_Type", "Vehicle_Type", "Accident_Reason", "Latitude", "Longitude", "Severity",
+]
+FEATURE_COLUMNS = [
+    "Weather", "Road_Condition", "Time_of_Day", "Traffic", "Accident_Type",
+    "Vehicle_Type", "Accident_Reason", "Latitude", "Longitude",
+]
+# Optional at scoring time; models with temporal features impute the calendar
+# features of records without them (or with empty values) from the training data
+TEMPORAL_COLUMNS = ["Date", "Time"]
+
+
+@dataclass
+class PredictPipelineConfig:
+    # Fused preprocessor + model artifact written by ModelTrainer
+    bundle_file_path: str = os.path.join("artifacts", "model_bundle.pkl")
+    batch_chunk_size: int = 100_000   # Rows transformed/scored per vectorized pass
+    # Memoized predictions for repeated feature combinations (0 disables the cache)
+    prediction_cache_size: int = 10_000
+    prediction_cache_ttl: float = 300.0   # Seconds an entry stays valid
+    geo_grid: float = 1e-3                # Lat/long quantization in degrees for cache keys
+    # Model registry (see ModelRegistry); when set, bundles are loaded by alias/version
+    # from it instead of bundle_file_path
+    registry_dir: str = None
+    model_ref: str = PRODUCTION_ALIAS     # Alias or version serving regular traffic
+    canary_ref: str = CANARY_ALIAS        # Alias or version receiving the canary share
+    canary_fraction: float = 0.0          # Share of predict() calls routed to canary_ref
+    # Parsed Date/Time of batch input files, reused while the file is unchanged
+    timestamp_cache_dir: str = os.path.join("artifacts", "timestamps")
 
 
 class PredictPipeline:
-    def __init__(self):
-        pass
+    def __init__(self, config: PredictPipelineConfig = None):
+        self.predict_config = config or PredictPipelineConfig()
+
+    def load_bundle(self, ref=None):
+        """
+        Returns the InferenceBundle from the process-wide artifact cache.
+        It is deserialized once and hot-swapped when the file changes on disk.
+
+        With a registry configured, `ref` (an alias or version, default
+        config.model_ref) is resolved on each call. Registered versions are
+        immutable, so promoting or rolling back an alias only switches which
+        cached bundle is returned; nothing is reloaded once a version has been used.
+        """
+        config = self.predict_config
+        if config.registry_dir:
+            registry = get_registry(config.registry_dir)
+            return artifact_cache.get(registry.bundle_path(ref or config.model_ref))
+        if not os.path.exists(config.bundle_file_path):
+            # model.pkl alone cannot serve: it predicts label codes for one of several
+            # feature views, which only the bundle's metadata records
+            raise FileNotFoundError(
+                f"Model bundle not found at {config.bundle_file_path}; run the training pipeline first"
+            )
+        return artifact_cache.get(config.bundle_file_path)
 
-    def predict(self, features):
+    def _use_canary(self, routing_key=None):
+        """
+        Decides whether a call goes to the canary. A routing key (e.g. a client id)
+        makes the decision sticky; without one the call is routed at random.
+        """
+        config = self.predict_config
+        if not config.registry_dir or config.canary_fraction <= 0:
+            return False
+        if routing_key is None:
+            draw = random.random()
+        else:
+            draw = zlib.crc32(str(routing_key).encode()) / 2**32
+        if draw >= config.canary_fraction:
+            return False
         try:
-            model_path = os.path.join("artifacts", "model.pkl")
-            preprocessor_path = os.path.join("artifacts", "preprocessor.pkl")
+            get_registry(config.registry_dir).resolve(config.canary_ref)
+        except FileNotFoundError:
+            return False   # No canary deployed
+        return True
 
-            print("Before Loading")
-            model = load_object(file_path=model_path)
-            preprocessor = load_object(file_path=preprocessor_path)
-            print("After Loading")
+    def predict(self, features, routing_key=None, return_version=False):
+        """
+        Scores features with the production bundle, or the canary for its share of calls.
 
-            data_scaled = preprocessor.transform(features)
-            preds = model.predict(data_scaled)
-            return preds
+        With return_version=True returns (predictions, version of the bundle that
+        scored them), so callers can attribute predictions to the canary or production.
+        """
+        try:
+            config = self.predict_config
+            canary = self._use_canary(routing_key)
+            bundle = self.load_bundle(config.canary_ref if canary else None)
+            if isinstance(features, pd.DataFrame):
+                features = self._with_timestamps(bundle, features)
+            cache = get_prediction_cache(config.prediction_cache_size, config.prediction_cache_ttl, config.geo_grid)
+            # The cache holds one model version; canary calls bypass it instead of flushing it
+            if cache is None or canary or not isinstance(features, pd.DataFrame):
+                preds = self._predict_uncached(bundle, features)
+                return (preds, bundle.version) if return_version else preds
+
+            # Parse Date/Time once: the cache keys and the bundle both read the parsed column
+            if getattr(bundle, "uses_timestamps", False) and not pd.api.types.is_datetime64_any_dtype(features["Date"]):
+                features = features.assign(Date=parse_timestamps(features["Date"], features["Time"]))
+
+            # Serve repeated feature combinations from the cache; score only the misses
+            keys = cache.make_keys(features)
+            cached = cache.get_many(keys, bundle.version)
+            missing = [i for i, value in enumerate(cached) if value is MISSING]
+            if missing:
+                fresh = self._predict_uncached(bundle, features.iloc[missing])
+                cache.put_many([keys[i] for i in missing], fresh, bundle.version)
+                for i, value in zip(missing, fresh):
+                    cached[i] = value
+
+            preds = np.asarray(cached)
+            return (preds, bundle.version) if return_version else preds
 
         except Exception as e:
             raise CustomException(e, sys)
 
+    @staticmethod
+    def _with_timestamps(bundle, features):
+        """
+        Adds absent Date/Time columns as missing values for bundles that use temporal
+        features (TemporalFeatures imputes them with the training medians); drops them
+        for bundles that do not (keeps cache keys stable).
+        """
+        present = [column for column in TEMPORAL_COLUMNS if column in features.columns]
+        if not getattr(bundle, "uses_timestamps", False):
+            return features.drop(columns=present) if present else features
+        if len(present) == len(TEMPORAL_COLUMNS):
+            return features
+        features = features.copy()
+        for column in TEMPORAL_COLUMNS:
+            if column not in features.columns:
+                features[column] = None
+        return features
+
+    @staticmethod
+    def _predict_uncached(bundle, features):
+        # Hot path: timings only, no RSS sampling
+        rows = len(features)
+        with track_stage("predict.transform", rows=rows, track_memory=False):
+            data_scaled = bundle.transform(features)
+        with track_stage("predict.model", rows=rows, track_memory=False):
+            return bundle.decode_labels(bundle.model.predict(data_scaled))
+
+    def predict_batch(self, data, output_path=None, chunk_size=None, with_proba=True, ref=None):
+        """
+        Scores many records with one vectorized transform + predict per chunk.
+
+        Args:
+            data: DataFrame, NumPy array (columns in rawdata/data.csv order, with or
+                  without Date/Time/Severity) or path to a CSV with that schema.
+            output_path (str): Optional CSV path; results are appended chunk by chunk
+                               so arbitrarily large inputs stay within bounded memory.
+            chunk_size (int): Rows per chunk (defaults to config.batch_chunk_size).
+            with_proba (bool): Add one `proba_<class>` column per class when the
+                               model supports predict_proba.
+            ref (str): Registry alias or version to score with (default config.model_ref),
+                       e.g. to compare a candidate with production offline.
+
+        Returns:
+            DataFrame of predictions (and probabilities), or `output_path` if given.
+        """
+        try:
+            chunk_size = chunk_size or self.predict_config.batch_chunk_size
+            bundle = self.load_bundle(ref)
+
+            if output_path:
+                os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+                if os.path.exists(output_path):
+                    os.remove(output_path)
+
+            results = []
+            total_rows = 0
+            timestamp_cache_dir = self.predict_config.timestamp_cache_dir if getattr(bundle, "uses_timestamps", False) else False
+            for chunk in self._iter_chunks(data, chunk_size, timestamp_cache_dir):
+                with track_stage("predict.batch_chunk", rows=len(chunk)):
+                    scored = self._score_chunk(bundle, chunk, with_proba)
+                total_rows += len(scored)
+                if output_path:
+                    scored.to_csv(output_path, mode="a", index=False,
+                                  header=not os.path.exists(output_path))
+                else:
+                    results.append(scored)
+
+            logging.info(f"Batch prediction completed for {total_rows} rows")
+
+            if output_path:
+                return output_path
+            if not results:
+                return pd.DataFrame(columns=["prediction"])
+            return pd.concat(results, ignore_index=True)
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    @staticmethod
+    def _iter_chunks(data, chunk_size, timestamp_cache_dir=False):
+        """
+        Yields DataFrame chunks holding (at least) FEATURE_COLUMNS from any supported input.
+
+        For files, `timestamp_cache_dir` other than False (bundles with temporal
+        features) also yields the file's Date as parsed timestamps, from the timestamp
+        cache in that directory (None parses without caching).
+        """
+        if isinstance(data, (str, os.PathLike)):
+            fmt = frame_format(data)
+            if fmt == "csv":
+                available = pd.read_csv(data, nrows=0).columns
+            elif fmt == "parquet":
+                import pyarrow.parquet as pq
+
+                available = pq.ParquetFile(data).schema_arrow.names
+            else:
+                from pyarrow import feather
+
+                available = feather.read_table(data, memory_map=True).column_names
+            timestamps = None
+            if timestamp_cache_dir is not False and set(TEMPORAL_COLUMNS).issubset(available):
+                # Parsed once per file version; chunks take their slice
+                timestamps = load_timestamps(data, cache_dir=timestamp_cache_dir)
+
+            # Only the feature columns are read; Time/Severity (and Date unless parsed) are skipped
+            columns = list(FEATURE_COLUMNS)
+            offset = 0
+            for chunk in PredictPipeline._read_chunks(data, fmt, columns, chunk_size):
+                if timestamps is not None:
+                    chunk = chunk.assign(Date=timestamps[offset:offset + len(chunk)])
+                offset += len(chunk)
+                yield chunk
+            return
+
+        if isinstance(data, np.ndarray):
+            n_cols = data.shape[1]
+            if n_cols == len(FEATURE_COLUMNS):
+                columns = FEATURE_COLUMNS
+            elif n_cols in (len(RAW_COLUMNS), len(RAW_COLUMNS) - 1):
+                columns = RAW_COLUMNS[:n_cols]
+            else:
+                raise ValueError(
+                    f"Expected {len(FEATURE_COLUMNS)}, {len(RAW_COLUMNS) - 1} or "
+                    f"{len(RAW_COLUMNS)} columns, got {n_cols}"
+                )
+            data = pd.DataFrame(data, columns=columns)
+            data[["Latitude", "Longitude"]] = data[["Latitude", "Longitude"]].astype(float)
+
+        if not isinstance(data, pd.DataFrame):
+            raise TypeError(f"Unsupported input type for predict_batch: {type(data).__name__}")
+
+        for start in range(0, len(data), chunk_size):
+            yield data.iloc[start:start + chunk_size]
+
+    @staticmethod
+    def _read_chunks(data, fmt, columns, chunk_size):
+        if fmt == "csv":
+            yield from pd.read_csv(data, usecols=columns, chunksize=chunk_size)
+        elif fmt == "parquet":
+            import pyarrow.parquet as pq
+
+            for batch in pq.ParquetFile(data).iter_batches(batch_size=chunk_size, columns=columns):
+                yield batch.to_pandas()
+        else:
+            # Feather is memory-mapped, so slicing does not load the whole file
+            frame = read_frame(data, columns=columns)
+            for start in range(0, len(frame), chunk_size):
+                yield frame.iloc[start:start + chunk_size]
+
+    @staticmethod
+    def _score_chunk(bundle, chunk, with_proba):
+        features = PredictPipeline._with_timestamps(
+            bundle, chunk[FEATURE_COLUMNS + [column for column in TEMPORAL_COLUMNS if column in chunk.columns]]
+        )
+        if with_proba:
+            preds, proba = bundle.predict_with_proba(features)
+        else:
+            preds, proba = bundle.predict(features), None
+        scored = pd.DataFrame({"prediction": preds})
+        if proba is not None:
+            for i, label in enumerate(bundle.classes_):
+                scored[f"proba_{label}"] = proba[:, i]
+        return scored
+
+    def cache_stats(self):
+        """
+        Returns counters of the artifact cache (hits/misses/reloads/load time)
+        and of the prediction cache (hits/misses/evictions/hit rate).
+        """
+        config = self.predict_config
+        cache = get_prediction_cache(config.prediction_cache_size, config.prediction_cache_ttl, config.geo_grid)
+        stats = {
+            "artifacts": artifact_cache.get_stats(),
+            "predictions": cache.get_stats() if cache is not None else None,
+        }
+        logging.info(f"Cache stats: {stats}")
+        return stats
+
 
 class CustomData:
     def __init__(self,
@@ -67,3 +352,33 @@ class CustomData:
 
         except Exception as e:
             raise CustomException(e, sys)
+
+
+def main(argv=None):
+    """
+    Command-line entry point for batch scoring, e.g. nightly backfills:
+
+        python -m src.pipeline.predict_pipeline --input rawdata/data.csv --output artifacts/predictions.csv
+    """
+    parser = argparse.ArgumentParser(description="Score a CSV of accident records in chunks.")
+    parser.add_argument("--input", required=True, help="CSV/Parquet/Feather with the rawdata/data.csv schema")
+    parser.add_argument("--output", required=True, help="Destination CSV for predictions")
+    parser.add_argument("--chunk-size", type=int, default=PredictPipelineConfig.batch_chunk_size)
+    parser.add_argument("--bundle", default=PredictPipelineConfig.bundle_file_path)
+    parser.add_argument("--no-proba", action="store_true", help="Skip class probability columns")
+    parser.add_argument("--registry", help="Model registry directory (load by --ref instead of --bundle)")
+    parser.add_argument("--ref", default=PRODUCTION_ALIAS, help="Registry alias or version")
+    args = parser.parse_args(argv)
+
+    pipeline = PredictPipeline(PredictPipelineConfig(
+        bundle_file_path=args.bundle,
+        batch_chunk_size=args.chunk_size,
+        registry_dir=args.registry,
+        model_ref=args.ref,
+    ))
+    output = pipeline.predict_batch(args.input, output_path=args.output, with_proba=not args.no_proba)
+    print(f"Predictions written to: {output}")
+
+
+if __name__ == "__main__":
+    main()
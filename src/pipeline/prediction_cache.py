@@ -0,0 +1,167 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+# Marker for "not in cache" (predictions themselves may be None/NaN-like)
+MISSING = object()
+
+CATEGORICAL_FEATURES = [
+    "Weather",
+    "Road_Condition",
+    "Time_of_Day",
+    "Traffic",
+    "Accident_Type",
+    "Vehicle_Type",
+    "Accident_Reason",
+]
+GEO_FEATURES = ["Latitude", "Longitude"]
+TEMPORAL_FEATURES = ["Date", "Time"]
+
+
+class PredictionCache:
+    """
+    Thread-safe LRU + TTL cache of predictions keyed on the normalized feature tuple.
+
+    Categorical values are whitespace-stripped strings; Latitude/Longitude are snapped
+    to a grid of `geo_grid` degrees (None keeps exact values), so nearby repeats of
+    the same accident profile share one entry. When the features carry Date/Time
+    (models with temporal features) the timestamp, snapped to the minute (the finest
+    resolution TemporalFeatures reads), is part of the key. Entries belong to one artifact version:
+    the first lookup with a different version empties the cache.
+    """
+
+    def __init__(self, maxsize=10_000, ttl=300.0, geo_grid=1e-3):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.geo_grid = geo_grid
+        self._data = OrderedDict()
+        self._version = None
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "invalidations": 0}
+
+    def _normalize_geo(self, value):
+        if value is None or pd.isna(value):
+            return None
+        value = float(value)
+        if self.geo_grid:
+            return int(math.floor(value / self.geo_grid + 0.5))
+        return value
+
+    @staticmethod
+    def _normalize_category(value):
+        if value is None or pd.isna(value):
+            return None
+        return str(value).strip()
+
+    def make_keys(self, features):
+        """
+        Returns one hashable key per row of a feature DataFrame.
+        """
+        categorical = [features[column].to_numpy(dtype=object) for column in CATEGORICAL_FEATURES]
+        geo = [features[column].to_numpy(dtype=object) for column in GEO_FEATURES]
+        minutes = self._minute_keys(features)
+        keys = []
+        for i in range(len(features)):
+            key = (
+                tuple(self._normalize_category(values[i]) for values in categorical)
+                + tuple(self._normalize_geo(values[i]) for values in geo)
+            )
+            keys.append(key if minutes is None else key + (minutes[i],))
+        return keys
+
+    @staticmethod
+    def _minute_keys(features):
+        """
+        Returns each row's timestamp floored to the minute (None for NaT), or None
+        when the features have no Date column. A datetime64 Date column (parsed
+        once by the caller, see PredictPipeline.predict) is used as is.
+        """
+        if "Date" not in features.columns:
+            return None
+        from src.components.data_transformation import TemporalFeatures
+
+        columns = [column for column in TEMPORAL_FEATURES if column in features.columns]
+        timestamps = TemporalFeatures._timestamps(features[columns])
+        return [None if pd.isna(minute) else minute.value for minute in timestamps.floor("min")]
+
+    def _check_version(self, version):
+        # Caller holds the lock
+        if version != self._version:
+            if self._data:
+                self.stats["invalidations"] += 1
+            self._data.clear()
+            self._version = version
+
+    def get_many(self, keys, version):
+        """
+        Returns the cached prediction for each key, or MISSING.
+        """
+        now = time.monotonic()
+        results = []
+        with self._lock:
+            self._check_version(version)
+            for key in keys:
+                entry = self._data.get(key)
+                if entry is not None and self.ttl and now - entry[1] > self.ttl:
+                    del self._data[key]
+                    self.stats["expirations"] += 1
+                    entry = None
+                if entry is None:
+                    self.stats["misses"] += 1
+                    results.append(MISSING)
+                else:
+                    self._data.move_to_end(key)
+                    self.stats["hits"] += 1
+                    results.append(entry[0])
+        return results
+
+    def put_many(self, keys, values, version):
+        """
+        Stores predictions computed with artifact `version`.
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._check_version(version)
+            for key, value in zip(keys, values):
+                self._data[key] = (value, now)
+                self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def get_stats(self):
+        """
+        Returns counters plus current size and hit rate.
+        """
+        with self._lock:
+            stats = dict(self.stats)
+            stats["size"] = len(self._data)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+
+# One shared cache per distinct configuration, so every PredictPipeline in the process reuses it
+_shared_caches = {}
+_shared_lock = threading.Lock()
+
+
+def get_prediction_cache(maxsize, ttl, geo_grid):
+    """
+    Returns the process-wide PredictionCache for these settings (None if maxsize is 0).
+    """
+    if not maxsize:
+        return None
+    key = (maxsize, ttl, geo_grid)
+    with _shared_lock:
+        cache = _shared_caches.get(key)
+        if cache is None:
+            cache = _shared_caches[key] = PredictionCache(maxsize=maxsize, ttl=ttl, geo_grid=geo_grid)
+        return cache
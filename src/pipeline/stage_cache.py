@@ -0,0 +1,313 @@
+import ast
+import dataclasses
+import hashlib
+import importlib.util
+import inspect
+import json
+import os
+import shutil
+import sys
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+from src.exception import CustomException
+from src.instrumentation import track_stage
+from src.logger import logging
+from src.utils import (
+    file_digest, file_lock, load_object, read_manifest, record_manifest_entry, save_object,
+    write_json_atomic,
+)
+
+
+def _module_source(name):
+    try:
+        spec = importlib.util.find_spec(name)
+    except (ImportError, ValueError):
+        return None
+    return spec.origin if spec is not None and spec.origin and spec.origin.endswith(".py") else None
+
+
+def _is_main_block(node):
+    return (isinstance(node, ast.If) and isinstance(node.test, ast.Compare)
+            and isinstance(node.test.left, ast.Name) and node.test.left.id == "__name__")
+
+
+def _imported_modules(source, packages):
+    """
+    Yields (module name, source file) of the modules of `packages` that a source
+    file imports, read from its import statements (the module is not executed).
+    Imports of the `if __name__ == "__main__":` block are not stage code.
+    """
+    with open(source) as f:
+        tree = ast.parse(f.read(), filename=source)
+    tree.body = [node for node in tree.body if not _is_main_block(node)]
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            # `from package import module` imports a submodule, not just a name
+            names = [node.module] + [f"{node.module}.{alias.name}" for alias in node.names]
+        else:
+            continue
+        for name in names:
+            if name.split(".")[0] in packages:
+                module_source = _module_source(name)
+                if module_source is not None:
+                    yield name, module_source
+
+
+@dataclass
+class Stage:
+    """
+    One step of a pipeline DAG.
+
+    func receives the results of `deps` as keyword arguments (by stage name) and
+    returns the stage result, which must be picklable. `params` (a dataclass config
+    or dict) and the files named by `inputs(**results)` feed the cache key together
+    with the source of `code` (the classes/functions doing the work; default func)
+    and of every project module it imports; `outputs(result)` names the files the stage writes. A cached run is
+    reused when those files still match their recorded digests, or when they can be
+    restored from the run's snapshot copies (snapshot_outputs).
+    """
+    name: str
+    func: Callable
+    deps: tuple = ()
+    params: object = None
+    code: tuple = ()
+    inputs: Callable = None     # results of deps (keyword arguments) -> list of input file paths
+    outputs: Callable = None    # stage result -> list of output file paths
+    cache: bool = True
+    snapshot_outputs: bool = True
+    # Called with the result when a cached run is reused, to redo side effects that
+    # are not files (e.g. re-pointing registry aliases)
+    on_cached: Callable = None
+
+
+class StageCache:
+    """
+    Content-addressed cache of pipeline stage results.
+
+    A stage's key is a SHA-256 over its name, parameters, the digests of the modules
+    that implement it (and of the project modules they import, transitively), the digests of its input files and the result digests of
+    the stages it depends on. Because upstream stages contribute the digest of what
+    they produced (not of how they were configured), a stage re-runs only when
+    something it actually consumes has changed.
+
+    Layout under `root`:
+        <stage>/<key>/result.pkl     pickled result (reused artifacts, e.g. transformed arrays)
+        <stage>/<key>/record.json    output file digests, result digest, timings
+        <stage>/<key>/outputs/       snapshot copies of the output files, restored when
+                                     a later run with another key overwrote them
+        file_digests.json            (path, size, mtime) -> sha256, so unchanged files are not re-hashed
+    """
+
+    def __init__(self, root=os.path.join("artifacts", "stages"), keep=3):
+        self.root = root
+        self.keep = keep   # Cached runs kept per stage (oldest are removed)
+        self._digests = None
+
+    # ------------------------------------------------------------------ digests
+    @property
+    def _digests_path(self):
+        return os.path.join(self.root, "file_digests.json")
+
+    def file_digest(self, file_path):
+        """
+        SHA-256 of a file, memoized by absolute path, size and modification time.
+        """
+        if self._digests is None:
+            self._digests = {}
+            if os.path.exists(self._digests_path):
+                with open(self._digests_path) as f:
+                    self._digests = json.load(f)
+        stat = os.stat(file_path)
+        signature = f"{os.path.abspath(file_path)}|{stat.st_size}|{stat.st_mtime_ns}"
+        digest = self._digests.get(signature)
+        if digest is None:
+            digest = file_digest(file_path)
+            # Drop entries of older versions of the same file
+            prefix = f"{os.path.abspath(file_path)}|"
+            self._digests = {k: v for k, v in self._digests.items() if not k.startswith(prefix)}
+            self._digests[signature] = digest
+            os.makedirs(self.root, exist_ok=True)
+            with file_lock(self._digests_path + ".lock"):
+                write_json_atomic(self._digests_path, self._digests)
+        return digest
+
+    @staticmethod
+    def code_digest(objects):
+        """
+        SHA-256 digests of the modules defining `objects` and of every module of the
+        same top-level package(s) they import, directly or transitively, including
+        imports inside functions (any edit to one of them invalidates the stage).
+
+        Returns:
+            dict: module name -> SHA-256 of its source file
+        """
+        modules = {inspect.getmodule(inspect.unwrap(obj)) for obj in objects} - {None}
+        packages = {module.__name__.split(".")[0] for module in modules}
+        pending = [(module.__name__, inspect.getsourcefile(module)) for module in modules]
+        sources = {}
+        while pending:
+            name, source = pending.pop()
+            if name in sources or source is None:
+                continue
+            sources[name] = source
+            pending.extend(_imported_modules(source, packages))
+        return {name: file_digest(source) for name, source in sorted(sources.items())}
+
+    @staticmethod
+    def params_payload(params):
+        if params is None:
+            return None
+        if dataclasses.is_dataclass(params):
+            params = dataclasses.asdict(params)
+        return json.loads(json.dumps(params, sort_keys=True, default=str))
+
+    def key(self, stage, input_files, upstream_digests):
+        payload = {
+            "stage": stage.name,
+            "params": self.params_payload(stage.params),
+            "code": self.code_digest(stage.code or (stage.func,)),
+            "inputs": {path: self.file_digest(path) for path in sorted(input_files)},
+            "upstream": upstream_digests,
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()[:20]
+
+    # ------------------------------------------------------------------ records
+    def _run_dir(self, stage_name, key):
+        return os.path.join(self.root, stage_name, key)
+
+    def lookup(self, stage_name, key):
+        """
+        Returns (result, record) of a cached run, or None when there is no valid one.
+        """
+        run_dir = self._run_dir(stage_name, key)
+        record_path = os.path.join(run_dir, "record.json")
+        if not os.path.exists(record_path):
+            return None
+        with open(record_path) as f:
+            record = json.load(f)
+        changed = [path for path, digest in record["outputs"].items()
+                   if not os.path.exists(path) or self.file_digest(path) != digest]
+        snapshots = {path: self._snapshot_path(run_dir, record["outputs"][path]) for path in changed}
+        if not all(os.path.exists(snapshot) for snapshot in snapshots.values()):
+            logging.info(f"Stage {stage_name}: outputs {changed} changed since run {key}; re-running")
+            return None
+        for path, snapshot in snapshots.items():
+            self._restore(snapshot, path)
+            logging.info(f"Stage {stage_name}: restored {path} from run {key}")
+        try:
+            result = load_object(os.path.join(run_dir, "result.pkl"))
+        except (OSError, EOFError) as e:
+            logging.warning(f"Stage {stage_name}: cached result {key} unreadable ({e}); re-running")
+            return None
+        os.utime(run_dir)   # Recently used runs survive pruning
+        return result, record
+
+    @staticmethod
+    def _snapshot_path(run_dir, digest):
+        return os.path.join(run_dir, "outputs", digest)
+
+    @staticmethod
+    def _restore(snapshot, path):
+        """
+        Copies a snapshot back over `path` (atomically) and re-records it in the
+        artifact manifest of its directory, so load_object accepts it again.
+        """
+        directory = os.path.dirname(path) or "."
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = os.path.join(directory, f".{os.path.basename(path)}.{os.getpid()}.restore.tmp")
+        shutil.copy2(snapshot, tmp_path)
+        os.replace(tmp_path, path)
+        if os.path.basename(path) in read_manifest(directory):
+            record_manifest_entry(path, os.path.basename(snapshot), os.path.getsize(path))
+
+    def store(self, stage_name, key, result, output_files, duration, snapshot_outputs=True):
+        run_dir = self._run_dir(stage_name, key)
+        save_object(os.path.join(run_dir, "result.pkl"), result)
+        outputs = {path: self.file_digest(path) for path in output_files}
+        if snapshot_outputs:
+            # Named by digest: identical outputs of different runs are stored once per run
+            os.makedirs(os.path.join(run_dir, "outputs"), exist_ok=True)
+            for path, digest in outputs.items():
+                shutil.copy2(path, self._snapshot_path(run_dir, digest))
+        record = {
+            "stage": stage_name,
+            "key": key,
+            "outputs": outputs,
+            "result_digest": file_digest(os.path.join(run_dir, "result.pkl")),
+            "duration": round(duration, 3),
+            "finished_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        write_json_atomic(os.path.join(run_dir, "record.json"), record)
+        self._prune(stage_name)
+        return record
+
+    def _prune(self, stage_name):
+        stage_dir = os.path.join(self.root, stage_name)
+        runs = sorted(
+            (os.path.join(stage_dir, key) for key in os.listdir(stage_dir)),
+            key=os.path.getmtime,
+        )
+        for run_dir in runs[:-self.keep] if self.keep else []:
+            shutil.rmtree(run_dir, ignore_errors=True)
+
+
+def run_stages(stages, cache: StageCache = None, force=()):
+    """
+    Runs a DAG of stages in dependency order, reusing cached results.
+
+    Args:
+        stages (list[Stage]): The DAG; deps must name stages earlier in the list
+        cache (StageCache): Result cache (None runs everything)
+        force (iterable): Stage names to re-run regardless of the cache ("*" = all);
+                          stages downstream of a re-run stage re-run only if its
+                          result digest changed
+
+    Returns:
+        tuple: (results by stage name, status by stage name: "ran" / "cached" / "uncached")
+    """
+    results, digests, status = {}, {}, {}
+    force = set(force)
+    try:
+        for stage in stages:
+            upstream = {name: results[name] for name in stage.deps}
+            with track_stage(f"pipeline.{stage.name}") as metrics:
+                # A stage downstream of an uncached one cannot tell whether its input changed
+                use_cache = (cache is not None and stage.cache
+                             and all(digests[name] is not None for name in stage.deps))
+                key = None
+                if use_cache:
+                    input_files = list(stage.inputs(**upstream)) if stage.inputs else []
+                    key = cache.key(stage, input_files, {name: digests[name] for name in stage.deps})
+                    hit = None if ("*" in force or stage.name in force) else cache.lookup(stage.name, key)
+                    if hit is not None:
+                        results[stage.name], record = hit
+                        if stage.on_cached is not None:
+                            stage.on_cached(results[stage.name])
+                        digests[stage.name] = record["result_digest"]
+                        status[stage.name] = metrics["status"] = "cached"
+                        logging.info(f"Stage {stage.name}: reusing cached run {key}")
+                        continue
+
+                start = time.perf_counter()
+                result = stage.func(**upstream)
+                results[stage.name] = result
+                if use_cache:
+                    output_files = list(stage.outputs(result)) if stage.outputs else []
+                    record = cache.store(
+                        stage.name, key, result, output_files, time.perf_counter() - start,
+                        snapshot_outputs=stage.snapshot_outputs,
+                    )
+                    digests[stage.name] = record["result_digest"]
+                    status[stage.name] = metrics["status"] = "ran"
+                else:
+                    digests[stage.name] = None
+                    status[stage.name] = metrics["status"] = "uncached"
+                logging.info(f"Stage {stage.name}: {status[stage.name]} in {time.perf_counter() - start:.2f}s")
+        return results, status
+
+    except Exception as e:
+        raise CustomException(e, sys)
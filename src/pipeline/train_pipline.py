@@ -0,0 +1,226 @@
+import argparse
+import os
+import sys
+from dataclasses import asdict, dataclass, field
+
+from src.components.data_ingestion import DataIngestion, DataIngestionConfig
+from src.components.data_transformation import DataTransformation, DataTransformationConfig
+from src.components.model_trainer import OUT_OF_CORE_VIEWS, ModelTrainer, ModelTrainerConfig
+from src.exception import CustomException
+from src.instrumentation import track_stage
+from src.logger import logging
+from src.pipeline.stage_cache import Stage, StageCache, run_stages
+from src.utils import evaluate_models, evaluate_models_out_of_core
+
+
+@dataclass
+class TrainPipelineConfig:
+    ingestion: DataIngestionConfig = field(default_factory=DataIngestionConfig)
+    transformation: DataTransformationConfig = field(default_factory=DataTransformationConfig)
+    trainer: ModelTrainerConfig = field(default_factory=ModelTrainerConfig)
+    # Content-addressed stage results (see StageCache); None re-runs every stage
+    stage_cache_dir: str = os.path.join("artifacts", "stages")
+
+
+class TrainPipeline:
+    """
+    Runs ingestion, transformation and model training end to end.
+
+    run_full() rebuilds everything from the source CSV (full search over all model
+    families) as a DAG of stages: ingest -> transform / feature_views -> train, or
+    ingest -> chunks -> train when the trainer's training_mode is "out_of_core".
+    Each stage's result is cached under a hash of its inputs (see StageCache), so
+    a re-run with unchanged source data, configuration and code reuses the stored
+    splits, transformed arrays and model instead of recomputing them, and a change
+    only re-runs the stages that consume it. run_incremental() only ingests
+    records newer than the last run's Date/Time watermark and refreshes the saved
+    model bundle with them; it falls back to a full rebuild when that is not
+    possible (first run, new categories).
+    """
+
+    def __init__(self, config: TrainPipelineConfig = None):
+        self.config = config or TrainPipelineConfig()
+        self.ingestion = DataIngestion(self.config.ingestion)
+        self.transformation = DataTransformation(self.config.transformation)
+        self.trainer = ModelTrainer(self.config.trainer)
+
+    def run(self, incremental=False, force=()):
+        return self.run_incremental() if incremental else self.run_full(force=force)
+
+    def get_stages(self, ingest=True):
+        """
+        Returns the stages of a full run. Without ingest the existing splits are the DAG's inputs.
+        """
+        config = self.config
+        if config.trainer.training_mode not in ("in_memory", "out_of_core"):
+            raise ValueError(f"Unknown training mode: {config.trainer.training_mode}")
+        if ingest:
+            ingest_stage = Stage(
+                name="ingest",
+                func=self.ingestion.initiate_data_ingestion,
+                params=config.ingestion,
+                code=(DataIngestion,),
+                inputs=lambda: [config.ingestion.source_data_path],
+                outputs=lambda paths: [*paths, config.ingestion.raw_data_path],
+                # Splits can be large and are cheap to re-derive: no snapshot copies
+                snapshot_outputs=False,
+            )
+        else:
+            split_paths = (config.ingestion.train_data_path, config.ingestion.test_data_path)
+            ingest_stage = Stage(
+                name="splits",
+                func=lambda: split_paths,
+                inputs=lambda: list(split_paths),
+            )
+        splits = ingest_stage.name
+
+        def split_files(**upstream):
+            return list(upstream[splits])
+
+        if config.trainer.training_mode == "out_of_core":
+            # Feature views as on-disk chunks, streamed by the trainer (see ModelTrainer)
+            return [
+                ingest_stage,
+                Stage(
+                    name="chunks",
+                    func=lambda **upstream: self.transformation.initiate_chunked_transformation(
+                        *upstream[splits], views=OUT_OF_CORE_VIEWS
+                    ),
+                    deps=(splits,),
+                    params=dict(asdict(config.transformation), views=list(OUT_OF_CORE_VIEWS)),
+                    code=(DataTransformation,),
+                    inputs=split_files,
+                    outputs=lambda views: [path for view in views.values() for path in (
+                        view["preprocessor_path"], view["train"].metadata_path, view["test"].metadata_path,
+                    )],
+                    # The chunk files are the data itself: re-derived rather than copied
+                    snapshot_outputs=False,
+                ),
+                Stage(
+                    name="train",
+                    func=lambda chunks: self.trainer.initiate_out_of_core_training(chunks),
+                    deps=("chunks",),
+                    params=config.trainer,
+                    code=(ModelTrainer, evaluate_models_out_of_core),
+                    outputs=lambda result: [config.trainer.model_bundle_file_path,
+                                            config.trainer.trained_model_file_path],
+                    on_cached=lambda result: self.trainer.restore_registry_aliases(),
+                ),
+            ]
+
+        return [
+            ingest_stage,
+            Stage(
+                name="transform",
+                func=lambda **upstream: self.transformation.initiate_data_transformation(*upstream[splits]),
+                deps=(splits,),
+                params=config.transformation,
+                code=(DataTransformation,),
+                inputs=split_files,
+                outputs=lambda result: [result[-1]],
+            ),
+            Stage(
+                name="feature_views",
+                func=lambda **upstream: self.transformation.initiate_feature_views(*upstream[splits]),
+                deps=(splits,),
+                params=config.transformation,
+                code=(DataTransformation,),
+                inputs=split_files,
+                outputs=lambda views: [view["preprocessor_path"] for view in views.values()],
+            ),
+            Stage(
+                name="train",
+                func=lambda transform, feature_views: self.trainer.initiate_model_trainer(
+                    *transform[:4], preprocessor_path=transform[4], feature_views=feature_views,
+                ),
+                deps=("transform", "feature_views"),
+                params=config.trainer,
+                code=(ModelTrainer, evaluate_models),
+                outputs=lambda result: [config.trainer.model_bundle_file_path, config.trainer.trained_model_file_path],
+                # The restored bundle must also be the one the registry aliases serve
+                on_cached=lambda result: self.trainer.restore_registry_aliases(),
+            ),
+        ]
+
+    def run_full(self, ingest=True, force=()):
+        """
+        Args:
+            ingest (bool): Ingest from the source CSV (False starts from the existing splits)
+            force (iterable): Stage names to re-run regardless of the cache ("*" = all)
+
+        Returns:
+            dict: mode, winning model and score, and each stage's status ("ran" / "cached")
+        """
+        try:
+            config = self.config
+            cache = StageCache(config.stage_cache_dir) if config.stage_cache_dir else None
+            with track_stage("train.full"):
+                results, status = run_stages(self.get_stages(ingest), cache=cache, force=force)
+            model_name, score = results["train"]
+            return {"mode": "full", "model_name": model_name, "score": score, "stages": status}
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def run_incremental(self):
+        try:
+            ingestion_config = self.config.ingestion
+            first_run = self.ingestion.load_watermark() is None
+            if first_run or not os.path.exists(self.config.trainer.model_bundle_file_path):
+                # Nothing to refresh yet: one full build establishes watermark and bundle
+                if first_run:
+                    self.ingestion.initiate_incremental_ingestion()
+                return self.run_full(ingest=False)
+
+            with track_stage("train.incremental") as stage:
+                increment_train_path, _, n_new = self.ingestion.initiate_incremental_ingestion()
+                stage["rows"] = n_new
+                if not n_new or not os.path.exists(increment_train_path):
+                    logging.info("No new training rows since the last run; model left unchanged")
+                    return {"mode": "unchanged", "new_rows": n_new}
+
+                split = self.transformation.split_features_target
+                read_split = self.transformation.read_split
+                X_new, y_new = split(read_split(increment_train_path))
+                X_test, y_test = split(read_split(ingestion_config.test_data_path))
+                X_train, y_train = split(read_split(ingestion_config.train_data_path))
+
+                outcome = self.trainer.initiate_incremental_training(
+                    X_new, y_new, X_test, y_test, X_train=X_train, y_train=y_train
+                )
+
+            if outcome is None:
+                logging.info("Incremental refresh not possible; running a full rebuild")
+                result = self.run_full(ingest=False)
+                result["new_rows"] = n_new
+                return result
+
+            model_name, score, mode = outcome
+            return {"mode": mode, "model_name": model_name, "score": score, "new_rows": n_new}
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train the accident severity model.")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only ingest records newer than the last run and refresh the current model")
+    parser.add_argument("--force", nargs="*", default=(), metavar="STAGE",
+                        help="Re-run these stages (no names: all) instead of reusing cached results")
+    parser.add_argument("--no-cache", action="store_true", help="Run every stage without the stage cache")
+    parser.add_argument("--out-of-core", action="store_true",
+                        help="Train SGD/XGBoost/CatBoost streaming from on-disk feature chunks")
+    args = parser.parse_args(argv)
+
+    config = TrainPipelineConfig(stage_cache_dir=None) if args.no_cache else TrainPipelineConfig()
+    if args.out_of_core:
+        config.trainer.training_mode = "out_of_core"
+    force = ("*",) if args.force == [] else tuple(args.force or ())
+    result = TrainPipeline(config).run(incremental=args.incremental, force=force)
+    print(result)
+    return result
+
+
+if __name__ == "__main__":
+    main()
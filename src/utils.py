@@ -1,49 +1,1254 @@
 import os
+import json
+import time
+import shutil
+import hashlib
+import inspect
+import tempfile
+import threading
+from contextlib import contextmanager
 import joblib
-from sklearn.model_selection import GridSearchCV
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from joblib import Memory, Parallel, delayed, effective_n_jobs
+from sklearn.base import clone
+from sklearn.model_selection import ParameterGrid, ParameterSampler, check_cv
+from sklearn.utils import _safe_indexing
+from sklearn.utils.validation import _num_samples
+from threadpoolctl import threadpool_limits
 
+from src.exception import ArtifactIntegrityError
+from src.logger import logging
+from src.instrumentation import metrics, track_peak_memory, track_stage
 
-def save_object(file_path, obj):
+
+# Column groups of the accident dataset (rawdata/data.csv)
+NUMERICAL_COLUMNS = ["Latitude", "Longitude"]
+CATEGORICAL_COLUMNS = [
+    "Weather",
+    "Road_Condition",
+    "Time_of_Day",
+    "Traffic",
+    "Accident_Type",
+    "Vehicle_Type",
+    "Accident_Reason",
+    "Severity",
+]
+
+# Supported on-disk formats for tabular artifacts, keyed by file extension
+FRAME_FORMATS = {"csv": ".csv", "parquet": ".parquet", "feather": ".feather"}
+
+
+# Checksum manifest kept next to the artifacts of a directory
+ARTIFACT_MANIFEST = "manifest.json"
+
+
+def parse_compress(value):
+    """
+    Parses a joblib `compress` setting given as text: "0" = none, "1"-"9" = zlib
+    level, or "method[:level]" such as "lz4" or "lzma:6".
+
+    Raises:
+        ValueError: Unknown method or a level outside 0-9
+    """
+    method, _, level = str(value).strip().partition(":")
+    if method.isdigit() and not level:
+        method, level = None, method
+    try:
+        level = int(level) if level else 3
+    except ValueError:
+        level = -1
+    if not 0 <= level <= 9:
+        raise ValueError(f"Invalid artifact compression {value!r}: level must be 0-9")
+    if method is None:
+        return level
+    if method not in joblib.compressor._COMPRESSORS:
+        raise ValueError(
+            f"Invalid artifact compression {value!r}: method must be one of {sorted(joblib.compressor._COMPRESSORS)}"
+        )
+    return (method, level)
+
+
+# Default compression for save_object (ARTIFACT_COMPRESS, see parse_compress: "0" = none,
+# "1"-"9" = zlib level, or "method[:level]" such as "lz4:3"); uncompressed files can be memory-mapped
+ARTIFACT_COMPRESS = parse_compress(os.environ.get("ARTIFACT_COMPRESS") or "0")
+
+_file_locks = {}
+_file_locks_guard = threading.Lock()
+
+
+@contextmanager
+def file_lock(lock_path):
+    """
+    Exclusive lock on `lock_path` across threads and (where fcntl exists) processes.
+    """
+    with _file_locks_guard:
+        thread_lock = _file_locks.setdefault(os.path.abspath(lock_path), threading.Lock())
+    with thread_lock:
+        try:
+            import fcntl
+        except ImportError:
+            yield
+            return
+        with open(lock_path, "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def read_manifest(directory):
+    """
+    Returns the artifact manifest of a directory: file name -> {"sha256", "size", ...}.
+    """
+    manifest_path = os.path.join(directory or ".", ARTIFACT_MANIFEST)
+    if not os.path.exists(manifest_path):
+        return {}
+    with open(manifest_path) as f:
+        return json.load(f)
+
+
+def write_json_atomic(file_path, payload):
+    """
+    Writes `payload` as JSON via a temporary file and rename (readers never see partial JSON).
+    """
+    tmp_path = f"{file_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(payload, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, file_path)
+
+
+def save_object(file_path, obj, compress=None):
     """
     Saves a Python object to the specified file path using joblib.
+
+    The object is written to a temporary file in the same directory and renamed
+    over `file_path`, so concurrent readers see either the old or the new artifact,
+    never a partial one. Its SHA-256 and size are then recorded in the directory's
+    manifest, which load_object verifies.
+
+    Args:
+        file_path (str): Destination path
+        obj: Object to serialize
+        compress: joblib compression (default ARTIFACT_COMPRESS; compressed
+                  artifacts cannot be memory-mapped on load)
     """
-    os.makedirs(os.path.dirname(file_path), exist_ok=True)
-    joblib.dump(obj, file_path)
+    directory = os.path.dirname(file_path) or "."
+    os.makedirs(directory, exist_ok=True)
+    compress = ARTIFACT_COMPRESS if compress is None else compress
+    with track_stage("artifact.save", path=str(file_path)):
+        # Hidden, writer-unique temporary name on the same filesystem (rename is atomic)
+        tmp_path = os.path.join(
+            directory, f".{os.path.basename(file_path)}.{os.getpid()}.{threading.get_ident()}.tmp"
+        )
+        try:
+            joblib.dump(obj, tmp_path, compress=compress)
+            with open(tmp_path, "rb") as f:
+                os.fsync(f.fileno())
+            digest = file_digest(tmp_path)
+            size = os.path.getsize(tmp_path)
+            os.replace(tmp_path, file_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
 
+        record_manifest_entry(file_path, digest, size, compress=compress)
 
-def load_object(file_path):
+
+def record_manifest_entry(file_path, digest, size, **fields):
+    """
+    Records a file's SHA-256 and size in its directory's manifest (kept fields are merged).
+    """
+    directory = os.path.dirname(file_path) or "."
+    with file_lock(os.path.join(directory, ARTIFACT_MANIFEST + ".lock")):
+        manifest = read_manifest(directory)
+        entry = manifest.get(os.path.basename(file_path), {})
+        entry.update(fields, sha256=digest, size=size, saved_at=time.strftime("%Y-%m-%dT%H:%M:%S"))
+        manifest[os.path.basename(file_path)] = entry
+        write_json_atomic(os.path.join(directory, ARTIFACT_MANIFEST), manifest)
+
+
+def verify_object(file_path, retries=3, retry_delay=0.05):
+    """
+    Checks a stored artifact against its manifest entry.
+    Artifacts without an entry (saved before manifests existed) pass unchecked.
+
+    The artifact is renamed into place just before its manifest entry is
+    updated, so a mismatch is re-checked a few times before it is reported.
+
+    Returns:
+        str: SHA-256 of the file, or None if it has no manifest entry
+    """
+    directory = os.path.dirname(file_path) or "."
+    name = os.path.basename(file_path)
+    for attempt in range(retries + 1):
+        entry = read_manifest(directory).get(name)
+        if entry is None:
+            return None
+        if os.path.getsize(file_path) == entry["size"]:
+            digest = file_digest(file_path)
+            if digest == entry["sha256"]:
+                return digest
+        if attempt < retries:
+            time.sleep(retry_delay)
+    raise ArtifactIntegrityError(f"Checksum mismatch for {file_path}: the file does not match {ARTIFACT_MANIFEST}")
+
+
+def load_object(file_path, mmap_mode=None, verify=True):
     """
     Loads a Python object from the specified file path using joblib.
+
+    Args:
+        file_path (str): Artifact path
+        mmap_mode (str): e.g. "r" to memory-map the NumPy arrays inside the object
+                         (forests, boosting arrays), so processes loading the same
+                         artifact share its pages; ignored for compressed files
+        verify (bool): Check the file against the directory's checksum manifest
     """
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"File not found: {file_path}")
-    return joblib.load(file_path)
+    with track_stage("artifact.load", path=str(file_path)):
+        if verify:
+            verify_object(file_path)
+        return joblib.load(file_path, mmap_mode=mmap_mode)
+
+
+def file_digest(file_path, chunk_size=1 << 20):
+    """
+    Returns the SHA-256 hex digest of a file, read in fixed-size chunks.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def optimize_dtypes(df):
+    """
+    Casts the known categorical columns to `category` and Latitude/Longitude to float32.
+    Idempotent, so it is safe to call on frames that are already compact.
+    """
+    df = df.copy(deep=False)
+    for column in CATEGORICAL_COLUMNS:
+        if column in df.columns and not isinstance(df[column].dtype, pd.CategoricalDtype):
+            df[column] = df[column].astype("category")
+    for column in NUMERICAL_COLUMNS:
+        if column in df.columns and df[column].dtype != np.float32:
+            df[column] = df[column].astype(np.float32)
+    return df
+
+
+def frame_format(file_path):
+    """
+    Returns the storage format ("csv", "parquet" or "feather") implied by a file extension.
+    """
+    extension = os.path.splitext(str(file_path))[1].lower()
+    for name, ext in FRAME_FORMATS.items():
+        if extension == ext:
+            return name
+    raise ValueError(f"Unsupported tabular file format: {file_path}")
+
+
+def write_frame(df, file_path):
+    """
+    Writes a DataFrame as CSV, Parquet or Arrow IPC (Feather) depending on the extension.
+    Columnar formats store compact dtypes (categoricals, float32) so readers skip
+    dtype inference. Feather is written uncompressed so it can be memory-mapped.
+    """
+    os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+    fmt = frame_format(file_path)
+    if fmt == "csv":
+        df.to_csv(file_path, index=False, header=True)
+        return
+    df = optimize_dtypes(df).reset_index(drop=True)
+    if fmt == "parquet":
+        df.to_parquet(file_path, index=False)
+    else:
+        df.to_feather(file_path, compression="uncompressed")
+
+
+def read_frame(file_path, columns=None, memory_map=True):
+    """
+    Reads a DataFrame written by write_frame/FrameAppender.
+    Columnar files are opened memory-mapped and come back with compact dtypes.
+    """
+    fmt = frame_format(file_path)
+    if fmt == "csv":
+        return pd.read_csv(file_path, usecols=columns)
+    if fmt == "parquet":
+        df = pd.read_parquet(file_path, columns=columns, memory_map=memory_map)
+    else:
+        from pyarrow import feather
+
+        df = feather.read_table(file_path, columns=columns, memory_map=memory_map).to_pandas()
+    return optimize_dtypes(df)
+
+
+def append_frame(df, file_path, chunk_size=100_000):
+    """
+    Appends rows to an existing CSV, Parquet or Feather artifact (creates it if missing).
+    CSV is appended in place. Columnar files cannot grow in place, so their record
+    batches are streamed into a new file, followed by `df`, which then replaces the
+    old one; memory stays bounded by one batch.
+    """
+    if not os.path.exists(file_path):
+        write_frame(df, file_path)
+        return
+    fmt = frame_format(file_path)
+    if fmt == "csv":
+        columns = pd.read_csv(file_path, nrows=0).columns
+        df[columns].to_csv(file_path, mode="a", index=False, header=False)
+        return
+
+    import pyarrow as pa
+
+    root, extension = os.path.splitext(file_path)
+    tmp_path = f"{root}.appending{extension}"
+    with FrameAppender(tmp_path) as out:
+        if fmt == "parquet":
+            import pyarrow.parquet as pq
+
+            for batch in pq.ParquetFile(file_path).iter_batches(batch_size=chunk_size):
+                out.append(batch.to_pandas())
+        else:
+            with pa.memory_map(file_path) as source:
+                reader = pa.ipc.open_file(source)
+                for i in range(reader.num_record_batches):
+                    out.append(reader.get_batch(i).to_pandas())
+        out.append(df[out._schema.names] if out._schema is not None else df)
+    os.replace(tmp_path, file_path)
+
+
+def frame_schema(df):
+    """
+    Arrow schema of a dataset frame: strings for the categorical columns, float32 for
+    the numerical ones, the inferred type for the others (strings where a column has
+    no values to infer it from).
+    """
+    import pyarrow as pa
+
+    inferred = pa.Schema.from_pandas(df, preserve_index=False)
+    fields = []
+    for field in inferred:
+        if field.name in CATEGORICAL_COLUMNS or pa.types.is_null(field.type):
+            field = field.with_type(pa.string())
+        elif field.name in NUMERICAL_COLUMNS:
+            field = field.with_type(pa.float32())
+        fields.append(field)
+    return pa.schema(fields)
+
+
+class FrameAppender:
+    """
+    Incrementally appends DataFrame chunks to a CSV, Parquet or Feather file.
+
+    Categorical columns are written as plain strings (their vocabulary may differ
+    from chunk to chunk); read_frame restores the compact dtypes on load. The
+    Arrow schema is declared from the column groups (see frame_schema), not
+    inferred from the first chunk, where a column may be entirely empty.
+    """
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.format = frame_format(file_path)
+        self.rows = 0
+        self._writer = None
+        self._schema = None
+        os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+        if os.path.exists(file_path):
+            os.remove(file_path)
+
+    def append(self, df):
+        if self.format == "csv":
+            df.to_csv(self.file_path, mode="a", index=False, header=self.rows == 0)
+            self.rows += len(df)
+            return
+
+        import pyarrow as pa
+
+        df = df.reset_index(drop=True)
+        for column in CATEGORICAL_COLUMNS:
+            if column in df.columns:
+                df[column] = df[column].astype(object)
+        for column in NUMERICAL_COLUMNS:
+            if column in df.columns:
+                df[column] = df[column].astype(np.float32)
+
+        if self._writer is None:
+            self._schema = frame_schema(df)
+            if self.format == "parquet":
+                import pyarrow.parquet as pq
+
+                self._writer = pq.ParquetWriter(self.file_path, self._schema)
+            else:
+                self._writer = pa.ipc.new_file(self.file_path, self._schema)
+        table = pa.Table.from_pandas(df, schema=self._schema, preserve_index=False)
+        self._writer.write_table(table)
+        self.rows += len(df)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+class ChunkedDataset:
+    """
+    A feature matrix and its target stored on disk as row chunks, for training that
+    streams over the data instead of holding it in memory.
+
+    Layout of `directory`:
+        features-00000.npy / .npz   features of a chunk (dense .npy, read memory-mapped;
+                                    CSR .npz when the matrix is sparse)
+        target-00000.npy            target values of a chunk
+        dataset.json                rows, features, dtype, chunk files and a content
+                                    fingerprint; written last, by close()
+
+    DataFrame chunks (e.g. the CatBoost view) are stored as float32 arrays and their
+    column names kept in `feature_names`.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.chunks = []            # (features file, target file, rows)
+        self.n_rows = 0
+        self.n_features = None
+        self.dtype = None
+        self.sparse = False
+        self.feature_names = None
+        self.fingerprint = None
+        self._digest = None
+
+    # ------------------------------------------------------------------ writing
+    @classmethod
+    def write(cls, directory, X, y, chunk_rows=100_000):
+        """
+        Stores an in-memory matrix and target in chunks of `chunk_rows` rows.
+        """
+        dataset = cls(directory)
+        for start in range(0, _num_samples(X), chunk_rows):
+            rows = slice(start, start + chunk_rows)
+            dataset.append(X.iloc[rows] if hasattr(X, "iloc") else X[rows], np.asarray(y)[rows])
+        return dataset.close()
+
+    def append(self, X, y):
+        if self._digest is None:
+            # First chunk: start from an empty directory
+            if os.path.isdir(self.directory):
+                shutil.rmtree(self.directory)
+            os.makedirs(self.directory)
+            self._digest = hashlib.sha256()
+        if isinstance(X, pd.DataFrame):
+            self.feature_names = list(X.columns)
+            X = X.to_numpy(dtype=np.float32)
+        y = np.asarray(y)
+        if y.dtype == object:
+            y = y.astype(str)   # .npy files are loaded without pickle
+        index = len(self.chunks)
+        self.sparse = sparse.issparse(X)
+        if self.sparse:
+            features_file = f"features-{index:05d}.npz"
+            X = sparse.csr_matrix(X)
+            sparse.save_npz(os.path.join(self.directory, features_file), X, compressed=False)
+        else:
+            features_file = f"features-{index:05d}.npy"
+            np.save(os.path.join(self.directory, features_file), np.ascontiguousarray(X))
+        target_file = f"target-{index:05d}.npy"
+        np.save(os.path.join(self.directory, target_file), y)
+
+        self._digest.update(joblib.hash((X, y)).encode())
+        self.chunks.append((features_file, target_file, len(y)))
+        self.n_rows += len(y)
+        self.n_features = X.shape[1]
+        self.dtype = str(X.dtype)
+
+    def close(self):
+        if self._digest is None:
+            raise ValueError(f"No chunks were written to {self.directory}")
+        self.fingerprint = self._digest.hexdigest()
+        write_json_atomic(os.path.join(self.directory, "dataset.json"), {
+            "chunks": self.chunks,
+            "n_rows": self.n_rows,
+            "n_features": self.n_features,
+            "dtype": self.dtype,
+            "sparse": self.sparse,
+            "feature_names": self.feature_names,
+            "fingerprint": self.fingerprint,
+        })
+        self._digest = None
+        return self
+
+    @property
+    def metadata_path(self):
+        return os.path.join(self.directory, "dataset.json")
+
+    # ------------------------------------------------------------------ reading
+    @classmethod
+    def open(cls, directory):
+        dataset = cls(directory)
+        with open(dataset.metadata_path) as f:
+            metadata = json.load(f)
+        dataset.chunks = [tuple(chunk) for chunk in metadata["chunks"]]
+        for name in ("n_rows", "n_features", "dtype", "sparse", "feature_names", "fingerprint"):
+            setattr(dataset, name, metadata[name])
+        return dataset
+
+    def __len__(self):
+        return self.n_rows
+
+    def iter_chunks(self):
+        """
+        Yields (X, y) chunk by chunk; dense features are memory-mapped.
+        """
+        for features_file, target_file, _ in self.chunks:
+            path = os.path.join(self.directory, features_file)
+            X = sparse.load_npz(path).tocsr() if self.sparse else np.load(path, mmap_mode="r")
+            yield X, np.load(os.path.join(self.directory, target_file))
+
+    def iter_targets(self):
+        for _, target_file, _ in self.chunks:
+            yield np.load(os.path.join(self.directory, target_file))
+
+
+# Estimator parameters that control a model's own thread pool (sklearn/XGBoost, CatBoost)
+THREAD_PARAMS = ("n_jobs", "thread_count")
+
+
+def _limit_estimator_threads(estimator, n_threads):
+    """
+    Pins an estimator's internal parallelism so pool workers do not oversubscribe cores.
+
+    Thread parameters are looked up in the constructor signature as well:
+    CatBoost's get_params() only returns the parameters that were set explicitly.
+    """
+    accepted = set(estimator.get_params(deep=False))
+    accepted.update(inspect.signature(type(estimator).__init__).parameters)
+    updates = {name: n_threads for name in THREAD_PARAMS if name in accepted}
+    if updates:
+        estimator.set_params(**updates)
+    return estimator
+
+
+def _materialize_fold(X, y, train_idx, val_idx):
+    return (_safe_indexing(X, train_idx), _safe_indexing(y, train_idx),
+            _safe_indexing(X, val_idx), _safe_indexing(y, val_idx))
 
 
-def evaluate_models(X_train, y_train, X_test, y_test, models: dict, param: dict):
+class FoldCache:
     """
-    Trains and evaluates multiple models using GridSearchCV.
-    
+    Fold-local training/validation data shared by all candidates of a search.
+
+    Each (feature view, fold, training subsample) is sliced once, stored with
+    joblib.Memory and handed out memory-mapped, so candidates and pool workers
+    read the same pages instead of receiving their own pickled copy per task.
+    With a persistent `cache_dir` the stored folds are reused by later searches
+    on identical data (joblib keys them by a hash of the inputs); otherwise a
+    temporary directory is used and removed by close().
+    """
+
+    def __init__(self, cache_dir=None):
+        self._tmp_dir = None if cache_dir else tempfile.mkdtemp(prefix="fold-cache-")
+        memory = Memory(location=cache_dir or self._tmp_dir, mmap_mode="r", verbose=0)
+        self._materialize = memory.cache(_materialize_fold)
+        self._folds = {}
+        self.hits = self.misses = 0
+
+    def get(self, view, X, y, fold_id, train_idx, val_idx):
+        """
+        Returns (X_train, y_train, X_val, y_val) of one fold; `view` and `fold_id`
+        (plus the number of training rows) identify the entry within this search.
+        """
+        key = (view, fold_id, len(train_idx))
+        if key in self._folds:
+            self.hits += 1
+        else:
+            self.misses += 1
+            # call_and_shelve stores the result; get() reloads it memory-mapped
+            self._folds[key] = self._materialize.call_and_shelve(X, y, train_idx, val_idx).get()
+        return self._folds[key]
+
+    def close(self):
+        self._folds.clear()
+        if self._tmp_dir is not None:
+            shutil.rmtree(self._tmp_dir, ignore_errors=True)
+            self._tmp_dir = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+def _fit_and_score(estimator, params, X_train, y_train, X_eval, y_eval, n_threads):
+    """
+    Fits one (model, params) candidate and scores it; runs inside a pool worker.
+    Failed fits score NaN (like GridSearchCV's error_score) instead of aborting the search.
+    Returns (fitted model, score, wall seconds, CPU seconds, peak RSS MB of the worker, error).
+    """
+    start, cpu_start = time.perf_counter(), time.process_time()
+    memory = {"peak_mb": None}
+    try:
+        with threadpool_limits(limits=n_threads), track_peak_memory() as memory:
+            model = _limit_estimator_threads(clone(estimator).set_params(**params), n_threads)
+            model.fit(X_train, y_train)
+            score = model.score(X_eval, y_eval)
+        error = None
+    except Exception as e:
+        model, score, error = None, np.nan, repr(e)
+    return (model, score, time.perf_counter() - start, time.process_time() - cpu_start,
+            memory["peak_mb"], error)
+
+
+def _search_candidates(grid, search, n_iter, random_state):
+    """
+    Expands a parameter grid into the list of candidates to try.
+    """
+    candidates = list(ParameterGrid(grid))
+    if search == "random" and n_iter < len(candidates):
+        candidates = list(ParameterSampler(grid, n_iter=n_iter, random_state=random_state))
+    return candidates
+
+
+def _search_rounds(search, n_samples, n_folds, n_candidates, halving_factor, abandon_margin):
+    """
+    Returns the schedule as a list of (training fraction, fold ids, keep top 1/factor).
+
+    grid/random: a single full-data round; when abandon_margin is set the first fold is
+                 scored on its own so clearly losing candidates skip the remaining folds.
+    halving:     successive halving, growing the training fraction by `halving_factor`
+                 each round while keeping the best 1/halving_factor of each model's candidates.
+    """
+    all_folds = list(range(n_folds))
+    if search != "halving":
+        if abandon_margin is not None and n_folds > 1:
+            return [(1.0, all_folds[:1], False), (1.0, all_folds[1:], False)]
+        return [(1.0, all_folds, False)]
+
+    n_rounds = 1 + int(np.floor(np.log(max(n_candidates, 1)) / np.log(halving_factor)))
+    # Never train on fewer than ~50 rows, otherwise early rounds are pure noise
+    min_fraction = min(1.0, 50.0 / max(n_samples, 1))
+    rounds = []
+    for i in range(n_rounds):
+        fraction = max(min_fraction, float(halving_factor) ** (i - n_rounds + 1))
+        rounds.append((min(fraction, 1.0), all_folds, i < n_rounds - 1))
+    return rounds
+
+
+def evaluate_models(X_train, y_train, X_test, y_test, models: dict, param: dict,
+                    search="grid", cv=3, n_iter=10, time_budget=None, n_jobs=-1,
+                    threads_per_task=1, halving_factor=3, abandon_margin=None,
+                    random_state=42, return_details=False, feature_views=None,
+                    fold_cache_dir=None):
+    """
+    Trains and evaluates multiple models with a shared, parallel hyper-parameter search.
+
+    Every (model, params, fold) fit is an independent task scheduled on one process
+    pool, with each task's own threads pinned to `threads_per_task`, so nested
+    parallelism (XGBoost, CatBoost, BLAS) never oversubscribes the machine.
+
     Args:
         X_train, y_train: Training data
         X_test, y_test: Testing data
         models (dict): Dictionary of model name -> model object
-        param (dict): Dictionary of model name -> hyperparameters for GridSearchCV
-    
+        param (dict): Dictionary of model name -> hyperparameter grid
+        search (str): "grid" (exhaustive), "random" (n_iter samples per model) or
+                      "halving" (successive halving over training-set size)
+        cv (int): Number of cross-validation folds
+        n_iter (int): Candidates per model for random search
+        time_budget (float): Wall-clock budget in seconds for the search; once spent,
+                             no new task batches are started and the best candidates
+                             evaluated so far are used
+        n_jobs (int): Pool size (-1 = all cores)
+        threads_per_task (int): Thread limit inside each task
+        halving_factor (int): Reduction factor between successive-halving rounds
+        abandon_margin (float): Drop candidates whose CV score trails the best
+                                candidate seen so far by more than this margin
+        random_state (int): Seed for random search and halving subsamples
+        return_details (bool): Also return the fitted winners (see Returns)
+        feature_views (dict): Optional model name -> (X_train, X_test) encoded
+                              differently for that model (same rows, same order);
+                              other models use X_train/X_test
+        fold_cache_dir (str): Directory where fold-local arrays are kept between
+                              searches (see FoldCache); default is a temporary
+                              directory removed when the search ends
+
     Returns:
-        dict: Model name -> best test score
+        dict: Model name -> test score of its best candidate
+        dict: Only with return_details=True; model name -> {"estimator" (fitted on the
+              full training set), "params", "cv_score", "test_score", "search_time"
+              (summed fit time of its candidates), "fit_time" (final refit),
+              "peak_memory_mb" (peak RSS of the process that refitted it)}
     """
-    report = {}
+    if search not in ("grid", "random", "halving"):
+        raise ValueError(f"Unknown search strategy: {search}")
+
+    search_start = time.perf_counter()
+    deadline = search_start + time_budget if time_budget else None
+    rng = np.random.RandomState(random_state)
 
+    # Fold splits are computed once and shared by every candidate
+    splitter = check_cv(cv, y_train, classifier=True)
+    folds = list(splitter.split(X_train, y_train))
+    # Per-fold shuffled training rows, so halving rounds use nested growing subsamples
+    fold_train_order = [rng.permutation(train_idx) for train_idx, _ in folds]
+
+    candidates = []
     for name, model in models.items():
-        params = param.get(name, {})
+        for params in _search_candidates(param.get(name, {}), search, n_iter, random_state):
+            candidates.append({"model": name, "params": params, "scores": {},
+                               "score": np.nan, "round": -1})
+    max_per_model = max((sum(c["model"] == name for c in candidates) for name in models), default=1)
+
+    rounds = _search_rounds(search, len(folds[0][0]), len(folds), max_per_model,
+                            halving_factor, abandon_margin)
+    n_workers = effective_n_jobs(n_jobs)
+    n_tasks = n_failed = 0
+    search_time = dict.fromkeys(models, 0.0)
+    feature_views = feature_views or {}
+    views = {name: feature_views.get(name, (X_train, X_test)) for name in models}
+
+    # Each distinct feature matrix is sliced into folds once, whatever uses it
+    view_keys = {name: id(views[name][0]) for name in models}
+
+    with Parallel(n_jobs=n_jobs) as parallel, FoldCache(fold_cache_dir) as fold_cache:
+        active = list(candidates)
+        previous_fraction = None
+        for round_id, (fraction, fold_ids, halve) in enumerate(rounds):
+            if fraction != previous_fraction:
+                # A new resource level makes earlier scores incomparable
+                for candidate in active:
+                    candidate["scores"] = {}
+            previous_fraction = fraction
+
+            # Dispatch in batches of whole candidates so the budget can be checked in between
+            per_batch = max(1, int(np.ceil(2 * n_workers / len(fold_ids))))
+            finished = []
+            for start in range(0, len(active), per_batch):
+                if deadline is not None and time.perf_counter() > deadline:
+                    logging.info(f"Search budget of {time_budget}s exhausted in round {round_id}")
+                    break
+                batch = active[start:start + per_batch]
+                tasks = []
+                for candidate in batch:
+                    for fold_id in fold_ids:
+                        order = fold_train_order[fold_id]
+                        train_idx = np.sort(order[:max(1, int(len(order) * fraction))])
+                        val_idx = folds[fold_id][1]
+                        tasks.append((candidate, fold_id, train_idx, val_idx))
+
+                results = parallel(
+                    delayed(_fit_and_score)(
+                        models[candidate["model"]], candidate["params"],
+                        *fold_cache.get(view_keys[candidate["model"]], views[candidate["model"]][0],
+                                        y_train, fold_id, train_idx, val_idx),
+                        threads_per_task,
+                    )
+                    for candidate, fold_id, train_idx, val_idx in tasks
+                )
+                for (candidate, fold_id, train_idx, _), (_, score, elapsed, cpu, peak_mb, error) in zip(tasks, results):
+                    candidate["scores"][fold_id] = score
+                    search_time[candidate["model"]] += elapsed
+                    # Fits run in pool workers; their timings are recorded here in the parent
+                    metrics.record("search.candidate", elapsed, cpu, len(train_idx),
+                                   model=candidate["model"], params=candidate["params"],
+                                   fold=fold_id, round=round_id, score=score, peak_mb=peak_mb)
+                    if error is not None:
+                        n_failed += 1
+                        logging.warning(f"{candidate['model']} {candidate['params']} failed: {error}")
+                n_tasks += len(tasks)
+                for candidate in batch:
+                    candidate["score"] = float(np.mean(list(candidate["scores"].values())))
+                    candidate["round"] = round_id
+                finished.extend(batch)
+            else:
+                finished = active
+
+            active = [c for c in finished if not np.isnan(c["score"])]
+            if not active or (deadline is not None and time.perf_counter() > deadline):
+                break
+
+            if halve:
+                survivors = []
+                for name in models:
+                    ranked = sorted((c for c in active if c["model"] == name),
+                                    key=lambda c: c["score"], reverse=True)
+                    survivors.extend(ranked[:max(1, int(np.ceil(len(ranked) / halving_factor)))])
+                active = survivors
 
-        gs = GridSearchCV(model, params, cv=3, n_jobs=-1, verbose=0)
-        gs.fit(X_train, y_train)
+            if abandon_margin is not None and round_id < len(rounds) - 1:
+                best = max(c["score"] for c in active)
+                dropped = [c for c in active if c["score"] < best - abandon_margin]
+                if dropped:
+                    logging.info(f"Abandoned {len(dropped)} candidates trailing best CV score {best:.4f}")
+                active = [c for c in active if c["score"] >= best - abandon_margin]
 
-        best_model = gs.best_estimator_
-        score = best_model.score(X_test, y_test)
+        # Best candidate per model: furthest round reached first, then CV score
+        winners = {}
+        for candidate in candidates:
+            if np.isnan(candidate["score"]):
+                continue
+            current = winners.get(candidate["model"])
+            rank = (candidate["round"], candidate["score"])
+            if current is None or rank > (current["round"], current["score"]):
+                winners[candidate["model"]] = candidate
 
+        skipped = [name for name in models if name not in winners]
+        if skipped:
+            logging.info(f"No completed candidates for: {skipped}")
+
+        # Refit only each model's winner on the full training set, in parallel across models
+        names = list(winners)
+        refits = parallel(
+            delayed(_fit_and_score)(
+                models[name], winners[name]["params"], views[name][0], y_train,
+                views[name][1], y_test, threads_per_task,
+            )
+            for name in names
+        )
+
+    report = {}
+    details = {}
+    for name, (fitted, score, elapsed, cpu, peak_mb, error) in zip(names, refits):
+        metrics.record("search.refit", elapsed, cpu, _num_samples(X_train), model=name, score=score,
+                       peak_mb=peak_mb)
+        if error is not None:
+            logging.warning(f"Refit of {name} failed: {error}")
+            continue
         report[name] = score
+        details[name] = {
+            "estimator": fitted,
+            "params": winners[name]["params"],
+            "cv_score": winners[name]["score"],
+            "test_score": score,
+            "search_time": search_time[name],
+            "fit_time": elapsed,
+            "peak_memory_mb": peak_mb,
+        }
+
+    logging.info(
+        f"Model search ({search}) finished in {time.perf_counter() - search_start:.1f}s: "
+        f"{n_tasks} fits, {n_failed} failed, {fold_cache.misses} fold slices reused {fold_cache.hits} times"
+    )
+    if return_details:
+        return report, details
+    return report
+
+
+def _out_of_core_kind(estimator):
+    """
+    Returns how evaluate_models_out_of_core trains an estimator, or None if it cannot.
+    """
+    kind = type(estimator).__name__
+    if kind == "XGBClassifier":
+        return "xgboost"
+    if kind == "CatBoostClassifier":
+        # CatBoost quantizes a pool file without loading it only for numeric features;
+        # categorical ones would need the whole raw pool in memory
+        return None if estimator.get_params().get("cat_features") else "catboost"
+    if hasattr(estimator, "partial_fit"):
+        return "partial_fit"
+    return None
+
+
+def _stream_rows(dataset, classes, part="all", validation_fraction=0.0, random_state=42, prepare=None):
+    """
+    Yields (X, integer-coded y) chunks of a ChunkedDataset.
+
+    part="fit" / "validation" selects the training / held-out rows of each chunk (a
+    fixed random `validation_fraction` of its rows, the same on every pass); "all"
+    yields every row. `prepare` converts X before it is yielded.
+    """
+    for index, (X, y) in enumerate(dataset.iter_chunks()):
+        y = np.searchsorted(classes, y)
+        if part != "all":
+            held_out = np.random.RandomState(random_state + index).rand(len(y)) < validation_fraction
+            rows = held_out if part == "validation" else ~held_out
+            X, y = X[rows], y[rows]
+        if len(y):
+            yield (prepare(X) if prepare is not None else X), y
+
+
+def _streamed_accuracy(model, batches):
+    correct = total = 0
+    for X, y in batches:
+        correct += int(np.sum(np.ravel(model.predict(X)) == y))
+        total += len(y)
+    return correct / total if total else np.nan
+
+
+def _fit_partial(estimator, batches, classes, epochs):
+    """
+    Trains an estimator with `epochs` partial_fit passes over the chunks of batches().
+    """
+    for _ in range(epochs):
+        for X, y in batches():
+            estimator.partial_fit(X, y, classes=classes)
+    return estimator
+
 
+def _xgboost_matrix(batches, feature_types, cache_prefix, max_bin=256):
+    """
+    External-memory DMatrix over the chunks of batches(): XGBoost quantizes the
+    chunks and pages them through `cache_prefix` files instead of holding them.
+    """
+    import xgboost
+
+    class ChunkIterator(xgboost.DataIter):
+        def __init__(self):
+            super().__init__(cache_prefix=cache_prefix)
+            self._batches = None
+
+        def next(self, input_data):
+            if self._batches is None:
+                self._batches = batches()
+            batch = next(self._batches, None)
+            if batch is None:
+                return False
+            X, y = batch
+            input_data(data=X if sparse.issparse(X) else np.asarray(X), label=y, feature_types=feature_types)
+            return True
+
+        def reset(self):
+            self._batches = None
+
+    return xgboost.ExtMemQuantileDMatrix(
+        ChunkIterator(), max_bin=max_bin, enable_categorical=bool(feature_types) and "c" in feature_types
+    )
+
+
+def _fit_xgboost(estimator, dtrain, n_classes):
+    """
+    Trains an XGBClassifier's booster on a (external-memory) DMatrix and loads it
+    into the estimator, which then predicts and pickles like one fitted in memory.
+    """
+    import xgboost
+
+    params = {key: value for key, value in estimator.get_xgb_params().items()
+              if value is not None and key not in ("feature_types", "enable_categorical")}
+    if n_classes > 2:
+        params.update(objective="multi:softprob", num_class=n_classes)
+    booster = xgboost.train(params, dtrain, num_boost_round=estimator.n_estimators or 100)
+    estimator.load_model(bytearray(booster.save_raw("ubj")))
+    return estimator
+
+
+def _catboost_pool(batches, cat_features, feature_names, directory, border_count=None):
+    """
+    Writes the chunks of batches() to a tab-separated CatBoost pool file with its
+    column description, then quantizes it straight from the file: the raw values
+    are never held in memory, only the quantized pool (one byte per feature value).
+    CatBoost's file quantization does not support categorical features (see
+    _out_of_core_kind).
+    """
+    from catboost.utils import quantize
+
+    data_path = os.path.join(directory, "pool.tsv")
+    cd_path = os.path.join(directory, "pool.cd")
+    n_features = 0
+    with open(data_path, "w") as f:
+        for X, y in batches():
+            frame = pd.DataFrame(np.asarray(X))
+            for index in cat_features:
+                frame[index] = frame[index].astype(np.int64)
+            frame.insert(0, "label", y)
+            frame.to_csv(f, sep="\t", header=False, index=False, na_rep="nan")
+            n_features = X.shape[1]
+    with open(cd_path, "w") as f:
+        f.write("0\tLabel\n")
+        for index, name in enumerate(feature_names or map(str, range(n_features))):
+            f.write(f"{index + 1}\t{'Categ' if index in cat_features else 'Num'}\t{name}\n")
+    return quantize(data_path, column_description=cd_path, delimiter="\t", border_count=border_count)
+
+
+def _catboost_frame(feature_names, cat_features):
+    """
+    Returns a converter of float32 chunks back to the frames CatBoost predicts on
+    (integer categorical columns, the names of the training view).
+    """
+    def prepare(X):
+        frame = pd.DataFrame(np.asarray(X), columns=feature_names)
+        for index in cat_features:
+            frame[frame.columns[index]] = frame.iloc[:, index].astype(np.int32)
+        return frame
+    return prepare
+
+
+def evaluate_models_out_of_core(train_data, test_data, models: dict, param: dict, classes,
+                                search="grid", n_iter=10, time_budget=None, epochs=5,
+                                validation_fraction=0.1, n_jobs=-1, random_state=42,
+                                return_details=False, feature_views=None, work_dir=None):
+    """
+    Out-of-core counterpart of evaluate_models: trains and evaluates models on
+    ChunkedDatasets without loading a whole feature matrix.
+
+    Candidates run one after the other in this process on `n_jobs` threads, so the
+    data is never copied per worker:
+    - models with partial_fit (e.g. SGDClassifier) make `epochs` passes over the chunks,
+    - XGBoost trains on an external-memory DMatrix built from the chunks,
+    - CatBoost without categorical features trains on a Pool quantized straight from
+      a file written from the chunks.
+    Other models are skipped. A fixed random `validation_fraction` of each chunk's
+    rows ranks the candidates; winners are not refitted with those rows (another full
+    pass) and are scored on test_data. The peak RSS of every candidate's fit is
+    recorded with its timing ("search.out_of_core" metrics).
+
+    Args:
+        train_data, test_data (ChunkedDataset): Features and raw targets
+        models (dict): Dictionary of model name -> model object
+        param (dict): Dictionary of model name -> hyperparameter grid
+        classes (array): Sorted class labels; targets are coded as their positions
+        search (str): "grid" or "random" ("halving" needs in-memory subsamples and
+                      searches the full grid)
+        n_iter (int): Candidates per model for random search
+        time_budget (float): Wall-clock seconds after which no new candidate is started
+        epochs (int): Passes over the chunks of partial_fit models
+        validation_fraction (float): Share of each chunk's rows held out for ranking
+        n_jobs (int): Threads of each fit (-1 = all cores)
+        random_state (int): Seed for random search and the held-out rows
+        return_details (bool): Also return the fitted winners (see Returns)
+        feature_views (dict): Optional model name -> (train, test) ChunkedDatasets
+                              encoded differently for that model
+        work_dir (str): Directory for the XGBoost page cache and CatBoost pool files
+                        (default: the system temporary directory); removed per model
+
+    Returns:
+        dict: Model name -> test score of its best candidate
+        dict: Only with return_details=True; model name -> {"estimator", "params",
+              "cv_score" (held-out score), "test_score", "search_time", "fit_time",
+              "peak_memory_mb" (peak RSS while the winner was fitted), "candidates"
+              (params, held-out score, fit time and peak RSS of every candidate)}
+    """
+    if search not in ("grid", "random", "halving"):
+        raise ValueError(f"Unknown search strategy: {search}")
+    if search == "halving":
+        logging.info("Successive halving needs in-memory subsamples; searching the full grid out of core")
+        search = "grid"
+
+    search_start = time.perf_counter()
+    deadline = search_start + time_budget if time_budget else None
+    n_threads = effective_n_jobs(n_jobs)
+    codes = np.arange(len(classes))
+    feature_views = feature_views or {}
+    if work_dir:
+        os.makedirs(work_dir, exist_ok=True)
+
+    report, details = {}, {}
+    n_fits = 0
+    for name, model in models.items():
+        kind = _out_of_core_kind(model)
+        if kind is None:
+            logging.warning(f"{name} cannot be trained out of core (no partial_fit, external-memory "
+                            f"source or, for CatBoost, only numeric features); skipped")
+            continue
+        if deadline is not None and time.perf_counter() > deadline:
+            logging.info(f"Search budget of {time_budget}s exhausted before {name}")
+            break
+
+        train, test = feature_views.get(name, (train_data, test_data))
+
+        def stream(dataset, part="all", prepare=None):
+            return _stream_rows(dataset, classes, part, validation_fraction, random_state, prepare)
+
+        model_params = model.get_params()
+        cat_features = sorted(model_params.get("cat_features") or ()) if kind == "catboost" else []
+        prepare = _catboost_frame(train.feature_names, cat_features) if kind == "catboost" else None
+        data_dir = tempfile.mkdtemp(prefix=f"{kind}-", dir=work_dir)
+        source = None
+        try:
+            # The boosting libraries' on-disk data sources are built once per model
+            with track_stage(f"search.out_of_core.{kind}_data", rows=len(train), model=name):
+                if kind == "xgboost":
+                    source = _xgboost_matrix(
+                        lambda: stream(train, "fit"), model_params.get("feature_types"),
+                        os.path.join(data_dir, "cache"), max_bin=model_params.get("max_bin") or 256,
+                    )
+                elif kind == "catboost":
+                    source = _catboost_pool(
+                        lambda: stream(train, "fit"), cat_features, train.feature_names, data_dir,
+                        border_count=model_params.get("border_count"),
+                    )
+
+            best, candidates = None, []
+            for params in _search_candidates(param.get(name, {}), search, n_iter, random_state):
+                if deadline is not None and time.perf_counter() > deadline:
+                    logging.info(f"Search budget of {time_budget}s exhausted during {name}")
+                    break
+                start, cpu_start = time.perf_counter(), time.process_time()
+                memory = {"peak_mb": None, "peak_delta_mb": None}
+                try:
+                    estimator = _limit_estimator_threads(clone(model).set_params(**params), n_threads)
+                    with threadpool_limits(limits=n_threads), track_peak_memory() as memory:
+                        if kind == "partial_fit":
+                            _fit_partial(estimator, lambda: stream(train, "fit"), codes, epochs)
+                        elif kind == "xgboost":
+                            _fit_xgboost(estimator, source, len(classes))
+                        else:
+                            # Integer class names: predictions are codes, as for in-memory fits
+                            estimator.set_params(class_names=[int(code) for code in codes])
+                            estimator.fit(source)
+                        score = _streamed_accuracy(estimator, stream(train, "validation", prepare))
+                    error = None
+                except Exception as e:
+                    estimator, score, error = None, np.nan, repr(e)
+                elapsed, cpu = time.perf_counter() - start, time.process_time() - cpu_start
+                n_fits += 1
+                metrics.record("search.out_of_core", elapsed, cpu, len(train), model=name, params=params,
+                               score=score, peak_mb=memory["peak_mb"], peak_delta_mb=memory["peak_delta_mb"])
+                if error is not None:
+                    logging.warning(f"{name} {params} failed: {error}")
+                    continue
+                logging.info(f"{name} {params}: held-out score {score:.4f} in {elapsed:.1f}s, "
+                             f"peak RSS {memory['peak_mb']:.0f} MB")
+                candidate = {"params": params, "score": score, "fit_time": elapsed,
+                             "peak_memory_mb": memory["peak_mb"]}
+                candidates.append(candidate)
+                if best is None or score > best[0]["score"]:
+                    best = (candidate, estimator)
+        finally:
+            # Release XGBoost's page cache before its files are removed
+            del source
+            shutil.rmtree(data_dir, ignore_errors=True)
+
+        if best is None:
+            logging.info(f"No completed candidates for: {name}")
+            continue
+        winner, estimator = best
+        test_score = _streamed_accuracy(estimator, stream(test, "all", prepare))
+        report[name] = test_score
+        details[name] = {
+            "estimator": estimator,
+            "params": winner["params"],
+            "cv_score": winner["score"],
+            "test_score": test_score,
+            "search_time": sum(candidate["fit_time"] for candidate in candidates),
+            "fit_time": winner["fit_time"],
+            "peak_memory_mb": winner["peak_memory_mb"],
+            "candidates": candidates,
+        }
+
+    logging.info(
+        f"Out-of-core model search ({search}) finished in {time.perf_counter() - search_start:.1f}s: "
+        f"{n_fits} fits over {len(train_data)} training rows"
+    )
+    if return_details:
+        return report, details
     return report
+
+
+class ArtifactCache:
+    """
+    Process-wide, thread-safe cache of deserialized artifacts (models, preprocessors).
+
+    Each artifact is loaded once (checked against its checksum manifest, optionally
+    memory-mapped) and served from memory afterwards. On access the
+    file's mtime/size is re-checked (at most every `check_interval` seconds); when it
+    changed, the content hash decides whether the artifact really has to be reloaded,
+    so a retrain that replaces the file is picked up without restarting the process.
+    """
+
+    def __init__(self, check_interval: float = 1.0, mmap_mode: str = None):
+        self.check_interval = check_interval
+        self.mmap_mode = mmap_mode
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._path_locks = {}
+        self.stats = {"hits": 0, "misses": 0, "reloads": 0, "load_time": 0.0}
+
+    def _path_lock(self, key):
+        with self._lock:
+            return self._path_locks.setdefault(key, threading.Lock())
+
+    def get(self, file_path):
+        """
+        Returns the object stored at `file_path`, loading or hot-swapping it as needed.
+        """
+        key = os.path.abspath(file_path)
+        entry = self._entries.get(key)
+        now = time.monotonic()
+
+        # Fast path: recently validated entry, no filesystem access at all
+        if entry is not None and now - entry["checked_at"] < self.check_interval:
+            self._count("hits")
+            return entry["obj"]
+
+        with self._path_lock(key):
+            entry = self._entries.get(key)
+            if not os.path.exists(key):
+                raise FileNotFoundError(f"File not found: {file_path}")
+            stat = os.stat(key)
+            signature = (stat.st_mtime_ns, stat.st_size)
+
+            if entry is not None:
+                if entry["signature"] == signature:
+                    entry["checked_at"] = now
+                    self._count("hits")
+                    return entry["obj"]
+                # File was touched; only reload when the content actually changed
+                # (verify_object hashes the file anyway when it has a manifest entry)
+                digest = verify_object(key) or file_digest(key)
+                if digest == entry["digest"]:
+                    entry["signature"] = signature
+                    entry["checked_at"] = now
+                    self._count("hits")
+                    return entry["obj"]
+                self._count("reloads")
+            else:
+                digest = verify_object(key) or file_digest(key)
+
+            self._count("misses")
+            start = time.perf_counter()
+            obj = load_object(key, mmap_mode=self.mmap_mode, verify=False)
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.stats["load_time"] += elapsed
+
+            self._entries[key] = {
+                "obj": obj,
+                "signature": signature,
+                "digest": digest,
+                "checked_at": time.monotonic(),
+            }
+            return obj
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def version(self, file_path):
+        """
+        Returns the content digest of the cached artifact, or None if not loaded yet.
+        """
+        entry = self._entries.get(os.path.abspath(file_path))
+        return entry["digest"] if entry is not None else None
+
+    def get_stats(self):
+        """
+        Returns a snapshot of the hit/miss/reload counters and total load time.
+        """
+        with self._lock:
+            return dict(self.stats)
+
+    def clear(self):
+        """
+        Drops every cached artifact; the next access reloads from disk.
+        """
+        with self._lock:
+            self._entries.clear()
+
+
+# Shared cache used by the prediction pipeline (one per process). ARTIFACT_MMAP_MODE=r
+# memory-maps uncompressed artifacts so server workers share the model's pages.
+artifact_cache = ArtifactCache(mmap_mode=os.environ.get("ARTIFACT_MMAP_MODE") or None)
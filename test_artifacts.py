@@ -0,0 +1,52 @@
+import pytest
+
+from src.exception import ArtifactIntegrityError
+from src.utils import load_object, parse_compress, read_manifest, save_object, verify_object
+
+
+def test_manifest_records_saved_artifacts(tmp_path):
+    path = str(tmp_path / "model.pkl")
+    save_object(path, {"weights": [1, 2, 3]})
+    entry = read_manifest(str(tmp_path))["model.pkl"]
+    assert entry["size"] > 0
+    assert verify_object(path) == entry["sha256"]
+    assert load_object(path) == {"weights": [1, 2, 3]}
+
+
+def test_manifest_rejects_modified_artifacts(tmp_path):
+    path = str(tmp_path / "model.pkl")
+    save_object(path, {"weights": [1, 2, 3]})
+    with open(path, "ab") as f:
+        f.write(b"tampered")
+    with pytest.raises(ArtifactIntegrityError):
+        load_object(path)
+    # Explicit opt-out still reads the file
+    assert load_object(path, verify=False) == {"weights": [1, 2, 3]}
+
+
+def test_artifacts_without_manifest_entry_pass(tmp_path):
+    path = str(tmp_path / "model.pkl")
+    save_object(path, [1])
+    (tmp_path / "manifest.json").unlink()
+    assert verify_object(path) is None
+    assert load_object(path) == [1]
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("0", 0), ("3", 3), ("zlib", ("zlib", 3)), ("lzma:6", ("lzma", 6)), (" gzip:1 ", ("gzip", 1)),
+])
+def test_parse_compress(value, expected):
+    assert parse_compress(value) == expected
+
+
+@pytest.mark.parametrize("value", ["zstd", "12", "lz4:x", "zlib:10", ""])
+def test_parse_compress_rejects_bad_values(value):
+    with pytest.raises(ValueError):
+        parse_compress(value)
+
+
+def test_compressed_artifacts_round_trip(tmp_path):
+    path = str(tmp_path / "model.pkl")
+    save_object(path, list(range(1000)), compress=parse_compress("zlib:3"))
+    assert read_manifest(str(tmp_path))["model.pkl"]["compress"] == ["zlib", 3]
+    assert load_object(path) == list(range(1000))
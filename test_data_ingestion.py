@@ -0,0 +1,47 @@
+import io
+
+import numpy as np
+import pandas as pd
+
+from src.components.data_ingestion import hash_split_mask
+
+
+def make_rows(n_rows=5000, seed=0):
+    rng = np.random.RandomState(seed)
+    return pd.DataFrame({
+        "Weather": rng.choice(["Clear", "Rain", "Fog"], n_rows),
+        "Latitude": rng.rand(n_rows),
+        "Longitude": rng.rand(n_rows),
+    })
+
+
+def test_hash_split_is_deterministic():
+    df = make_rows()
+    np.testing.assert_array_equal(hash_split_mask(df, 0.2, 42), hash_split_mask(df.copy(), 0.2, 42))
+
+
+def test_hash_split_does_not_depend_on_chunking_or_order():
+    df = make_rows()
+    whole = pd.Series(hash_split_mask(df, 0.2, 42), index=df.index)
+    chunked = np.concatenate([hash_split_mask(df.iloc[start:start + 700], 0.2, 42)
+                              for start in range(0, len(df), 700)])
+    np.testing.assert_array_equal(chunked, whole.to_numpy())
+    shuffled = df.sample(frac=1.0, random_state=0)
+    np.testing.assert_array_equal(hash_split_mask(shuffled, 0.2, 42), whole.loc[shuffled.index].to_numpy())
+
+
+def test_hash_split_respects_test_size_and_seed():
+    df = make_rows()
+    mask = hash_split_mask(df, 0.2, 42)
+    assert abs(mask.mean() - 0.2) < 0.03
+    assert (mask != hash_split_mask(df, 0.2, 7)).any()
+
+
+def test_hash_split_does_not_depend_on_inferred_dtypes():
+    # "count" is int64 in the chunks without a NaN and float64 in the whole file
+    lines = [f"{i},{'Rain' if i % 3 else ''},{i * 0.5}" for i in range(1000)] + [",Fog,1.0"]
+    text = "count,Weather,Latitude\n" + "\n".join(lines) + "\n"
+    whole = hash_split_mask(pd.read_csv(io.StringIO(text)), 0.2, 42)
+    chunks = pd.read_csv(io.StringIO(text), chunksize=300)
+    chunked = np.concatenate([hash_split_mask(chunk, 0.2, 42) for chunk in chunks])
+    np.testing.assert_array_equal(chunked, whole)
@@ -0,0 +1,46 @@
+import sys
+
+import pytest
+
+from src.exception import ArtifactIntegrityError, CustomException
+
+
+def raise_wrapped(error):
+    try:
+        raise error
+    except Exception as e:
+        raise CustomException(e, sys)
+
+
+@pytest.mark.parametrize("error, code, status", [
+    (FileNotFoundError("missing"), "ARTIFACT_NOT_FOUND", 503),
+    (ArtifactIntegrityError("corrupted"), "ARTIFACT_CORRUPTED", 503),
+    (KeyError("Weather"), "INVALID_INPUT", 400),
+    (ValueError("bad value"), "INVALID_INPUT", 400),
+    (RuntimeError("boom"), "INTERNAL_ERROR", 500),
+])
+def test_custom_exception_codes(error, code, status):
+    with pytest.raises(CustomException) as info:
+        raise_wrapped(error)
+    assert (info.value.code, info.value.http_status) == (code, status)
+    assert info.value.__cause__ is error
+
+
+def test_custom_exception_keeps_code_when_rewrapped():
+    try:
+        raise_wrapped(KeyError("Weather"))
+    except CustomException as e:
+        outer = CustomException(e, sys)
+    assert outer.code == "INVALID_INPUT"
+    assert CustomException(ValueError("x"), sys, code="TIMEOUT").code == "TIMEOUT"
+
+
+def test_custom_exception_renders_message_lazily():
+    with pytest.raises(CustomException) as info:
+        raise_wrapped(ValueError("bad value"))
+    error = info.value
+    assert error._error_message is None
+    message = str(error)
+    assert __file__ in message and "bad value" in message
+    assert error._error_message == message
+    assert str(CustomException("plain")) == "Error : plain"
@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.utils import FrameAppender, append_frame, read_frame, write_frame
+
+
+def make_chunk(weather, latitude):
+    return pd.DataFrame({
+        "Date": ["2025-01-01"] * len(weather),
+        "Weather": weather,
+        "Latitude": latitude,
+        "Severity": ["Low"] * len(weather),
+    })
+
+
+@pytest.mark.parametrize("extension", [".parquet", ".feather", ".csv"])
+def test_appender_accepts_an_empty_first_chunk(tmp_path, extension):
+    path = str(tmp_path / f"train{extension}")
+    with FrameAppender(path) as out:
+        out.append(make_chunk([np.nan, np.nan], [1, 2]))   # All-null categorical, int coordinates
+        out.append(make_chunk(["Rain", "Fog"], [1.5, np.nan]))
+    df = read_frame(path)
+    assert len(df) == 4
+    assert df["Weather"].iloc[2:].tolist() == ["Rain", "Fog"]
+    assert df["Weather"].iloc[:2].isna().all()
+    np.testing.assert_allclose(df["Latitude"].to_numpy(dtype=float), [1, 2, 1.5, np.nan])
+
+
+@pytest.mark.parametrize("extension", [".parquet", ".feather"])
+def test_columnar_round_trip_and_append(tmp_path, extension):
+    path = str(tmp_path / f"train{extension}")
+    write_frame(make_chunk(["Rain", "Clear"], [40.7, 40.8]), path)
+    append_frame(make_chunk(["Snow"], [40.9]), path)
+    df = read_frame(path)
+    assert df["Weather"].tolist() == ["Rain", "Clear", "Snow"]
+    assert isinstance(df["Weather"].dtype, pd.CategoricalDtype)
+    assert df["Latitude"].dtype == np.float32
@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+import pytest
+import scipy.sparse as sp
+from sklearn.linear_model import LogisticRegression
+
+from src.components.data_transformation import DataTransformation, DataTransformationConfig
+from src.components.inference_bundle import InferenceBundle
+from src.exception import CustomException
+from src.pipeline.predict_pipeline import PredictPipeline, PredictPipelineConfig
+from src.utils import save_object
+
+
+CATEGORIES = {
+    "Weather": ["Clear", "Rain", "Fog"],
+    "Road_Condition": ["Good", "Moderate", "Poor"],
+    "Time_of_Day": ["Morning", "Afternoon", "Night"],
+    "Traffic": ["Low", "Medium", "High"],
+    "Accident_Type": ["Rollover", "Head-on", "Rear-end"],
+    "Vehicle_Type": ["Car", "Bicycle", "Truck"],
+    "Accident_Reason": ["Speeding", "Weather", "Distracted Driving"],
+}
+
+
+def make_frame(n_rows, seed=0):
+    rng = np.random.RandomState(seed)
+    frame = pd.DataFrame({column: rng.choice(values, n_rows) for column, values in CATEGORIES.items()})
+    frame["Latitude"] = 40.7 + rng.rand(n_rows) * 0.2
+    frame["Longitude"] = -73.9 + rng.rand(n_rows) * 0.2
+    timestamps = pd.Timestamp("2025-01-01") + pd.to_timedelta(rng.randint(0, 365 * 24 * 3600, n_rows), unit="s")
+    frame["Date"] = timestamps.strftime("%Y-%m-%d")
+    frame["Time"] = timestamps.strftime("%H:%M:%S")
+    target = pd.Series(rng.choice(["Low", "Medium", "High"], n_rows), name="Severity")
+    return frame, target
+
+
+def dense(matrix):
+    return matrix.toarray() if sp.issparse(matrix) else np.asarray(matrix)
+
+
+@pytest.fixture(scope="module")
+def fitted():
+    X, y = make_frame(600)
+    config = DataTransformationConfig(timestamp_cache_dir=None, output_dtype=None)
+    preprocessor = DataTransformation(config).get_data_transformer_object()
+    features = preprocessor.fit_transform(X, y)
+    model = LogisticRegression(max_iter=500).fit(features, y)
+    return preprocessor, InferenceBundle(preprocessor, model)
+
+
+def test_transform_matches_column_transformer(fitted):
+    preprocessor, bundle = fitted
+    X, _ = make_frame(200, seed=1)
+    np.testing.assert_allclose(dense(bundle.transform(X)), dense(preprocessor.transform(X)), atol=1e-6)
+
+
+@pytest.mark.parametrize("n_rows", [5, 2000])   # Below and above SMALL_BATCH_ROWS
+def test_transform_matches_with_missing_and_unknown_values(fitted, n_rows):
+    preprocessor, bundle = fitted
+    X, _ = make_frame(n_rows, seed=2)
+    X.loc[X.index[0], "Weather"] = "Hail"               # Category unseen in training
+    X.loc[X.index[1], "Vehicle_Type"] = None            # Missing category
+    X.loc[X.index[2], "Latitude"] = np.nan              # Missing coordinate
+    X.loc[X.index[3], "Date"] = None                    # Missing timestamp
+    X.loc[X.index[4], "Time"] = "not a time"            # Unparseable timestamp
+    np.testing.assert_allclose(dense(bundle.transform(X)), dense(preprocessor.transform(X)), atol=1e-6)
+
+
+def test_predict_matches_model_on_column_transformer_output(fitted):
+    preprocessor, bundle = fitted
+    X, _ = make_frame(100, seed=3)
+    np.testing.assert_array_equal(bundle.predict(X), bundle.model.predict(preprocessor.transform(X)))
+
+
+def test_column_order_does_not_matter(fitted):
+    _, bundle = fitted
+    X, _ = make_frame(50, seed=4)
+    shuffled = X[list(reversed(X.columns))]
+    np.testing.assert_allclose(dense(bundle.transform(shuffled)), dense(bundle.transform(X)))
+
+
+def test_pipeline_serves_saved_bundle_and_requires_one(fitted, tmp_path):
+    _, bundle = fitted
+    config = PredictPipelineConfig(bundle_file_path=str(tmp_path / "model_bundle.pkl"), prediction_cache_size=0)
+    with pytest.raises(CustomException) as info:
+        PredictPipeline(config).predict(make_frame(3)[0])
+    assert info.value.code == "ARTIFACT_NOT_FOUND"
+
+    save_object(config.bundle_file_path, bundle)
+    X, _ = make_frame(20, seed=5)
+    np.testing.assert_array_equal(PredictPipeline(config).predict(X), bundle.predict(X))
+    assert set(bundle.predict(X)) <= {"Low", "Medium", "High"}
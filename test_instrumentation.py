@@ -0,0 +1,43 @@
+import json
+import threading
+
+import src.instrumentation as instrumentation
+from src.instrumentation import StageMetrics, track_stage
+
+
+def test_records_aggregate_per_stage():
+    metrics = StageMetrics()
+    metrics.record("predict", 0.5, cpu_s=0.25, rows=10)
+    metrics.record("predict", 1.5, rows=5, model="v1")
+    assert metrics.aggregates["predict"] == {"count": 2, "wall_s": 2.0, "cpu_s": 0.25, "rows": 15}
+    assert metrics.records[-1]["model"] == "v1"
+    assert "pipeline_stage_runs_total" in metrics.to_prometheus()
+
+
+def test_metrics_file_is_written_outside_the_lock(tmp_path, monkeypatch):
+    metrics = StageMetrics(metrics_file=str(tmp_path / "metrics" / "stages.jsonl"))
+    builtin_open = open
+
+    def checked_open(*args, **kwargs):
+        assert not metrics._lock.locked()
+        return builtin_open(*args, **kwargs)
+
+    monkeypatch.setattr(instrumentation, "open", checked_open, raising=False)
+    threads = [threading.Thread(target=lambda: [metrics.record("predict", 0.01, rows=1) for _ in range(50)])
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    with builtin_open(metrics.metrics_file) as f:
+        lines = [json.loads(line) for line in f]
+    assert len(lines) == 400 and all(line["stage"] == "predict" for line in lines)
+    assert metrics.aggregates["predict"]["count"] == 400
+
+
+def test_track_stage_records_labels_and_status():
+    with track_stage("unit.test_stage", rows=3, model="m") as info:
+        info["status"] = "ran"
+    record = [r for r in instrumentation.metrics.records if r["stage"] == "unit.test_stage"][-1]
+    assert record["rows"] == 3 and record["model"] == "m" and record["status"] == "ran"
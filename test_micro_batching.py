@@ -0,0 +1,81 @@
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.exception import CustomException
+from src.pipeline.micro_batching import MicroBatcher
+from src.pipeline.predict_pipeline import FEATURE_COLUMNS
+
+
+class EchoPipeline:
+    """Predicts each row's Latitude as a string; fails on any row whose Weather is "Boom"."""
+
+    def __init__(self):
+        self.batches = []
+
+    def predict(self, features, return_version=False):
+        self.batches.append(len(features))
+        if (features["Weather"] == "Boom").any():
+            raise ValueError("cannot score Boom")
+        preds = np.asarray([f"{value:g}" for value in features["Latitude"]])
+        return (preds, "v1") if return_version else preds
+
+
+def make_record(latitude, weather="Clear"):
+    record = {column: "x" for column in FEATURE_COLUMNS}
+    record.update(Weather=weather, Latitude=latitude, Longitude=-73.9)
+    return record
+
+
+@pytest.fixture
+def batcher():
+    return MicroBatcher(EchoPipeline(), max_batch_size=16, max_wait_ms=50)
+
+
+def submit_concurrently(batcher, requests):
+    results = [None] * len(requests)
+
+    def call(index):
+        try:
+            results[index] = batcher.submit(requests[index], timeout=5, return_version=True)
+        except CustomException as e:
+            results[index] = e
+
+    threads = [threading.Thread(target=call, args=(index,)) for index in range(len(requests))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_concurrent_requests_are_batched_and_fanned_out(batcher):
+    results = submit_concurrently(batcher, [[make_record(i)] for i in range(8)])
+    assert results == [([f"{i:g}"], "v1") for i in range(8)]
+    assert len(batcher.pipeline.batches) < 8
+    assert batcher.get_stats()["requests"] == 8
+
+
+def test_failing_request_fails_alone(batcher):
+    requests = [[make_record(1)], [make_record(2, weather="Boom")], [make_record(3)], [make_record("abc")]]
+    results = submit_concurrently(batcher, requests)
+    assert results[0] == (["1"], "v1") and results[2] == (["3"], "v1")
+    assert isinstance(results[1], CustomException)
+    assert isinstance(results[3], CustomException) and results[3].code == "INVALID_INPUT"
+
+
+def test_frame_without_feature_columns_is_rejected(batcher):
+    with pytest.raises(CustomException) as info:
+        batcher.submit(pd.DataFrame({"Latitude": [1.0]}), timeout=5)
+    assert info.value.code == "INVALID_INPUT"
+    assert batcher.submit([make_record(4)], timeout=5) == ["4"]
+
+
+def test_worker_survives_a_batch_that_cannot_be_built(batcher, monkeypatch):
+    # Skip request validation so the bad frame reaches the worker
+    monkeypatch.setattr(MicroBatcher, "_validated", staticmethod(lambda features: features))
+    with pytest.raises(CustomException):
+        batcher.submit(pd.DataFrame({"Latitude": [1.0]}), timeout=5)
+    assert batcher.submit([make_record(5)], timeout=5) == ["5"]
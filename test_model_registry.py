@@ -0,0 +1,86 @@
+import pandas as pd
+import pytest
+from sklearn.dummy import DummyClassifier
+from sklearn.preprocessing import StandardScaler
+
+from src.components.inference_bundle import InferenceBundle
+from src.components.model_registry import CANARY_ALIAS, PRODUCTION_ALIAS, ModelRegistry
+from src.exception import CustomException
+from src.utils import load_object
+
+
+def make_bundle(version):
+    X = pd.DataFrame({"Latitude": [0.0, 1.0, 2.0, 3.0]})
+    preprocessor = StandardScaler().fit(X)
+    model = DummyClassifier(strategy="most_frequent").fit(preprocessor.transform(X), ["Low", "Low", "High", "Low"])
+    return InferenceBundle(preprocessor, model, metadata={"version": version, "model_name": "Dummy"})
+
+
+@pytest.fixture
+def registry(tmp_path):
+    # check_interval=0: every lookup sees the latest aliases.json
+    registry = ModelRegistry(root=str(tmp_path / "registry"), check_interval=0.0)
+    for version in ("v1", "v2", "v3"):
+        registry.register(make_bundle(version), metrics={"Dummy": 0.5})
+    return registry
+
+
+def test_registry_promote_and_rollback(registry):
+    registry.set_alias(PRODUCTION_ALIAS, "v1")
+    registry.set_alias(PRODUCTION_ALIAS, "v2")
+    registry.set_alias(PRODUCTION_ALIAS, "v3")
+    assert registry.resolve(PRODUCTION_ALIAS) == "v3"
+
+    assert registry.rollback(PRODUCTION_ALIAS) == "v2"
+    assert registry.rollback(PRODUCTION_ALIAS) == "v1"
+    assert registry.resolve(PRODUCTION_ALIAS) == "v1"
+    with pytest.raises(ValueError):
+        registry.rollback(PRODUCTION_ALIAS)
+
+
+def test_registry_promote_to_same_version_keeps_history(registry):
+    registry.set_alias(PRODUCTION_ALIAS, "v1")
+    registry.set_alias(PRODUCTION_ALIAS, "v2")
+    registry.set_alias(PRODUCTION_ALIAS, "v2")
+    assert registry.rollback(PRODUCTION_ALIAS) == "v1"
+
+
+def test_registry_resolves_aliases_latest_and_versions(registry):
+    registry.set_alias(CANARY_ALIAS, "v2")
+    assert registry.resolve(CANARY_ALIAS) == "v2"
+    assert registry.resolve("latest") == "v3"
+    assert registry.resolve("v1") == "v1"
+    assert load_object(registry.bundle_path(CANARY_ALIAS)).version == "v2"
+    with pytest.raises(FileNotFoundError):
+        registry.resolve("v9")
+
+
+def test_registry_keeps_versions_immutable(registry):
+    registry.set_alias(PRODUCTION_ALIAS, "v1")
+    with pytest.raises(CustomException):
+        registry.register(make_bundle("v1"))
+    with pytest.raises(ValueError):
+        registry.delete_version("v1")
+    registry.delete_version("v2")
+    assert [metadata["version"] for metadata in registry.list_versions()] == ["v1", "v3"]
+
+
+def test_prune_keeps_newest_and_aliased_versions(registry):
+    registry.register(make_bundle("v4"))
+    registry.set_alias(PRODUCTION_ALIAS, "v1")
+    registry.set_alias(PRODUCTION_ALIAS, "v2")
+    registry.set_alias(CANARY_ALIAS, "v1")
+    assert registry.prune(keep=1) == ["v3"]
+    assert [metadata["version"] for metadata in registry.list_versions()] == ["v1", "v2", "v4"]
+    # v1 is still aliased (canary) and in production's history
+    assert registry.rollback(PRODUCTION_ALIAS) == "v1"
+
+
+def test_prune_drops_removed_versions_from_rollback_history(registry):
+    for version in ("v1", "v2", "v3"):
+        registry.set_alias(PRODUCTION_ALIAS, version)
+    registry.set_alias(CANARY_ALIAS, "v3")
+    assert registry.prune(keep=1) == ["v1", "v2"]
+    with pytest.raises(ValueError):
+        registry.rollback(PRODUCTION_ALIAS)
+    assert registry.prune(keep=1) == []
@@ -0,0 +1,21 @@
+from catboost import CatBoostClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.tree import DecisionTreeClassifier
+from xgboost import XGBClassifier
+
+from src.utils import _limit_estimator_threads
+
+
+def test_catboost_threads_are_pinned_without_explicit_thread_count():
+    model = _limit_estimator_threads(CatBoostClassifier(verbose=0), 2)
+    assert model.get_params()["thread_count"] == 2
+
+
+def test_sklearn_and_xgboost_threads_are_pinned():
+    assert _limit_estimator_threads(LogisticRegression(), 3).n_jobs == 3
+    assert _limit_estimator_threads(XGBClassifier(), 3).n_jobs == 3
+
+
+def test_single_threaded_estimators_are_left_alone():
+    model = DecisionTreeClassifier(max_depth=2)
+    assert _limit_estimator_threads(model, 4).get_params() == DecisionTreeClassifier(max_depth=2).get_params()
@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+import scipy.sparse as sp
+from catboost import CatBoostClassifier
+from sklearn.linear_model import SGDClassifier
+from xgboost import XGBClassifier
+
+from src.utils import ChunkedDataset, evaluate_models_out_of_core
+
+CLASSES = np.array(["High", "Low"])
+
+
+def make_data(n_rows, seed=0):
+    rng = np.random.RandomState(seed)
+    X = rng.rand(n_rows, 4).astype(np.float32)
+    y = np.where(X[:, 0] + 0.1 * rng.rand(n_rows) > 0.55, "High", "Low").astype(object)
+    return X, y
+
+
+@pytest.fixture
+def datasets(tmp_path):
+    X, y = make_data(3000)
+    train = ChunkedDataset.write(str(tmp_path / "train"), X[:2400], y[:2400], chunk_rows=500)
+    test = ChunkedDataset.write(str(tmp_path / "test"), X[2400:], y[2400:], chunk_rows=500)
+    return train, test
+
+
+def test_chunked_dataset_round_trip(tmp_path):
+    X, y = make_data(1200)
+    dataset = ChunkedDataset.write(str(tmp_path / "dense"), X, y, chunk_rows=500)
+    reopened = ChunkedDataset.open(str(tmp_path / "dense"))
+    assert len(reopened) == 1200 and len(reopened.chunks) == 3
+    assert reopened.fingerprint == dataset.fingerprint
+    np.testing.assert_array_equal(np.vstack([chunk for chunk, _ in reopened.iter_chunks()]), X)
+    np.testing.assert_array_equal(np.concatenate(list(reopened.iter_targets())), y)
+
+    sparse = ChunkedDataset.write(str(tmp_path / "sparse"), sp.csr_matrix(X), y, chunk_rows=500)
+    first, _ = next(sparse.iter_chunks())
+    assert sp.issparse(first)
+    np.testing.assert_allclose(first.toarray(), X[:500])
+
+
+def test_out_of_core_search_trains_streaming_models(datasets, tmp_path):
+    train, test = datasets
+    models = {
+        "SGD": SGDClassifier(loss="log_loss", random_state=42),
+        "XGBoost": XGBClassifier(n_estimators=20, max_depth=3),
+        "CatBoost": CatBoostClassifier(iterations=20, verbose=0, allow_writing_files=False),   # Numeric features only
+    }
+    params = {"SGD": {"alpha": [1e-4, 1e-3]}, "XGBoost": {}, "CatBoost": {"depth": [3]}}
+    report, details = evaluate_models_out_of_core(
+        train, test, models, params, CLASSES, return_details=True, work_dir=str(tmp_path / "work"),
+    )
+    assert set(report) == {"SGD", "XGBoost", "CatBoost"}
+    for name, score in report.items():
+        assert score > 0.8, name
+        assert len(details[name]["candidates"]) == len(params[name].get("alpha", [None]))
+        assert details[name]["peak_memory_mb"] is None or details[name]["peak_memory_mb"] > 0
+    X, y = make_data(50, seed=1)
+    codes = details["XGBoost"]["estimator"].predict(X)
+    assert set(np.unique(codes)) <= {0, 1}
+    assert np.mean(CLASSES[codes] == y) > 0.8
+
+
+def test_catboost_with_categorical_features_is_skipped(datasets, tmp_path):
+    train, test = datasets
+    models = {"CatBoost": CatBoostClassifier(iterations=5, verbose=0, cat_features=(3,), allow_writing_files=False)}
+    assert evaluate_models_out_of_core(train, test, models, {}, CLASSES, work_dir=str(tmp_path / "work")) == {}
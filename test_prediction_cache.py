@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LogisticRegression
+
+import src.components.data_transformation as data_transformation
+from src.components.data_transformation import DataTransformation, DataTransformationConfig
+from src.components.inference_bundle import InferenceBundle
+from src.pipeline.prediction_cache import MISSING, PredictionCache
+from src.pipeline.predict_pipeline import PredictPipeline, PredictPipelineConfig
+from src.utils import save_object
+from test_inference_bundle import make_frame
+
+
+def make_request(time="10:05:00", latitude=40.7123, weather="Clear"):
+    return pd.DataFrame([{
+        "Weather": weather, "Road_Condition": "Good", "Time_of_Day": "Morning", "Traffic": "Low",
+        "Accident_Type": "Rollover", "Vehicle_Type": "Car", "Accident_Reason": "Speeding",
+        "Latitude": latitude, "Longitude": -73.9, "Date": "2025-03-14", "Time": time,
+    }])
+
+
+def test_keys_normalize_categories_and_snap_coordinates():
+    cache = PredictionCache(geo_grid=1e-3)
+    [key] = cache.make_keys(make_request(latitude=40.71231, weather=" Clear "))
+    assert key == cache.make_keys(make_request(latitude=40.71229))[0]
+    assert key != cache.make_keys(make_request(latitude=40.7153))[0]
+
+
+def test_keys_resolve_timestamps_to_the_minute():
+    cache = PredictionCache()
+    key = cache.make_keys(make_request("10:05:10"))[0]
+    assert key == cache.make_keys(make_request("10:05:50"))[0]
+    # hour_sin/hour_cos read the minutes: 10:05 and 10:55 are different model inputs
+    assert key != cache.make_keys(make_request("10:55:00"))[0]
+    parsed = make_request("10:05:10").assign(Date=pd.Timestamp("2025-03-14 10:05:10"))
+    assert cache.make_keys(parsed)[0] == key
+
+
+def test_version_change_ttl_and_size_limit():
+    cache = PredictionCache(maxsize=2, ttl=60.0)
+    cache.put_many(["a", "b"], [1, 2], "v1")
+    assert cache.get_many(["a", "b"], "v1") == [1, 2]
+    assert cache.get_many(["a"], "v2") == [MISSING]
+    assert cache.get_stats()["invalidations"] == 1
+
+    cache.put_many(["a", "b", "c"], [1, 2, 3], "v2")
+    assert cache.get_many(["a", "c"], "v2") == [MISSING, 3]
+    assert cache.get_stats()["evictions"] == 1
+
+    cache.ttl = 1e-9
+    assert cache.get_many(["c"], "v2") == [MISSING]
+    assert cache.get_stats()["expirations"] == 1
+
+
+@pytest.fixture(scope="module")
+def bundle_path(tmp_path_factory):
+    X, y = make_frame(600)
+    preprocessor = DataTransformation(
+        DataTransformationConfig(timestamp_cache_dir=None, output_dtype=None)
+    ).get_data_transformer_object()
+    model = LogisticRegression(max_iter=500).fit(preprocessor.fit_transform(X, y), y)
+    path = str(tmp_path_factory.mktemp("bundle") / "model_bundle.pkl")
+    save_object(path, InferenceBundle(preprocessor, model))
+    return path
+
+
+def test_cached_predictions_match_the_bundle(bundle_path, monkeypatch):
+    # Unique cache settings: a cache of its own, not shared with other tests
+    pipeline = PredictPipeline(PredictPipelineConfig(bundle_file_path=bundle_path, prediction_cache_size=1234))
+    X, _ = make_frame(300, seed=7)
+    X = pd.concat([X, X.head(100)], ignore_index=True)
+    X.loc[X.index[:5], "Date"] = None
+    expected = pipeline.load_bundle().predict(X)
+
+    parses = []
+    parse_timestamps = data_transformation.parse_timestamps
+    monkeypatch.setattr(data_transformation, "parse_timestamps",
+                        lambda *args: parses.append(1) or parse_timestamps(*args))
+    np.testing.assert_array_equal(pipeline.predict(X), expected)
+    np.testing.assert_array_equal(pipeline.predict(X), expected)
+    # Every row of the repeated call is served from the cache
+    assert pipeline.cache_stats()["predictions"]["hits"] == len(X)
+    # The cached path never re-parses a timestamp the pipeline already parsed
+    assert not parses
@@ -0,0 +1,86 @@
+from src.components.data_ingestion import DataIngestion
+from src.components.model_trainer import ModelTrainer
+from src.pipeline.stage_cache import Stage, StageCache, run_stages
+
+
+def make_stages(tmp_path, calls, factor=2):
+    source = tmp_path / "source.txt"
+    output = tmp_path / "doubled.txt"
+
+    def double():
+        calls.append("double")
+        output.write_text(str(int(source.read_text()) * factor))
+        return str(output)
+
+    def describe(double):
+        calls.append("describe")
+        with open(double) as f:
+            return f"value={f.read()}"
+
+    return [
+        Stage(name="double", func=double, params={"factor": factor},
+              inputs=lambda: [str(source)], outputs=lambda path: [path]),
+        # The result names a file: the file itself is the input that can change
+        Stage(name="describe", func=describe, deps=("double",), inputs=lambda double: [double]),
+    ]
+
+
+def run(tmp_path, calls, factor=2, force=()):
+    cache = StageCache(root=str(tmp_path / "stages"))
+    return run_stages(make_stages(tmp_path, calls, factor), cache, force=force)
+
+
+def test_unchanged_stages_are_reused(tmp_path):
+    (tmp_path / "source.txt").write_text("21")
+    calls = []
+    results, status = run(tmp_path, calls)
+    assert results["describe"] == "value=42" and status == {"double": "ran", "describe": "ran"}
+
+    calls.clear()
+    results, status = run(tmp_path, calls)
+    assert calls == [] and status == {"double": "cached", "describe": "cached"}
+    assert results["describe"] == "value=42"
+
+
+def test_changed_input_or_params_rerun(tmp_path):
+    (tmp_path / "source.txt").write_text("21")
+    calls = []
+    run(tmp_path, calls)
+
+    (tmp_path / "source.txt").write_text("5")
+    results, status = run(tmp_path, calls)
+    assert status["double"] == "ran" and results["describe"] == "value=10"
+
+    results, status = run(tmp_path, calls, factor=3)
+    assert status["double"] == "ran" and results["describe"] == "value=15"
+
+
+def test_forced_stage_with_identical_result_keeps_downstream_cached(tmp_path):
+    (tmp_path / "source.txt").write_text("21")
+    run(tmp_path, [])
+    calls = []
+    _, status = run(tmp_path, calls, force=("double",))
+    assert calls == ["double"]
+    assert status == {"double": "ran", "describe": "cached"}
+
+
+def test_overwritten_outputs_are_restored_from_snapshots(tmp_path):
+    (tmp_path / "source.txt").write_text("21")
+    run(tmp_path, [])
+    (tmp_path / "doubled.txt").write_text("garbage")
+    calls = []
+    _, status = run(tmp_path, calls)
+    assert calls == [] and status["double"] == "cached"
+    assert (tmp_path / "doubled.txt").read_text() == "42"
+
+
+def test_code_digest_follows_project_imports():
+    ingest = StageCache.code_digest((DataIngestion,))
+    assert "src.utils" in ingest
+    # __main__ demo imports are not stage code
+    assert "src.components.model_trainer" not in ingest
+
+    train = StageCache.code_digest((ModelTrainer,))
+    for module in ("src.components.inference_bundle", "src.components.data_transformation",
+                   "src.components.model_registry", "src.utils"):
+        assert module in train